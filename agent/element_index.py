@@ -0,0 +1,223 @@
+"""
+In-memory similarity index over a UI dump, built once per dump.
+
+The healers ask two things for every locator: which elements does it match, and
+which element did it most likely mean. Both used to scan the whole dump per
+locator. The index answers them from:
+- exact inverted maps by id, name, class token, tag and text, so match checks
+  only run over the elements that can possibly match;
+- character trigram postings of id/name, text and other attribute values, which
+  shortlist the elements sharing n-grams with a broken locator;
+- NumPy feature vectors (hashed trigrams of id, name and text, normalized
+  position and size) that order the shortlist by cosine similarity before the
+  best few are rescored with locators.score_element(), so scores stay
+  comparable to rank_elements().
+"""
+
+import zlib
+from collections import defaultdict
+import numpy as np
+from config import ELEMENT_INDEX_DIM, ELEMENT_INDEX_SHORTLIST, ELEMENT_INDEX_RESCORE, ELEMENT_INDEX_MIN_ELEMENTS
+from agent.locators import parse_locator, score_element, _normalize
+from agent.heuristic_healer import element_matches
+
+_BLOCKS = ("id", "name", "text")
+_GEOMETRY = 4  # x, y, width, height relative to the page extent
+_EMPTY = np.zeros(0, dtype=np.int32)
+
+
+def trigrams(value):
+    """Character trigrams of the normalized value, padded so short values still yield one."""
+    s = _normalize(value)
+    if not s:
+        return set()
+    s = f"^{s}$"
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def _element_text(element):
+    attrs = element.get("attributes", {})
+    return element.get("text") or attrs.get("aria-label") or attrs.get("placeholder")
+
+
+def _unit_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+
+
+class ElementIndex:
+    """Inverted maps, trigram postings and feature vectors for one list of dump elements."""
+
+    def __init__(self, ui_data, dim: int = ELEMENT_INDEX_DIM):
+        self.ui_data = ui_data
+        self.dim = dim
+        n = len(ui_data)
+        self.by_id, self.by_name = defaultdict(list), defaultdict(list)
+        self.by_class, self.by_tag, self.by_text = defaultdict(list), defaultdict(list), defaultdict(list)
+        postings = defaultdict(list)
+        rows, cols = [], []
+
+        for i, element in enumerate(ui_data):
+            attrs = element.get("attributes", {})
+            self.by_tag[element.get("tag")].append(i)
+            self.by_text[(element.get("text") or "").strip()].append(i)
+            for key, exact in (("id", self.by_id), ("name", self.by_name)):
+                if attrs.get(key):
+                    exact[attrs[key].strip()].append(i)
+            for token in set(attrs.get("class", "").split()):
+                self.by_class[token].append(i)
+                postings["c:" + token].append(i)
+
+            grams = {field: trigrams(value) for field, value in
+                     (("id", attrs.get("id")), ("name", attrs.get("name")), ("text", _element_text(element)))}
+            # id and name share postings: a renamed locator often moved from one to the other
+            for g in grams["id"] | grams["name"]:
+                postings["k:" + g].append(i)
+            for g in grams["text"]:
+                postings["t:" + g].append(i)
+            for key, value in attrs.items():
+                if key not in ("id", "name", "class"):
+                    for g in trigrams(value):
+                        postings["a:" + g].append(i)
+            for block, field in enumerate(_BLOCKS):
+                for g in grams[field]:
+                    rows.append(i)
+                    cols.append(block * dim + zlib.crc32(g.encode()) % dim)
+
+        self.postings = {key: np.asarray(ids, dtype=np.int32) for key, ids in postings.items()}
+
+        width = len(_BLOCKS) * dim
+        self.vectors = np.zeros((n, width + _GEOMETRY), dtype=np.float32)
+        np.add.at(self.vectors, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1.0)
+        for block in range(len(_BLOCKS)):
+            _unit_rows(self.vectors[:, block * dim:(block + 1) * dim])
+        geometry = self._raw_geometry(ui_data)
+        self.extent = np.maximum(geometry[:, :2] + geometry[:, 2:], 0).max(axis=0) if n else np.ones(2, np.float32)
+        self.extent[self.extent == 0] = 1.0
+        self.vectors[:, width:] = geometry / np.tile(self.extent, 2)
+
+    @staticmethod
+    def _raw_geometry(ui_data):
+        geometry = np.zeros((len(ui_data), _GEOMETRY), dtype=np.float32)
+        for i, element in enumerate(ui_data):
+            location, size = element.get("location") or {}, element.get("size") or {}
+            geometry[i] = (location.get("x", 0), location.get("y", 0), size.get("width", 0), size.get("height", 0))
+        return geometry
+
+    def __len__(self):
+        return len(self.ui_data)
+
+    # Exact matching
+    def matches(self, target):
+        """Indices of elements satisfying every constraint of a parsed locator."""
+        pools = []
+        if target["tag"]:
+            pools.append(self.by_tag.get(target["tag"], []))
+        for key, exact in (("id", self.by_id), ("name", self.by_name)):
+            if target[key] is not None and key not in target["partial"]:
+                pools.append(exact.get(target[key].strip(), []))
+        if target["class"] is not None:
+            pools.extend(self.by_class.get(token, []) for token in target["class"].split())
+        if target["text"] is not None and "text" not in target["partial"]:
+            pools.append(self.by_text.get(target["text"].strip(), []))
+        # The smallest exact pool bounds the answer; element_matches() checks the remaining constraints
+        pool = min(pools, key=len) if pools else range(len(self.ui_data))
+        return [i for i in pool if element_matches(target, self.ui_data[i])]
+
+    def resolves(self, by: str, value: str) -> bool:
+        return bool(self.matches(parse_locator(by, value)))
+
+    # Similarity search
+    def _query(self, target):
+        """(posting keys, id/name query vector or None, text query vector or None) for a parsed locator."""
+        keys, key_vector, text_vector = [], None, None
+        key_grams = set()
+        for key in ("id", "name"):
+            if target[key]:
+                key_grams |= trigrams(target[key])
+        if key_grams:
+            keys += ["k:" + g for g in key_grams]
+            key_vector = self._hashed(key_grams)
+        if target["text"]:
+            grams = trigrams(target["text"])
+            keys += ["t:" + g for g in grams]
+            text_vector = self._hashed(grams) if grams else None
+        if target["class"]:
+            keys += ["c:" + token for token in target["class"].split()]
+        for value in target["attributes"].values():
+            keys += ["a:" + g for g in trigrams(value)]
+        return keys, key_vector, text_vector
+
+    def _hashed(self, grams):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for g in grams:
+            vector[zlib.crc32(g.encode()) % self.dim] += 1.0
+        return vector / np.linalg.norm(vector)
+
+    def _block(self, rows, name):
+        block = _BLOCKS.index(name) * self.dim
+        return self.vectors[rows, block:block + self.dim]
+
+    def shortlist(self, target, limit: int = ELEMENT_INDEX_SHORTLIST):
+        """Elements sharing the most n-grams / class tokens with the locator, best first by cosine similarity."""
+        keys, key_vector, text_vector = self._query(target)
+        arrays = [self.postings[key] for key in keys if key in self.postings]
+        if arrays:
+            hits = np.bincount(np.concatenate(arrays), minlength=len(self.ui_data))
+            # Elements sharing at least half as many n-grams as the best one
+            candidates = np.flatnonzero(hits >= max(1, hits.max() // 2))
+            cap = limit * 64
+            if len(candidates) > cap:
+                candidates = candidates[np.argpartition(-hits[candidates], cap)[:cap]]
+        elif target["tag"]:
+            candidates = np.asarray(self.by_tag.get(target["tag"], _EMPTY), dtype=np.int32)
+            hits = None
+        else:
+            return np.arange(min(limit, len(self.ui_data)), dtype=np.int32)
+        if not len(candidates):
+            return candidates
+
+        # Cosine per field; an id/name locator counts whichever of the two attributes is closer
+        parts = []
+        if key_vector is not None:
+            parts.append(np.maximum(self._block(candidates, "id") @ key_vector,
+                                    self._block(candidates, "name") @ key_vector))
+        if text_vector is not None:
+            parts.append(self._block(candidates, "text") @ text_vector)
+        if parts:
+            similarity = sum(parts) / len(parts)
+        elif hits is not None:
+            similarity = hits[candidates].astype(np.float32)
+        else:
+            similarity = np.zeros(len(candidates), dtype=np.float32)
+
+        if len(candidates) > limit:
+            top = np.argpartition(-similarity, limit)[:limit]
+            candidates, similarity = candidates[top], similarity[top]
+        return candidates[np.argsort(-similarity, kind="stable")]
+
+    def candidates(self, by: str, value: str, k: int = 5):
+        """Indices of the k elements closest to the locator by vector similarity alone (no exact rescoring)."""
+        return [int(i) for i in self.shortlist(parse_locator(by, value), limit=max(k, 1))[:k]]
+
+    def rank(self, by: str, value: str, k: int = 5, rescore: int = ELEMENT_INDEX_RESCORE):
+        """Top-k (index, score) pairs like locators.rank_elements(), scoring only the shortlisted elements."""
+        target = parse_locator(by, value)
+        candidates = self.shortlist(target)[:max(rescore, k)]
+        scored = [(int(i), score_element(target, self.ui_data[i])) for i in candidates]
+        scored = [pair for pair in scored if pair[1] > 0]
+        scored.sort(key=lambda pair: -pair[1])
+        return scored[:k]
+
+    def nearest(self, element, k: int = 5):
+        """Top-k (index, similarity) of elements most like element (e.g. from the previous dump), geometry included."""
+        vector = ElementIndex([element], self.dim).vectors[0]
+        vector[-_GEOMETRY:] = self._raw_geometry([element])[0] / np.tile(self.extent, 2)
+        similarity = self.vectors @ vector
+        top = np.argsort(-similarity, kind="stable")[:k]
+        return [(int(i), float(similarity[i])) for i in top]
+
+
+def build_index(ui_data, min_elements: int = ELEMENT_INDEX_MIN_ELEMENTS):
+    """ElementIndex for dumps large enough to benefit; None for small ones, where a scan is cheaper than the build."""
+    return ElementIndex(ui_data) if len(ui_data) >= min_elements else None
@@ -0,0 +1,138 @@
+"""
+On-disk cache of LLM fixes.
+
+Entries are keyed by a hash of the normalized script plus a structural
+fingerprint of the UI dump, so rerunning a heal on an unchanged script and page
+(e.g. a CI retry) returns the stored fix without calling the model. The cache
+is capped by entry count and total size and evicts least recently used entries.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from config import FIX_CACHE_DIR, FIX_CACHE_MAX_ENTRIES, FIX_CACHE_MAX_BYTES
+
+# One lock for every FixCache in the process: heals create their own instance but share the files
+_lock = threading.Lock()
+
+FINGERPRINT_ATTRIBUTES = ("id", "name", "type", "class", "role", "aria-label", "placeholder")
+
+
+def normalize_script(code: str) -> str:
+    """Canonical form of the script: formatting and comments do not change the key."""
+    try:
+        return ast.unparse(ast.parse(code))
+    except SyntaxError:
+        return "\n".join(line.rstrip() for line in code.strip().splitlines())
+
+
+def fingerprint_row(el) -> bytes:
+    """The part of one element that ui_fingerprint() hashes."""
+    attrs = el.get("attributes", {})
+    row = [el.get("tag", ""), el.get("text", "")] + [attrs.get(name, "") for name in FINGERPRINT_ATTRIBUTES]
+    return json.dumps(row, ensure_ascii=False).encode("utf-8")
+
+
+def ui_fingerprint(ui_data) -> str:
+    """Hash of the page structure (tags, identifying attributes, text) without geometry or visibility."""
+    digest = hashlib.sha256()
+    for el in ui_data:
+        digest.update(fingerprint_row(el))
+    return digest.hexdigest()
+
+
+def cache_key(code: str, ui_data, fingerprint=None) -> str:
+    """fingerprint: ui_fingerprint(ui_data) when the caller already computed it."""
+    payload = normalize_script(code) + "\0" + (fingerprint or ui_fingerprint(ui_data))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FixCache:
+    def __init__(self, directory=FIX_CACHE_DIR, max_entries=FIX_CACHE_MAX_ENTRIES, max_bytes=FIX_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._index_path = self.directory / "index.json"
+        self._lock = _lock
+
+    def get(self, key: str):
+        """Stored fixed code for key, or None. Read errors count as a miss, like a missing entry."""
+        with self._lock:
+            index = self._load_index()
+            path = self.directory / f"{key}.py"
+            if key not in index:
+                return None
+            try:
+                code = path.read_text(encoding="utf-8")
+            except OSError:
+                return None
+            index[key]["last_used"] = time.time()
+            index[key]["hits"] = index[key].get("hits", 0) + 1
+            try:
+                self._save_index(index)
+            except OSError as e:
+                print(f"⚠️ Fix cache usage not recorded → {e}")
+            return code
+
+    def put(self, key: str, fixed_code: str):
+        """Store a fix; write errors are reported and ignored so they never fail the heal that produced it."""
+        try:
+            self._put(key, fixed_code)
+        except OSError as e:
+            print(f"⚠️ Fix cache not updated → {e}")
+
+    def _put(self, key: str, fixed_code: str):
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            data = fixed_code.encode("utf-8")
+            if len(data) > self.max_bytes:
+                return
+            _atomic_write(self.directory / f"{key}.py", data)
+            index = self._load_index()
+            now = time.time()
+            index[key] = {"size": len(data), "created": now, "last_used": now, "hits": 0}
+            self._evict(index)
+            self._save_index(index)
+
+    def discard(self, key: str):
+        """Drop an entry; like put(), errors are reported and ignored."""
+        try:
+            self._discard(key)
+        except OSError as e:
+            print(f"⚠️ Fix cache entry not removed → {e}")
+
+    def _discard(self, key: str):
+        with self._lock:
+            index = self._load_index()
+            index.pop(key, None)
+            (self.directory / f"{key}.py").unlink(missing_ok=True)
+            self._save_index(index)
+
+    def _evict(self, index):
+        total = sum(entry["size"] for entry in index.values())
+        for key in sorted(index, key=lambda k: index[k]["last_used"]):
+            if len(index) <= self.max_entries and total <= self.max_bytes:
+                break
+            total -= index.pop(key)["size"]
+            (self.directory / f"{key}.py").unlink(missing_ok=True)
+
+    def _load_index(self):
+        try:
+            return json.loads(self._index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index):
+        if self.directory.exists():
+            _atomic_write(self._index_path, json.dumps(index).encode("utf-8"))
+
+
+def _atomic_write(path: Path, data: bytes):
+    tmp = path.with_suffix(path.suffix + f".{os.getpid()}.{uuid.uuid4().hex}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
@@ -0,0 +1,79 @@
+"""
+Compact LLM fix format: locator replacements instead of a regenerated script.
+
+The healer only ever changes locators, so the model answers with one JSON
+object per fixed locator:
+
+    {"line": 12, "by": "ID", "old": "login-btn", "new": "signin-button", "why": "id renamed"}
+
+parse_patch() reads those entries from an answer and apply_patch() rewrites the
+matching string literals of the original script through its AST positions
+(heuristic_healer.apply_fixes), adding the usual `# FIX:` comment above each
+changed line. Output size depends on the number of fixes, not the script length.
+"""
+
+import json
+from agent.locators import STRATEGIES, extract_locators
+from agent.heuristic_healer import apply_fixes
+
+EXAMPLE = '{"line": 12, "by": "ID", "old": "login-btn", "new": "signin-button", "why": "id renamed"}'
+
+
+def parse_entry(line: str):
+    """One fix entry from a line of the answer; raises ValueError when it is not one."""
+    try:
+        entry = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"not JSON: {line[:80]!r}") from e
+    if not isinstance(entry, dict):
+        raise ValueError(f"not a JSON object: {line[:80]!r}")
+    by = str(entry.get("by", "")).removeprefix("By.").upper()
+    if by not in STRATEGIES:
+        raise ValueError(f"unknown locator strategy {entry.get('by')!r}")
+    if not isinstance(entry.get("old"), str) or not isinstance(entry.get("new"), str) or not entry["new"]:
+        raise ValueError(f"entry needs string \"old\" and \"new\" values: {line[:80]!r}")
+    line_no = entry.get("line")
+    return {"line": line_no if isinstance(line_no, int) else None, "by": by, "old": entry["old"],
+            "new": entry["new"], "why": str(entry.get("why") or "").strip()}
+
+
+def parse_patch(raw: str):
+    """Fix entries of an answer: JSON objects one per line (fences and blank lines ignored) or a JSON array."""
+    text = raw.strip()
+    if text.startswith("```"):
+        text = "\n".join(line for line in text.splitlines() if not line.strip().startswith("```")).strip()
+    if text.startswith("["):
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON array: {e}") from e
+        entries = [parse_entry(json.dumps(item)) for item in items]
+    else:
+        entries = [parse_entry(line.strip()) for line in text.splitlines() if line.strip().startswith("{")]
+    if not entries:
+        raise ValueError("no fix entries")
+    return entries
+
+
+def apply_patch(code: str, entries):
+    """
+    Apply fix entries to the script. Each entry must name a literal locator of the script;
+    the line number picks the occurrence, and when it does not match one every occurrence
+    of that locator is replaced. Returns (new code, fixes); raises ValueError on unknown locators.
+    """
+    locators = extract_locators(code)
+    fixes = {}
+    for entry in entries:
+        matches = [loc for loc in locators if loc["by"] == entry["by"] and loc["value"] == entry["old"]]
+        if not matches:
+            raise ValueError(f"By.{entry['by']} {entry['old']!r} is not a locator in the script")
+        if any(loc["line"] != loc["end_line"] for loc in matches):
+            raise ValueError(f"By.{entry['by']} {entry['old']!r} spans several lines, patches cannot rewrite it")
+        at_line = [loc for loc in matches if loc["line"] == entry["line"]]
+        reason = f"LLM: {entry['why']}" if entry["why"] else "LLM"
+        for loc in at_line or matches:
+            fixes[(loc["line"], loc["col"])] = dict(loc, new=entry["new"], reason=reason)
+    fixes = [fix for fix in fixes.values() if fix["new"] != fix["value"]]
+    if not fixes:
+        raise ValueError("the entries change nothing")
+    return apply_fixes(code, fixes), fixes
@@ -0,0 +1,252 @@
+"""
+Rule-based locator healing that runs before the LLM.
+
+Every literal locator in the script is checked against ui_dump.json. Locators
+that match no element are replaced by the best-ranked candidate when it wins
+with enough confidence; the new value keeps the original strategy and
+predicate shape (an XPath stays an XPath over the same attributes) and a
+`# FIX:` comment is written above the changed line. Anything the rules cannot
+settle is reported back so only those locators go to the LLM.
+"""
+
+import re
+from agent.locators import extract_locators, parse_locator, rank_elements
+from config import HEAL_MIN_CONFIDENCE, HEAL_MIN_MARGIN, IMPORTANT_TAGS, EXTRA_SELECTORS
+
+# Locator shapes parse_locator() understands completely; anything else is left to the LLM
+_SIMPLE_XPATH = re.compile(
+    r"""^//[\w*-]+(\[(@[\w-]+|text\(\)|normalize-space\(\s*(text\(\))?\s*\)|\.)\s*=\s*('[^']*'|"[^"]*")\]"""
+    r"""|\[contains\(\s*(@[\w-]+|text\(\)|\.)\s*,\s*('[^']*'|"[^"]*")\s*\)\])*$"""
+)
+
+
+def is_simple(by: str, value: str) -> bool:
+    if by == "XPATH":
+        return bool(_SIMPLE_XPATH.match(value.strip()))
+    if by == "CSS_SELECTOR":
+        value = value.strip()
+        return bool(value) and not re.search(r"[\s>+~,:]", re.sub(r"\[[^\]]*\]", "", value))
+    return True
+
+
+def _matches(expected, actual, partial):
+    actual = (actual or "").strip()
+    return expected in actual if partial else expected.strip() == actual
+
+
+def element_matches(target, element) -> bool:
+    """True when element satisfies every constraint of a parsed locator."""
+    attrs = element.get("attributes", {})
+    if target["tag"] and target["tag"] != element.get("tag"):
+        return False
+    for key in ("id", "name"):
+        if target[key] is not None and not _matches(target[key], attrs.get(key), key in target["partial"]):
+            return False
+    if target["class"] is not None:
+        if "class" in target["partial"]:
+            if not set(target["class"].split()) <= set(attrs.get("class", "").split()):
+                return False
+        elif " ".join(target["class"].split()) != " ".join(attrs.get("class", "").split()):
+            return False
+    if target["text"] is not None and not _matches(target["text"], element.get("text"), "text" in target["partial"]):
+        return False
+    for name, expected in target["attributes"].items():
+        if not _matches(expected, attrs.get(name), name in target["partial"]):
+            return False
+    return True
+
+
+def resolves(by: str, value: str, ui_data) -> bool:
+    target = parse_locator(by, value)
+    return any(element_matches(target, el) for el in ui_data)
+
+
+def dump_can_contain(target, profile=None) -> bool:
+    """
+    False when the scrape profile never keeps the element a parsed locator targets (a tag outside
+    important_tags that no extra selector picks up), so its absence from the dump proves nothing.
+    """
+    profile = profile or {}
+    if not target["tag"] or target["tag"] in profile.get("important_tags", IMPORTANT_TAGS):
+        return True
+    for selector in profile.get("extra_selectors", EXTRA_SELECTORS):
+        m = re.fullmatch(r"\[\s*([\w-]+)\s*\]", selector.strip())
+        # Only attribute-presence selectors can be ruled out from the locator alone
+        if not m or m.group(1) in target["attributes"]:
+            return True
+    return False
+
+
+def referenced_elements(code: str, ui_data, index=None):
+    """Elements of ui_data that at least one literal locator in the script currently matches."""
+    targets = [parse_locator(loc["by"], loc["value"]) for loc in extract_locators(code)
+               if is_simple(loc["by"], loc["value"])]
+    if index is not None:
+        return [ui_data[i] for i in sorted({i for t in targets for i in index.matches(t)})]
+    return [el for el in ui_data if any(element_matches(t, el) for t in targets)]
+
+
+def _xpath_literal(value):
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    return None
+
+
+def build_locator(by: str, value: str, element):
+    """
+    New locator value for element that keeps the strategy and predicate shape of the old one.
+    Returns None when the element lacks the attributes that shape needs.
+    """
+    attrs = element.get("attributes", {})
+    if by == "ID":
+        return attrs.get("id")
+    if by == "NAME":
+        return attrs.get("name")
+    if by == "CLASS_NAME":
+        classes = attrs.get("class", "").split()
+        return classes[0] if classes else None
+    if by == "TAG_NAME":
+        return element.get("tag")
+    if by in ("LINK_TEXT", "PARTIAL_LINK_TEXT"):
+        return element.get("text") or None
+
+    target = parse_locator(by, value)
+    keys = [k for k in ("id", "name", "class") if target[k] is not None] + list(target["attributes"])
+    use_text = target["text"] is not None
+    values = {k: attrs.get(k) for k in keys}
+    if any(not v for v in values.values()) or (use_text and not element.get("text")):
+        return None
+
+    if by == "XPATH":
+        predicates = []
+        for k, v in values.items():
+            literal = _xpath_literal(v)
+            if literal is None:
+                return None
+            predicates.append(f"[@{k}={literal}]")
+        if use_text:
+            literal = _xpath_literal(element["text"])
+            if literal is None:
+                return None
+            predicates.append(f"[text()={literal}]")
+        tag = element["tag"] if target["tag"] else "*"
+        return f"//{tag}{''.join(predicates)}"
+
+    # CSS_SELECTOR; CSS cannot match on text
+    if use_text:
+        return None
+    selector = element["tag"] if target["tag"] else ""
+    for k, v in values.items():
+        if k == "id" and re.fullmatch(r"[A-Za-z_][\w-]*", v):
+            selector += f"#{v}"
+        elif k == "class":
+            selector += "".join(f".{c}" for c in v.split())
+        else:
+            selector += f"[{k}=\"{v}\"]" if '"' not in v else f"[{k}='{v}']"
+    return selector or None
+
+
+def _string_literal(source_literal, value):
+    """Python literal for value, reusing the quote style of the literal it replaces."""
+    quote = "'" if source_literal.lstrip("rRbBuU")[:1] == "'" else '"'
+    body = value.replace("\\", "\\\\").replace(quote, "\\" + quote)
+    return f"{quote}{body}{quote}"
+
+
+def heal_locators(code: str, ui_data, known_fixes=None, index=None, profile=None):
+    """
+    Resolve script locators against ui_dump.json without an LLM.
+
+    known_fixes optionally maps (by, old_value) to a replacement value that was
+    verified before; it is used when that replacement resolves on this page.
+    index is an optional ElementIndex over ui_data; large dumps get one built
+    so lookups do not scan every element per locator. profile is the scrape
+    profile the dump was taken with (ui_scraper.get_site_profile).
+
+    Returns {"code", "fixes", "unresolved", "out_of_dump", "checked"}: the rewritten
+    script, one dict per applied fix, the locators that still need the LLM, the
+    missing locators whose elements the dump never keeps (left as they are) and
+    how many literal locators were checked.
+    """
+    known_fixes = known_fixes or {}
+    fixes, unresolved, out_of_dump = [], [], []
+    locators = extract_locators(code)
+    if index is None and locators:
+        from agent.element_index import build_index
+        index = build_index(ui_data)
+    if index is not None:
+        resolves_here = index.resolves
+        rank = index.rank
+    else:
+        def resolves_here(by, value):
+            return resolves(by, value, ui_data)
+
+        def rank(by, value, k):
+            return rank_elements(ui_data, by, value, k)
+
+    for loc in locators:
+        by, value = loc["by"], loc["value"]
+        if not is_simple(by, value):
+            unresolved.append(loc)
+            continue
+        if resolves_here(by, value):
+            continue
+        if not dump_can_contain(parse_locator(by, value), profile):
+            out_of_dump.append(loc)
+            continue
+        # apply_fixes() only rewrites single-line literals
+        if loc["line"] != loc["end_line"]:
+            unresolved.append(loc)
+            continue
+
+        known = known_fixes.get((by, value))
+        if known and resolves_here(by, known):
+            fixes.append(dict(loc, new=known, score=1.0, reason="known-good replacement from history"))
+            continue
+
+        ranked = rank(by, value, 2)
+        if not ranked:
+            unresolved.append(loc)
+            continue
+        best_index, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        new_value = build_locator(by, value, ui_data[best_index])
+        if (best_score < HEAL_MIN_CONFIDENCE or best_score - runner_up < HEAL_MIN_MARGIN
+                or not new_value or not resolves_here(by, new_value)):
+            unresolved.append(loc)
+            continue
+        fixes.append(dict(loc, new=new_value, score=round(best_score, 3),
+                          reason=f"similarity {best_score:.2f}"))
+
+    return {"code": apply_fixes(code, fixes), "fixes": fixes, "unresolved": unresolved, "out_of_dump": out_of_dump,
+            "checked": len(locators)}
+
+
+def apply_fixes(code: str, fixes):
+    """
+    Rewrite the string literals named by fixes and add a # FIX: comment above each changed line.
+    Literals spanning several lines are skipped; callers leave those to the LLM.
+    """
+    lines = code.splitlines(keepends=True)
+    comments = {}
+
+    # Work bottom-up so earlier offsets stay valid; ast offsets are UTF-8 byte offsets
+    for fix in sorted(fixes, key=lambda f: (f["line"], f["col"]), reverse=True):
+        if fix["line"] != fix["end_line"]:
+            continue
+        raw = lines[fix["line"] - 1].encode("utf-8")
+        literal = raw[fix["col"]:fix["end_col"]].decode("utf-8")
+        replacement = _string_literal(literal, fix["new"]).encode("utf-8")
+        lines[fix["line"] - 1] = (raw[:fix["col"]] + replacement + raw[fix["end_col"]:]).decode("utf-8")
+        comments.setdefault(fix["line"], []).insert(
+            0, f"FIX: {fix['by']} {fix['value']!r} not found in UI JSON, using {fix['new']!r} ({fix['reason']})"
+        )
+
+    for line_no in sorted(comments, reverse=True):
+        line = lines[line_no - 1]
+        indent = line[:len(line) - len(line.lstrip())]
+        lines[line_no - 1:line_no - 1] = [f"{indent}# {text}\n" for text in comments[line_no]]
+
+    return "".join(lines)
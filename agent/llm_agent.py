@@ -1,33 +1,37 @@
+"""
+LLM client and system prompt for the healing agent.
+
+langchain_openai and langchain_core are imported on first use: `llm` and `prompt`
+are built lazily through the module __getattr__, so importing this module (and
+main, tk_ui, ...) stays cheap when no LLM call is made.
+"""
+
 import os
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.prompts import MessagesPlaceholder
 
 load_dotenv()
 
 OPENROUTER_API_KEY = os.getenv("openrouter_API_KEY")
 
 
-def get_llm():
+def get_llm(**overrides):
+    """Build the chat model; overrides (base_url, http_client, max_retries, ...) replace the defaults."""
     try:
-        return ChatOpenAI(
+        from langchain_openai import ChatOpenAI
+        settings = dict(
             model="meta-llama/llama-3-8b-instruct",
             base_url="https://openrouter.ai/api/v1",
             api_key=OPENROUTER_API_KEY,
             temperature=0
         )
+        settings.update(overrides)
+        return ChatOpenAI(**settings)
     except Exception as e:
         print(f"❌ LLM initialization failed: {str(e)}")
         return None
 
 
-llm = get_llm()
-
-prompt = ChatPromptTemplate.from_messages([
-
-    ("system",
-     """
+SYSTEM_PROMPT = """
 You are a STRICT Selenium Automation Debugging Agent.
 
 YOUR ONLY RESPONSIBILITY:
@@ -89,10 +93,23 @@ username.send_keys("test@example.com")
 
 driver.quit()
 """
-    ),
 
-    ("human", "{input}"),
 
-    MessagesPlaceholder(variable_name="agent_scratchpad")
+def build_prompt():
+    from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+    return ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_PROMPT),
+        ("human", "{input}"),
+        MessagesPlaceholder(variable_name="agent_scratchpad"),
+    ])
+
+
+_LAZY = {"llm": get_llm, "prompt": build_prompt}
+
 
-])
+def __getattr__(name):
+    # Module-level `llm` / `prompt` are created on first access and then cached as globals
+    if name in _LAZY:
+        value = globals()[name] = _LAZY[name]()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
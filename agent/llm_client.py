@@ -0,0 +1,317 @@
+"""
+Process-wide LLM client shared by every heal.
+
+Wraps the chat model from agent.llm_agent with:
+- pooled keep-alive HTTP connections (one httpx client per process, one async
+  client per event loop),
+- token buckets limiting requests and tokens per minute across all threads,
+- retries with full-jitter exponential backoff on 429, 5xx and connection errors
+  (Retry-After is honored when the server sends it),
+- queue wait / latency / retry metrics via stats().
+
+invoke() and ainvoke() have the same signature as the chat model, so callers do
+not change. stream() and astream() yield the answer chunk by chunk; a caller that
+stops iterating closes the HTTP response, which ends the generation server-side. Point LLM_BASE_URL at a local stub server, or install another client
+with set_client(), to run without the real API.
+"""
+
+import asyncio
+import random
+import threading
+import time
+import weakref
+from config import (
+    LLM_BASE_URL, LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, LLM_MAX_CONNECTIONS,
+    LLM_TIMEOUT, LLM_MAX_RETRIES, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX
+)
+from agent.llm_agent import get_llm
+from agent.prompt_encoder import estimate_tokens
+
+RETRY_STATUS = {408, 409, 429}
+
+
+class TokenBucket:
+    """Refills `rate` units per minute up to `rate`; reserve() debits now and says how long to wait."""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take amount (the balance may go negative) and return the seconds until it is covered."""
+        with self.lock:
+            now = time.monotonic()
+            self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+            self.updated = now
+            self.available -= min(amount, self.capacity)
+            return max(0.0, -self.available / self.rate)
+
+    def adjust(self, amount: float):
+        """Correct an earlier reservation once the real cost is known (negative refunds)."""
+        with self.lock:
+            self.available = min(self.capacity, self.available - amount)
+
+
+def is_retryable(error) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRY_STATUS or status >= 500
+    # openai.APIConnectionError / APITimeoutError and raw httpx transport errors have no status
+    names = {cls.__name__ for cls in type(error).__mro__}
+    return bool(names & {"APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException"})
+
+
+def retry_after(error):
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(retry: int, error=None) -> float:
+    """Full jitter: uniform over [0, base * 2^retry], capped; Retry-After wins when it is longer."""
+    delay = random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** retry))
+    hinted = retry_after(error) if error is not None else None
+    return min(LLM_BACKOFF_MAX, max(delay, hinted or 0.0))
+
+
+def _message_tokens(messages) -> int:
+    return sum(estimate_tokens(str(getattr(m, "content", m))) for m in messages)
+
+
+def _usage_tokens(response):
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+class LLMClient:
+    """Rate-limited, retrying front for the chat model; safe to share between threads and event loops."""
+
+    def __init__(self, base_url=LLM_BASE_URL, requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=LLM_TOKENS_PER_MINUTE, max_retries=LLM_MAX_RETRIES, **model_overrides):
+        import httpx
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.limits = httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                                   max_keepalive_connections=LLM_MAX_CONNECTIONS)
+        self.overrides = dict(model_overrides, max_retries=0, timeout=LLM_TIMEOUT, stream_usage=True)
+        if base_url:
+            self.overrides["base_url"] = base_url
+        self.http_client = httpx.Client(limits=self.limits, timeout=LLM_TIMEOUT)
+        self.model = get_llm(http_client=self.http_client, **self.overrides)
+        # httpx.AsyncClient connections belong to the loop that opened them
+        self._async_models = weakref.WeakKeyDictionary()
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.lock = threading.Lock()
+        self.metrics = dict(calls=0, retries=0, throttled=0, failures=0, aborted=0, tokens=0,
+                            queue_wait_total=0.0, queue_wait_max=0.0, latency_total=0.0, latency_max=0.0)
+
+    def _async_model(self):
+        import httpx
+        loop = asyncio.get_running_loop()
+        model = self._async_models.get(loop)
+        if model is None:
+            client = httpx.AsyncClient(limits=self.limits, timeout=LLM_TIMEOUT)
+            model = get_llm(http_client=self.http_client, http_async_client=client, **self.overrides)
+            self._async_models[loop] = model
+        return model
+
+    def _reserve(self, messages):
+        estimate = _message_tokens(messages)
+        return estimate, max(self.requests.reserve(1), self.tokens.reserve(estimate))
+
+    def _record(self, waited, latency, estimate, response=None, retries=0, throttled=0, failed=False):
+        used = _usage_tokens(response) if response is not None else None
+        if used is not None:
+            self.tokens.adjust(used - estimate)
+        with self.lock:
+            m = self.metrics
+            m["calls"] += 1
+            m["retries"] += retries
+            m["throttled"] += throttled
+            m["failures"] += failed
+            m["tokens"] += used or 0
+            m["queue_wait_total"] += waited
+            m["queue_wait_max"] = max(m["queue_wait_max"], waited)
+            m["latency_total"] += latency
+            m["latency_max"] = max(m["latency_max"], latency)
+
+    def _retry_delay(self, error, retries: int):
+        """Seconds to wait before the next attempt, or None when the error is final."""
+        if retries >= self.max_retries or not is_retryable(error):
+            return None
+        delay = max(backoff_delay(retries + 1, error), self.requests.reserve(1))
+        print(f"⏳ LLM request failed ({type(error).__name__}), retrying in {delay:.1f}s")
+        return delay
+
+    def invoke(self, messages, **kwargs):
+        estimate, wait = self._reserve(messages)
+        time.sleep(wait)
+        waited, retries, throttled = wait, 0, 0
+        start = time.perf_counter()
+        while True:
+            try:
+                response = self.model.invoke(messages, **kwargs)
+            except Exception as e:
+                throttled += getattr(e, "status_code", None) == 429
+                delay = self._retry_delay(e, retries)
+                if delay is None:
+                    self._record(waited, time.perf_counter() - start, estimate, retries=retries,
+                                 throttled=throttled, failed=True)
+                    raise
+                retries += 1
+                time.sleep(delay)
+                continue
+            self._record(waited, time.perf_counter() - start, estimate, response, retries, throttled)
+            return response
+
+    async def ainvoke(self, messages, **kwargs):
+        model = self._async_model()
+        estimate, wait = self._reserve(messages)
+        await asyncio.sleep(wait)
+        waited, retries, throttled = wait, 0, 0
+        start = time.perf_counter()
+        while True:
+            try:
+                response = await model.ainvoke(messages, **kwargs)
+            except Exception as e:
+                throttled += getattr(e, "status_code", None) == 429
+                delay = self._retry_delay(e, retries)
+                if delay is None:
+                    self._record(waited, time.perf_counter() - start, estimate, retries=retries,
+                                 throttled=throttled, failed=True)
+                    raise
+                retries += 1
+                await asyncio.sleep(delay)
+                continue
+            self._record(waited, time.perf_counter() - start, estimate, response, retries, throttled)
+            return response
+
+    def stream(self, messages, **kwargs):
+        """
+        Yield the answer's chunks as they arrive. Failures before the first chunk are retried
+        like invoke(); once output has been yielded an error goes to the caller. Closing the
+        generator early aborts the request; a caller that stopped because the output could not
+        be valid reports it with mark_aborted(), counted in stats()["aborted"].
+        """
+        estimate, wait = self._reserve(messages)
+        time.sleep(wait)
+        waited, retries, throttled = wait, 0, 0
+        start = time.perf_counter()
+        usage, received, outcome = None, False, "closed"
+        try:
+            while True:
+                chunks = self.model.stream(messages, **kwargs)
+                try:
+                    for chunk in chunks:
+                        received = True
+                        usage = chunk if chunk.usage_metadata else usage
+                        yield chunk
+                    outcome = "done"
+                    return
+                except Exception as e:
+                    throttled += getattr(e, "status_code", None) == 429
+                    delay = None if received else self._retry_delay(e, retries)
+                    if delay is None:
+                        outcome = "failed"
+                        raise
+                    retries += 1
+                    time.sleep(delay)
+                finally:
+                    chunks.close()
+        finally:
+            self._record(waited, time.perf_counter() - start, estimate, usage, retries, throttled,
+                         failed=outcome == "failed")
+
+    async def astream(self, messages, **kwargs):
+        """Async stream(); close it with aclose() (or contextlib.aclosing) to abort the request."""
+        model = self._async_model()
+        estimate, wait = self._reserve(messages)
+        await asyncio.sleep(wait)
+        waited, retries, throttled = wait, 0, 0
+        start = time.perf_counter()
+        usage, received, outcome = None, False, "closed"
+        try:
+            while True:
+                chunks = model.astream(messages, **kwargs)
+                try:
+                    async for chunk in chunks:
+                        received = True
+                        usage = chunk if chunk.usage_metadata else usage
+                        yield chunk
+                    outcome = "done"
+                    return
+                except Exception as e:
+                    throttled += getattr(e, "status_code", None) == 429
+                    delay = None if received else self._retry_delay(e, retries)
+                    if delay is None:
+                        outcome = "failed"
+                        raise
+                    retries += 1
+                    await asyncio.sleep(delay)
+                finally:
+                    await chunks.aclose()
+        finally:
+            self._record(waited, time.perf_counter() - start, estimate, usage, retries, throttled,
+                         failed=outcome == "failed")
+
+    def mark_aborted(self):
+        """Count a streamed answer that was stopped because its output could not be valid."""
+        with self.lock:
+            self.metrics["aborted"] += 1
+
+    def stats(self):
+        with self.lock:
+            m = dict(self.metrics)
+        calls = m["calls"] or 1
+        return {
+            "calls": m["calls"],
+            "retries": m["retries"],
+            "throttled": m["throttled"],
+            "failures": m["failures"],
+            "aborted": m["aborted"],
+            "tokens": m["tokens"],
+            "queue_wait_avg": round(m["queue_wait_total"] / calls, 3),
+            "queue_wait_max": round(m["queue_wait_max"], 3),
+            "latency_avg": round(m["latency_total"] / calls, 3),
+            "latency_max": round(m["latency_max"], 3),
+        }
+
+    def close(self):
+        self.http_client.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide LLMClient, or None when the model cannot be initialized."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            client = LLMClient()
+            if client.model is None:
+                client.close()
+                return None
+            _client = client
+        return _client
+
+
+def client_stats():
+    """stats() of the shared client, or None when no LLM call was made in this process."""
+    return _client.stats() if _client is not None else None
+
+
+def set_client(client):
+    """Install another client (a stub, a differently configured LLMClient); returns the previous one."""
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    return previous
@@ -0,0 +1,210 @@
+"""
+Locator extraction and element relevance ranking.
+
+extract_locators() finds every (By.X, "value") pair in a Selenium script with
+ast, parse_locator() turns a locator into the attributes it expects, and
+rank_elements() scores ui_dump.json elements against those expectations so only
+the plausible candidates for each locator have to be shown to the healer.
+"""
+
+import ast
+import re
+
+# By.<NAME> constants and the attribute each one targets
+STRATEGIES = {
+    "ID": "id",
+    "NAME": "name",
+    "CLASS_NAME": "class",
+    "TAG_NAME": "tag",
+    "LINK_TEXT": "text",
+    "PARTIAL_LINK_TEXT": "text",
+    "XPATH": None,
+    "CSS_SELECTOR": None,
+}
+
+_XPATH_TAG = re.compile(r"^\(?/{1,2}([\w*-]+)")
+_XPATH_EQ = re.compile(r"""(@[\w-]+|text\(\)|normalize-space\(\s*(?:text\(\))?\s*\)|\.)\s*=\s*(['"])(.*?)\2""")
+_XPATH_CONTAINS = re.compile(r"""contains\(\s*(@[\w-]+|text\(\)|\.)\s*,\s*(['"])(.*?)\2\s*\)""")
+_CSS_TAG = re.compile(r"^([a-zA-Z][\w-]*)")
+_CSS_ID = re.compile(r"#([\w-]+)")
+_CSS_CLASS = re.compile(r"\.([\w-]+)")
+_CSS_ATTR = re.compile(r"""\[\s*([\w-]+)\s*([*^$~|]?=)\s*['"]?(.*?)['"]?\s*\]""")
+
+
+def _by_name(node):
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "By":
+        return node.attr if node.attr in STRATEGIES else None
+    return None
+
+
+def extract_locators(code: str):
+    """
+    Return every literal locator in the script as a dict:
+    {"by", "value", "line", "col", "end_line", "end_col"} where the positions
+    point at the string literal holding the value.
+    """
+    locators = []
+    for node in ast.walk(ast.parse(code)):
+        if isinstance(node, ast.Tuple):
+            items = node.elts
+        elif isinstance(node, ast.Call):
+            items = node.args
+        else:
+            continue
+        for by_node, value_node in zip(items, items[1:]):
+            by = _by_name(by_node)
+            if by and isinstance(value_node, ast.Constant) and isinstance(value_node.value, str):
+                locators.append({
+                    "by": by,
+                    "value": value_node.value,
+                    "line": value_node.lineno,
+                    "col": value_node.col_offset,
+                    "end_line": value_node.end_lineno,
+                    "end_col": value_node.end_col_offset,
+                })
+    locators.sort(key=lambda loc: (loc["line"], loc["col"]))
+    return locators
+
+
+def parse_locator(by: str, value: str):
+    """
+    Translate a locator into the element attributes it expects.
+    Returns {"tag", "id", "name", "class", "text", "attributes", "partial"} with
+    unknown parts set to None; "partial" lists keys matched with contains().
+    """
+    target = {"tag": None, "id": None, "name": None, "class": None, "text": None,
+              "attributes": {}, "partial": set()}
+
+    key = STRATEGIES.get(by)
+    if key:
+        target[key] = value
+        if by == "PARTIAL_LINK_TEXT":
+            target["partial"].add("text")
+        if by in ("LINK_TEXT", "PARTIAL_LINK_TEXT"):
+            target["tag"] = "a"
+        return target
+
+    if by == "XPATH":
+        m = _XPATH_TAG.match(value.strip())
+        if m and m.group(1) != "*":
+            target["tag"] = m.group(1).lower()
+        for pattern, partial in ((_XPATH_EQ, False), (_XPATH_CONTAINS, True)):
+            for subject, _, expected in pattern.findall(value):
+                name = subject[1:] if subject.startswith("@") else "text"
+                _set_target(target, name, expected, partial)
+    elif by == "CSS_SELECTOR":
+        last = value.strip().split()[-1] if value.strip() else ""
+        m = _CSS_TAG.match(last)
+        if m:
+            target["tag"] = m.group(1).lower()
+        for m in _CSS_ID.finditer(last):
+            target["id"] = m.group(1)
+        classes = _CSS_CLASS.findall(_CSS_ATTR.sub("", last))
+        if classes:
+            target["class"] = " ".join(classes)
+            target["partial"].add("class")
+        for name, op, expected in _CSS_ATTR.findall(last):
+            _set_target(target, name, expected, op != "=")
+    return target
+
+
+def _set_target(target, name, expected, partial):
+    if name in ("id", "name", "class", "text"):
+        target[name] = expected
+    else:
+        target["attributes"][name] = expected
+    if partial:
+        target["partial"].add(name)
+
+
+def edit_distance(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def _normalize(value):
+    return re.sub(r"[\W_]+", "", (value or "").lower())
+
+
+# Strings equal only up to case and separators ("navHome" / "nav-home") score below an exact match
+NORMALIZED_MATCH = 0.95
+
+
+def string_similarity(a, b) -> float:
+    """1.0 for identical strings, NORMALIZED_MATCH when only case and separators differ, less with edit distance."""
+    na, nb = _normalize(a), _normalize(b)
+    if not na or not nb:
+        return 0.0
+    if a.strip() == b.strip():
+        return 1.0
+    return NORMALIZED_MATCH * (1.0 - edit_distance(na, nb) / max(len(na), len(nb)))
+
+
+def _tokens(value):
+    return set(re.findall(r"\w+", (value or "").lower()))
+
+
+def _token_overlap(a, b) -> float:
+    a, b = _tokens(a), _tokens(b)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def score_element(target, element) -> float:
+    """Similarity in [0, 1] between a parsed locator and a ui_dump.json element."""
+    attrs = element.get("attributes", {})
+    score, weight = 0.0, 0.0
+
+    # An id/name locator may have been renamed to the other attribute, so compare across both
+    for key, w in (("id", 3.0), ("name", 2.0)):
+        if target[key]:
+            weight += w
+            score += w * max(string_similarity(target[key], attrs.get("id")),
+                             string_similarity(target[key], attrs.get("name")))
+
+    if target["text"]:
+        weight += 2.0
+        text = element.get("text") or attrs.get("aria-label") or attrs.get("placeholder")
+        score += 2.0 * max(string_similarity(target["text"], text), _token_overlap(target["text"], text))
+
+    if target["class"]:
+        weight += 1.0
+        score += _token_overlap(target["class"], attrs.get("class"))
+
+    for name, expected in target["attributes"].items():
+        weight += 1.0
+        score += string_similarity(expected, attrs.get(name))
+
+    if target["tag"]:
+        weight += 1.0
+        score += 1.0 if target["tag"] == element.get("tag") else 0.0
+
+    return score / weight if weight else 0.0
+
+
+def rank_elements(ui_data, by: str, value: str, k: int = 5):
+    """Top-k (index, score) pairs of ui_data elements most similar to the locator."""
+    target = parse_locator(by, value)
+    scored = [(i, score_element(target, el)) for i, el in enumerate(ui_data)]
+    scored = [pair for pair in scored if pair[1] > 0]
+    scored.sort(key=lambda pair: -pair[1])
+    return scored[:k]
+
+
+def select_candidates(ui_data, locators, k: int = 5, index=None):
+    """Indices (in dump order) of the top-k candidate elements for every locator; index is an optional ElementIndex."""
+    keep = set()
+    for loc in locators:
+        if index is not None:
+            keep.update(index.candidates(loc["by"], loc["value"], k))
+        else:
+            keep.update(i for i, _ in rank_elements(ui_data, loc["by"], loc["value"], k))
+    return sorted(keep)
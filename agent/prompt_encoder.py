@@ -0,0 +1,110 @@
+"""
+Compact, token-budgeted encoding of ui_dump.json for the LLM prompt.
+
+Instead of the raw JSON dump (geometry, full URLs, repeated class strings) the
+model gets one pipe-separated row per element plus a legend of deduplicated
+class strings. Rows are dropped lowest-priority first until the table fits the
+token budget.
+"""
+
+import json
+from urllib.parse import urlparse
+from config import PROMPT_TOKEN_BUDGET, PROMPT_TEXT_LIMIT, PROMPT_URL_LIMIT
+
+COLUMNS = ["i", "tag", "id", "name", "type", "class", "text", "placeholder", "aria-label", "role", "url", "flags"]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text and code)."""
+    return (len(text) + 3) // 4
+
+
+def _clip(value, limit):
+    value = " ".join(str(value).split()).replace("|", "/")
+    return value if len(value) <= limit else value[:limit - 1] + "…"
+
+
+def shorten_url(url, limit=PROMPT_URL_LIMIT):
+    """Drop scheme, host, query and fragment; keep the tail of the path."""
+    parsed = urlparse(url)
+    if parsed.scheme in ("data", "javascript", "blob"):
+        return parsed.scheme + ":"
+    path = parsed.path or "/"
+    if parsed.fragment and path == "/":
+        path = "#" + parsed.fragment
+    return path if len(path) <= limit else "…" + path[-(limit - 1):]
+
+
+def _priority(el):
+    attrs = el.get("attributes", {})
+    score = 0
+    if attrs.get("id") or attrs.get("name"):
+        score += 4
+    if el.get("text") or attrs.get("placeholder") or attrs.get("aria-label"):
+        score += 2
+    if el.get("visible"):
+        score += 2
+    if el.get("enabled", True):
+        score += 1
+    return score
+
+
+def encode_ui(ui_data, budget=PROMPT_TOKEN_BUDGET):
+    """
+    Encode UI elements as a compact table that fits within budget tokens.
+    Returns (text, stats) where stats reports raw vs encoded token counts.
+    """
+    classes = {}
+    rows = []
+    for i, el in enumerate(ui_data):
+        attrs = el.get("attributes", {})
+        cls = " ".join(attrs.get("class", "").split())
+        if cls and cls not in classes:
+            classes[cls] = f"c{len(classes)}"
+        url = attrs.get("href") or attrs.get("src")
+        flags = ("v" if el.get("visible") else "h") + ("" if el.get("enabled", True) else "d")
+        rows.append("|".join([
+            str(i),
+            el.get("tag", ""),
+            _clip(attrs.get("id", ""), PROMPT_TEXT_LIMIT),
+            _clip(attrs.get("name", ""), PROMPT_TEXT_LIMIT),
+            attrs.get("type", ""),
+            classes.get(cls, ""),
+            _clip(el.get("text", ""), PROMPT_TEXT_LIMIT),
+            _clip(attrs.get("placeholder", ""), PROMPT_TEXT_LIMIT),
+            _clip(attrs.get("aria-label", ""), PROMPT_TEXT_LIMIT),
+            attrs.get("role", ""),
+            shorten_url(url) if url else "",
+            flags,
+        ]))
+
+    header = "|".join(COLUMNS) + "  (flags: v=visible h=hidden d=disabled; class codes below)"
+    legend = [f"{code}={cls}" for cls, code in classes.items()]
+
+    fixed_tokens = estimate_tokens(header) + sum(estimate_tokens(line) + 1 for line in legend)
+    remaining = budget - fixed_tokens
+    keep = set()
+    for i in sorted(range(len(rows)), key=lambda i: (-_priority(ui_data[i]), i)):
+        cost = estimate_tokens(rows[i]) + 1
+        if cost > remaining:
+            continue
+        keep.add(i)
+        remaining -= cost
+
+    used_classes = {row.split("|")[5] for i, row in enumerate(rows) if i in keep}
+    legend = [f"{code}={cls}" for cls, code in classes.items() if code in used_classes]
+    lines = [header] + [rows[i] for i in range(len(rows)) if i in keep]
+    if legend:
+        lines += ["classes:"] + legend
+    text = "\n".join(lines)
+
+    raw_tokens = estimate_tokens(json.dumps(ui_data))
+    encoded_tokens = estimate_tokens(text)
+    stats = {
+        "elements": len(ui_data),
+        "omitted": len(ui_data) - len(keep),
+        "raw_tokens": raw_tokens,
+        "encoded_tokens": encoded_tokens,
+        "saved_tokens": raw_tokens - encoded_tokens,
+    }
+    return text, stats
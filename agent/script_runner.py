@@ -0,0 +1,213 @@
+"""
+Run selenium_action_script.py in-process against an injected driver.
+
+The script's own `webdriver.Chrome()` (or Firefox/Edge/Safari/Remote) call is
+rewritten to use the supplied driver, so a warm pooled browser is reused instead
+of launching a new one. Output is returned in the same STDOUT/STDERR format as
+the subprocess runner.
+
+ScriptWorker keeps that execution in a separate long-lived process so scripts
+stay isolated from the caller without paying a cold start on every run.
+"""
+
+import ast
+import atexit
+import io
+import logging
+import multiprocessing
+import queue
+import threading
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+from config import SCRIPT_WORKERS
+
+DRIVER_NAME = "__injected_driver__"
+DRIVER_FACTORIES = {"Chrome", "Firefox", "Edge", "Safari", "Remote"}
+
+
+def is_driver_factory(node) -> bool:
+    """True for a webdriver.Chrome(...) / Chrome(...) style constructor call."""
+    if not isinstance(node, ast.Call):
+        return False
+    func = node.func
+    if isinstance(func, ast.Attribute) and func.attr in DRIVER_FACTORIES:
+        return isinstance(func.value, ast.Name) and func.value.id == "webdriver"
+    return isinstance(func, ast.Name) and func.id in DRIVER_FACTORIES
+
+
+class _InjectDriver(ast.NodeTransformer):
+    """Replace webdriver.Chrome(...) style constructor calls with the injected driver name."""
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if is_driver_factory(node):
+            return ast.copy_location(ast.Name(id=DRIVER_NAME, ctx=ast.Load()), node)
+        return node
+
+
+def compile_with_driver(code: str, filename: str = "selenium_action_script.py"):
+    """Parse, rewrite driver construction and compile the script. Raises SyntaxError on invalid code."""
+    tree = _InjectDriver().visit(ast.parse(code, filename))
+    ast.fix_missing_locations(tree)
+    return compile(tree, filename, "exec")
+
+
+def exec_with_driver(compiled, driver, filename: str = "selenium_action_script.py") -> str:
+    """Execute a compiled script in a fresh namespace and capture its output."""
+    namespace = {"__name__": "__main__", "__file__": filename, DRIVER_NAME: driver}
+    stdout, stderr = io.StringIO(), io.StringIO()
+
+    # Scripts usually call logging.basicConfig(); give them an empty root logger so their
+    # handler writes into the captured stderr, then restore the caller's handlers.
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    root.handlers = []
+
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                exec(compiled, namespace)
+            except SystemExit:
+                pass
+            except BaseException:
+                traceback.print_exc()
+    finally:
+        for handler in root.handlers:
+            handler.flush()
+        root.handlers = saved_handlers
+        root.setLevel(saved_level)
+
+    return f"STDOUT:\n{stdout.getvalue()}\nSTDERR:\n{stderr.getvalue()}"
+
+
+def run_script_with_driver(code: str, driver, filename: str = "selenium_action_script.py") -> str:
+    try:
+        compiled = compile_with_driver(code, filename)
+    except SyntaxError as e:
+        return f"ERROR: Script is invalid → {e}"
+    return exec_with_driver(compiled, driver, filename)
+
+
+def _worker_main(conn):
+    """Worker process loop: keep one warm driver and a cache of compiled scripts."""
+    import hashlib
+    from browser_pool import DriverPool
+
+    pool = DriverPool(size=1)
+    compiled_cache = {}
+
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            code, filename = message
+
+            key = hashlib.sha256(code.encode("utf-8")).hexdigest()
+            compiled = compiled_cache.get(key)
+            if compiled is None:
+                try:
+                    compiled = compile_with_driver(code, filename)
+                except SyntaxError as e:
+                    conn.send(f"ERROR: Script is invalid → {e}")
+                    continue
+                if len(compiled_cache) >= 32:
+                    compiled_cache.pop(next(iter(compiled_cache)))
+                compiled_cache[key] = compiled
+
+            try:
+                with pool.lease() as driver:
+                    conn.send(exec_with_driver(compiled, driver, filename))
+            except Exception as e:
+                conn.send(f"ERROR running Selenium: {e}")
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        pool.close()
+
+
+class ScriptWorker:
+    """
+    Long-lived process that runs scripts against a warm driver.
+    Scripts stay isolated from the caller (crashes, sys.exit, stray globals) while
+    skipping interpreter start, the selenium import and the browser launch.
+    A run that exceeds its timeout kills the worker; the next run starts a fresh one.
+    """
+
+    def __init__(self):
+        self._process = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def run(self, code: str, filename: str, timeout: float) -> str:
+        with self._lock:
+            if self._process is None or not self._process.is_alive():
+                self._start()
+            try:
+                self._conn.send((code, filename))
+                if self._conn.poll(timeout):
+                    return self._conn.recv()
+            except (EOFError, OSError) as e:
+                self._kill()
+                return f"ERROR running Selenium: worker died ({e})"
+            self._kill()
+            return "ERROR: Selenium execution timed out."
+
+    def stop(self):
+        with self._lock:
+            if self._process is not None and self._process.is_alive():
+                try:
+                    self._conn.send(None)
+                    self._process.join(10)
+                except (EOFError, OSError):
+                    pass
+            self._kill()
+
+    def _start(self):
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self._process.start()
+        child_conn.close()
+
+    def _kill(self):
+        if self._process is not None and self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._process = None
+        self._conn = None
+
+
+class WorkerPool:
+    """Fixed set of ScriptWorkers so several scripts can run concurrently; each worker starts on first use."""
+
+    def __init__(self, size=SCRIPT_WORKERS):
+        self._workers = queue.Queue()
+        self._all = [ScriptWorker() for _ in range(max(1, size))]
+        for worker in self._all:
+            self._workers.put(worker)
+
+    def run(self, code: str, filename: str, timeout: float) -> str:
+        worker = self._workers.get()
+        try:
+            return worker.run(code, filename, timeout)
+        finally:
+            self._workers.put(worker)
+
+    def stop(self):
+        for worker in self._all:
+            worker.stop()
+
+
+_workers = None
+_workers_lock = threading.Lock()
+
+
+def get_worker():
+    """Process-wide script worker pool, created on first use."""
+    global _workers
+    with _workers_lock:
+        if _workers is None:
+            _workers = WorkerPool()
+            atexit.register(_workers.stop)
+        return _workers
@@ -0,0 +1,140 @@
+"""
+Incremental checks on a streamed LLM answer.
+
+The model must answer with Python code, fenced or bare. CodeStreamParser is
+fed the text as it arrives, tracks whether it is still in leading prose, inside
+the code or past the closing fence, and tells the caller to stop reading:
+- done: the closing fence arrived, the rest would only be trailing prose;
+- StreamAbort: the answer can no longer meet the format (too much prose before
+  any code, or a syntax error in completed lines that later tokens cannot fix).
+The final code is still taken from the received text with extract_code().
+PatchStreamParser does the same for answers in the agent.fix_patch format, where
+every completed line must be a fix entry.
+"""
+
+import ast
+import re
+from config import STREAM_MAX_PROSE_CHARS, STREAM_SYNTAX_CHECK_LINES
+from agent.fix_patch import parse_entry
+
+_OPEN_FENCE = re.compile(r"```[ \t]*(?:python|py)?[^\n]*\n", re.I)
+_CODE_LINE = re.compile(r"^\s*(import|from|def|class|driver|#)")
+
+# SyntaxError messages that only mean "not finished yet"
+_INCOMPLETE = ("was never closed", "unexpected EOF", "unterminated triple-quoted", "expected an indented block",
+               "incomplete input")
+
+
+class StreamAbort(Exception):
+    """The streamed answer cannot become valid output; stop generating and retry."""
+
+
+class CodeStreamParser:
+    def __init__(self, max_prose_chars: int = STREAM_MAX_PROSE_CHARS,
+                 check_every: int = STREAM_SYNTAX_CHECK_LINES):
+        self.max_prose_chars = max_prose_chars
+        self.check_every = check_every
+        self.text = ""
+        self.state = "prose"  # prose → code → done
+        self.fenced = False
+        self.code_start = None
+        self.checked_lines = 0
+
+    def feed(self, chunk: str) -> bool:
+        """Add streamed text. True once the code block is complete; raises StreamAbort on hopeless output."""
+        self.text += chunk
+        if self.state == "prose":
+            self._find_code()
+        if self.state == "code":
+            self._scan_code()
+        return self.state == "done"
+
+    def _find_code(self):
+        fence = _OPEN_FENCE.search(self.text)
+        if fence:
+            self.state, self.fenced, self.code_start = "code", True, fence.end()
+            return
+        offset = 0
+        complete = self.text[:self.text.rfind("\n") + 1]
+        for line in complete.splitlines(keepends=True):
+            if _CODE_LINE.match(line):
+                self.state, self.code_start = "code", offset
+                return
+            offset += len(line)
+        if len(self.text.strip()) > self.max_prose_chars:
+            raise StreamAbort(f"{len(self.text.strip())} characters of prose before any code")
+
+    def _scan_code(self):
+        body = self.text[self.code_start:]
+        if self.fenced:
+            end = body.find("```")
+            if end != -1:
+                self.state = "done"
+                return
+        # Only whole lines are checked; the last partial line may still change
+        body = body[:body.rfind("\n") + 1]
+        lines = body.count("\n")
+        if lines - self.checked_lines < self.check_every:
+            return
+        self.checked_lines = lines
+        try:
+            ast.parse(body)
+        except SyntaxError as e:
+            if any(marker in (e.msg or "") for marker in _INCOMPLETE):
+                return
+            # An error with complete lines after it is not going to be fixed by more output
+            if e.lineno is not None and e.lineno < lines:
+                raise StreamAbort(f"syntax error on line {e.lineno}: {e.msg}")
+
+
+class PatchStreamParser:
+    """Same interface as CodeStreamParser for fix-entry answers: JSON objects, one per line."""
+
+    def __init__(self, max_prose_chars: int = STREAM_MAX_PROSE_CHARS):
+        self.max_prose_chars = max_prose_chars
+        self.text = ""
+        self.state = "prose"  # prose → entries → done
+        self.scanned = 0
+        self.prose_chars = 0
+        self.entries = 0
+
+    def feed(self, chunk: str) -> bool:
+        """Add streamed text. True once the entries are complete; raises StreamAbort on hopeless output."""
+        self.text += chunk
+        end = self.text.rfind("\n") + 1
+        for line in self.text[self.scanned:end].splitlines():
+            self._line(line.strip())
+            if self.state == "done":
+                break
+        self.scanned = max(self.scanned, end)
+        # A long first line of prose is caught before its newline arrives
+        pending = self.text[self.scanned:].strip()
+        if self.state == "prose" and pending and pending[0] not in "{[`" \
+                and self.prose_chars + len(pending) > self.max_prose_chars:
+            raise StreamAbort(f"{self.prose_chars + len(pending)} characters of prose before any fix entry")
+        return self.state == "done"
+
+    def _line(self, line):
+        if line.startswith("```"):
+            if self.entries:
+                self.state = "done"
+            return
+        if line.startswith("["):
+            # A JSON array is only checked once complete, by parse_patch()
+            self.state = "array"
+        if self.state == "array" or not line:
+            return
+        if line.startswith("{"):
+            try:
+                parse_entry(line)
+            except ValueError as e:
+                raise StreamAbort(f"invalid fix entry: {e}")
+            self.state = "entries"
+            self.entries += 1
+        elif self.entries:
+            # Prose after the entries: nothing more to read
+            self.state = "done"
+        else:
+            self.prose_chars += len(line)
+            if self.prose_chars > self.max_prose_chars:
+                raise StreamAbort(f"{self.prose_chars} characters of prose before any fix entry")
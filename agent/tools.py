@@ -1,19 +1,31 @@
 import subprocess
 import sys
 from pathlib import Path
-from langchain.tools import tool
 import ast
+from config import SCRIPT_RUN_MODE, SCRIPT_TIMEOUT
+from browser_pool import get_pool
+from agent.script_runner import run_script_with_driver, get_worker
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 UI_JSON_PATH = BASE_DIR / "ui_dump.json"
 SELENIUM_SCRIPT_PATH = BASE_DIR / "selenium_action_script.py"
 
+# LLM tool wrappers: langchain is only imported when one of them is first accessed
+_TOOLS = {}
 
-def read_ui_json() -> str:
+
+def tool(func):
+    """Register an LLM tool wrapper; the langchain tool is built lazily by the module __getattr__."""
+    _TOOLS[func.__name__] = func
+    return func
+
+
+def read_ui_json(path=None) -> str:
     """Read the dumped UI JSON file and return its content as a string (local helper)."""
-    if not UI_JSON_PATH.exists():
-        return "ERROR: ui_dump.json not found."
-    return UI_JSON_PATH.read_text(encoding="utf-8")
+    path = Path(path or UI_JSON_PATH)
+    if not path.exists():
+        return f"ERROR: {path.name} not found."
+    return path.read_text(encoding="utf-8")
 
 
 @tool
@@ -22,11 +34,12 @@ def read_ui_json_tool(tool_input: str) -> str:
     return read_ui_json()
 
 
-def read_selenium_script() -> str:
+def read_selenium_script(path=None) -> str:
     """Read the current selenium_action_script.py and return its content as a string (local helper)."""
-    if not SELENIUM_SCRIPT_PATH.exists():
-        return "ERROR: selenium_action_script.py not found."
-    return SELENIUM_SCRIPT_PATH.read_text(encoding="utf-8")
+    path = Path(path or SELENIUM_SCRIPT_PATH)
+    if not path.exists():
+        return f"ERROR: {path.name} not found."
+    return path.read_text(encoding="utf-8")
 
 
 @tool
@@ -35,9 +48,9 @@ def read_selenium_script_tool(tool_input: str) -> str:
     return read_selenium_script()
 
 
-def write_selenium_script(code: str) -> str:
+def write_selenium_script(code: str, path=None) -> str:
     """
-    Write valid Python code to selenium_action_script.py.
+    Write valid Python code to selenium_action_script.py (or path).
     Rejects code that is empty or invalid Python.
     (Local helper)
     """
@@ -51,7 +64,7 @@ def write_selenium_script(code: str) -> str:
         return f"REJECTED: Invalid Python → {e}"
 
     # Write only valid Python
-    SELENIUM_SCRIPT_PATH.write_text(code, encoding="utf-8")
+    Path(path or SELENIUM_SCRIPT_PATH).write_text(code, encoding="utf-8")
     return "SUCCESS: Selenium script written"
 
 
@@ -61,15 +74,19 @@ def write_selenium_script_tool(tool_input: str) -> str:
     return write_selenium_script(tool_input)
 
 
-def run_selenium() -> str:
+def run_selenium(mode: str = SCRIPT_RUN_MODE, path=None) -> str:
     """
-    Execute selenium_action_script.py only if it is valid Python.
+    Execute selenium_action_script.py (or path) only if it is valid Python.
     Returns the STDOUT and STDERR from the script execution. (Local helper)
+    mode="worker" runs it in the long-lived script worker process,
+    mode="pooled" runs it in-process on a driver leased from the browser pool,
+    mode="subprocess" runs it in a fresh interpreter.
     """
-    if not SELENIUM_SCRIPT_PATH.exists():
+    path = Path(path or SELENIUM_SCRIPT_PATH)
+    if not path.exists():
         return "ERROR: Selenium script not found"
 
-    code = SELENIUM_SCRIPT_PATH.read_text(encoding="utf-8")
+    code = path.read_text(encoding="utf-8")
 
     # Validate syntax before running
     try:
@@ -77,12 +94,22 @@ def run_selenium() -> str:
     except SyntaxError as e:
         return f"ERROR: Script is invalid → {e}"
 
+    if mode == "worker":
+        return get_worker().run(code, str(path), SCRIPT_TIMEOUT)
+
+    if mode == "pooled":
+        try:
+            with get_pool().lease() as driver:
+                return run_script_with_driver(code, driver, str(path))
+        except Exception as e:
+            return f"ERROR running Selenium: {e}"
+
     try:
         result = subprocess.run(
-            [sys.executable, str(SELENIUM_SCRIPT_PATH)],
+            [sys.executable, str(path)],
             capture_output=True,
             text=True,
-            timeout=60
+            timeout=SCRIPT_TIMEOUT
         )
 
         return f"STDOUT:\n{result.stdout}\nSTDERR:\n{result.stderr}"
@@ -93,7 +120,28 @@ def run_selenium() -> str:
         return f"ERROR running Selenium: {e}"
 
 
+def run_succeeded(output: str) -> bool:
+    """True when a run_selenium result shows no runner error, traceback or logged error."""
+    if not output.startswith("STDOUT:"):
+        return False
+    stderr = output.split("\nSTDERR:\n", 1)[-1]
+    return "Traceback (most recent call last)" not in stderr and "ERROR" not in stderr
+
+
 @tool
 def run_selenium_tool(tool_input: str) -> str:
     """Tool wrapper for LLM usage of run_selenium."""
-    return run_selenium()
\ No newline at end of file
+    return run_selenium()
+
+
+# Drop the plain wrappers so that the first access goes through __getattr__ and gets the langchain tool
+for _name in _TOOLS:
+    del globals()[_name]
+
+
+def __getattr__(name):
+    if name in _TOOLS:
+        from langchain.tools import tool as langchain_tool
+        value = globals()[name] = langchain_tool(_TOOLS[name])
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
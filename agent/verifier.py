@@ -0,0 +1,167 @@
+"""
+Fail-fast verification of a healed script.
+
+Before replaying the whole script (where every broken locator costs a full
+WebDriverWait timeout), all of its literal locators are checked against the
+live start page in a single execute_script call, without interacting with the
+page. Only when every locator matches at least one element is the full replay
+worth running.
+
+The probe only sees the page the script opens first. A missing element is only
+decisive for locators the script uses before its first interaction or
+navigation; locators further down may target elements that appear later, so
+those are left to the full replay. Invalid selectors fail anywhere.
+"""
+
+import ast
+from agent.locators import extract_locators
+from agent.script_runner import DRIVER_NAME, is_driver_factory
+
+# Counts matches for a list of [strategy, value] pairs; -1 marks an invalid selector/expression
+PROBE_JS = """
+const out = [];
+for (const [by, value] of arguments[0]) {
+    try {
+        let count = 0;
+        if (by === "ID") count = document.querySelectorAll("#" + CSS.escape(value)).length;
+        else if (by === "NAME") count = document.querySelectorAll('[name="' + CSS.escape(value) + '"]').length;
+        else if (by === "CLASS_NAME") count = document.getElementsByClassName(value).length;
+        else if (by === "TAG_NAME") count = document.getElementsByTagName(value).length;
+        else if (by === "CSS_SELECTOR") count = document.querySelectorAll(value).length;
+        else if (by === "XPATH")
+            count = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null)
+                .snapshotLength;
+        else if (by === "LINK_TEXT" || by === "PARTIAL_LINK_TEXT") {
+            for (const a of document.getElementsByTagName("a")) {
+                const text = (a.innerText || a.textContent || "").trim();
+                if (by === "LINK_TEXT" ? text === value : text.includes(value)) count++;
+            }
+        }
+        out.push({count: count, error: null});
+    } catch (e) {
+        out.push({count: -1, error: String(e.message || e)});
+    }
+}
+return out;
+"""
+
+# Driver calls after which the page may no longer be the start page (get() only from the second one on);
+# on other objects (dict.get, os.environ.get, config.get) they say nothing about the page
+DRIVER_CALLS = {"get", "execute_script", "execute_async_script", "back", "forward", "refresh"}
+# Element and ActionChains interactions, whatever name the element is bound to
+INTERACTIONS = {"click", "send_keys", "perform"}
+# Interactions whose names other objects share (dict.clear, executor.submit): only on element lookups
+ELEMENT_INTERACTIONS = {"submit", "clear"}
+ELEMENT_LOOKUPS = {"find_element", "until"}
+
+
+def driver_names(tree):
+    """Names bound to a webdriver.Chrome()-style constructor, plus the script runner's injected driver."""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and is_driver_factory(node.value):
+            names.update(t.id for t in node.targets if isinstance(t, ast.Name))
+        elif isinstance(node, ast.AnnAssign) and is_driver_factory(node.value) and isinstance(node.target, ast.Name):
+            names.add(node.target.id)
+        elif isinstance(node, ast.withitem) and is_driver_factory(node.context_expr) \
+                and isinstance(node.optional_vars, ast.Name):
+            names.add(node.optional_vars.id)
+    # A script handed its driver from elsewhere uses the conventional name
+    return (names or {"driver"}) | {DRIVER_NAME}
+
+
+def _driver_calls(tree, names):
+    """(call, method) for every call on a driver name, with driver.switch_to.x() reported as "switch_to"."""
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+            continue
+        receiver = node.func.value
+        if isinstance(receiver, ast.Name) and receiver.id in names:
+            yield node, node.func.attr
+        elif isinstance(receiver, ast.Attribute) and receiver.attr == "switch_to" \
+                and isinstance(receiver.value, ast.Name) and receiver.value.id in names:
+            yield node, "switch_to"
+
+
+def _is_lookup(node) -> bool:
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in ELEMENT_LOOKUPS
+
+
+def _element_names(tree):
+    """Names bound to driver.find_element(...) or WebDriverWait(...).until(...) results."""
+    return {target.id for node in ast.walk(tree) if isinstance(node, ast.Assign) and _is_lookup(node.value)
+            for target in node.targets if isinstance(target, ast.Name)}
+
+
+def _is_element(node, elements) -> bool:
+    return _is_lookup(node) or isinstance(node, ast.Name) and node.id in elements
+
+
+def extract_start_url(code: str):
+    """URL of the first driver.get("...") call in the script, or None."""
+    tree = ast.parse(code)
+    calls = [node for node, method in _driver_calls(tree, driver_names(tree))
+             if method == "get" and node.args and isinstance(node.args[0], ast.Constant)
+             and isinstance(node.args[0].value, str)
+             and node.args[0].value.startswith(("http://", "https://", "file://"))]
+    calls.sort(key=lambda node: (node.lineno, node.col_offset))
+    return calls[0].args[0].value if calls else None
+
+
+def first_interaction_line(code: str):
+    """Line of the first interaction or second driver.get() (the page may change after it), or None."""
+    tree = ast.parse(code)
+    events = [(node.lineno, node.col_offset, method) for node, method in _driver_calls(tree, driver_names(tree))
+              if method in DRIVER_CALLS or method == "switch_to"]
+    elements = _element_names(tree)
+    events += [(node.lineno, node.col_offset, node.func.attr) for node in ast.walk(tree)
+               if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+               and (node.func.attr in INTERACTIONS
+                    or node.func.attr in ELEMENT_INTERACTIONS and _is_element(node.func.value, elements))]
+    loaded = False
+    for line, _, method in sorted(events):
+        if method == "get":
+            if loaded:
+                return line
+            loaded = True
+        else:
+            return line
+    return None
+
+
+def probe_locators(driver, locators):
+    """Match counts for locators on the page currently loaded in driver (one round trip)."""
+    results = driver.execute_script(PROBE_JS, [[loc["by"], loc["value"]] for loc in locators]) or []
+    return [dict(loc, count=r["count"], error=r["error"]) for loc, r in zip(locators, results)]
+
+
+def check_locators(code: str, driver, url=None):
+    """
+    Load the script's start page and probe all of its locators.
+    Returns {"url", "locators", "resolved", "unresolved", "blocking"}: unresolved lists every locator
+    without a match, blocking the ones that prove the script broken (invalid, or missing although used
+    on the start page); resolved is True when nothing is blocking.
+    """
+    url = url or extract_start_url(code)
+    if not url:
+        raise ValueError("script has no literal start URL to probe")
+    locators = extract_locators(code)
+    driver.get(url)
+    report = probe_locators(driver, locators) if locators else []
+    unresolved = [r for r in report if r["count"] <= 0]
+    boundary = first_interaction_line(code)
+    blocking = [r for r in unresolved if r["count"] < 0 or boundary is None or r["line"] <= boundary]
+    return {"url": url, "locators": report, "resolved": not blocking, "unresolved": unresolved,
+            "blocking": blocking}
+
+
+def format_report(report) -> str:
+    lines = [f"Locator check on {report['url']}:"]
+    for r in report["locators"]:
+        mark = "✅" if r["count"] > 0 else "❌" if r in report["blocking"] else "❔"
+        detail = f"invalid ({r['error']})" if r["count"] < 0 else f"{r['count']} match(es)"
+        lines.append(f"  {mark} line {r['line']}: By.{r['by']} {r['value']!r} → {detail}")
+    deferred = len(report["unresolved"]) - len(report["blocking"])
+    if deferred:
+        lines.append(f"  ❔ {deferred} locator(s) used after the first interaction are left to the full replay")
+    return "\n".join(lines)
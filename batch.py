@@ -0,0 +1,138 @@
+"""
+Batch self-healing: dump, heal and verify many (url, script) pairs concurrently.
+
+Each job gets its own workspace directory with a copy of its script, its own
+ui_dump.json and a log, so jobs never share the global ui_dump.json /
+selenium_action_script.py. Browser stages (dump, verify) and LLM calls are
+limited separately. Per-job results and stage timings go to summary.json.
+
+Usage:
+    python batch.py manifest.json [--jobs 8] [--max-browsers 2] [--max-llm 4] [--out batch_runs]
+
+The manifest is a JSON list of {"url": ..., "script": ...} objects or a CSV
+file with url,script columns. Script paths are relative to the manifest.
+"""
+
+import argparse
+import csv
+import json
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from config import BATCH_JOBS, BATCH_MAX_BROWSERS, BATCH_MAX_LLM_CALLS, BATCH_OUTPUT_DIR
+from log_capture import capture_thread_output
+from tracing import span
+from main import dump_ui, run_llm_agent
+
+
+def load_manifest(path):
+    """Read (url, script) pairs from a JSON or CSV manifest; returns a list of job dicts."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            entries = list(csv.DictReader(f))
+    else:
+        entries = json.loads(path.read_text(encoding="utf-8"))
+
+    jobs = []
+    for i, entry in enumerate(entries):
+        script = Path(entry["script"])
+        if not script.is_absolute():
+            script = path.parent / script
+        slug = re.sub(r"[^\w.-]+", "_", f"{script.stem}")[:40]
+        jobs.append({"id": f"{i:04d}_{slug}", "url": entry["url"].strip(), "script": script})
+    return jobs
+
+
+def run_job(job, workspace: Path, browser_gate, llm_gate):
+    """Run dump → heal → verify for one job inside its workspace and return its result record."""
+    workspace.mkdir(parents=True, exist_ok=True)
+    script_path = workspace / "selenium_action_script.py"
+    ui_path = workspace / "ui_dump.json"
+    record = {"id": job["id"], "url": job["url"], "script": str(job["script"]),
+              "workspace": str(workspace), "timings": {}}
+    start = time.perf_counter()
+
+    with open(workspace / "log.txt", "w", encoding="utf-8") as log, capture_thread_output(log), \
+            span("batch_job", job=job["id"], url=job["url"]):
+        try:
+            shutil.copyfile(job["script"], script_path)
+
+            t = time.perf_counter()
+            with browser_gate:
+                elements = dump_ui(job["url"], path=ui_path, script_path=script_path)
+            record["timings"]["dump"] = round(time.perf_counter() - t, 3)
+            record["elements"] = len(elements)
+
+            t = time.perf_counter()
+            result = run_llm_agent(job["url"], ui_path, script_path, llm_gate=llm_gate, browser_gate=browser_gate)
+            verify_seconds = result.pop("verify_seconds", 0.0)
+            record["timings"]["heal"] = round(time.perf_counter() - t - verify_seconds, 3)
+            record["timings"]["verify"] = verify_seconds
+            result.pop("output", None)
+            record.update(result)
+        except Exception as e:
+            print(f"❌ Job failed: {e}")
+            record.update(status="error", verified=False, reason=str(e))
+
+    record["timings"]["total"] = round(time.perf_counter() - start, 3)
+    (workspace / "result.json").write_text(json.dumps(record, indent=2), encoding="utf-8")
+    return record
+
+
+def run_batch(jobs, out_dir=BATCH_OUTPUT_DIR, max_jobs=BATCH_JOBS,
+              max_browsers=BATCH_MAX_BROWSERS, max_llm_calls=BATCH_MAX_LLM_CALLS):
+    """Run all jobs concurrently and write summary.json; returns the summary dict."""
+    run_dir = Path(out_dir) / time.strftime("%Y%m%d-%H%M%S")
+    run_dir.mkdir(parents=True, exist_ok=True)
+    browser_gate = threading.BoundedSemaphore(max_browsers)
+    llm_gate = threading.BoundedSemaphore(max_llm_calls)
+
+    start = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=max_jobs) as executor:
+        futures = {executor.submit(run_job, job, run_dir / job["id"], browser_gate, llm_gate): job for job in jobs}
+        for future in as_completed(futures):
+            record = future.result()
+            results.append(record)
+            mark = "✅" if record.get("verified") else "❌"
+            print(f"{mark} [{len(results)}/{len(jobs)}] {record['id']} — {record.get('status')} "
+                  f"in {record['timings']['total']}s")
+
+    results.sort(key=lambda r: r["id"])
+    statuses = {}
+    for r in results:
+        statuses[r.get("status")] = statuses.get(r.get("status"), 0) + 1
+    summary = {
+        "jobs": len(results),
+        "verified": sum(1 for r in results if r.get("verified")),
+        "statuses": statuses,
+        "wall_seconds": round(time.perf_counter() - start, 3),
+        "limits": {"jobs": max_jobs, "browsers": max_browsers, "llm_calls": max_llm_calls},
+        "results": results,
+    }
+    (run_dir / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    print(f"\n📊 {summary['verified']}/{summary['jobs']} verified in {summary['wall_seconds']}s "
+          f"— summary written to {run_dir / 'summary.json'}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("manifest")
+    parser.add_argument("--jobs", type=int, default=BATCH_JOBS, help="jobs in flight at once")
+    parser.add_argument("--max-browsers", type=int, default=BATCH_MAX_BROWSERS, help="concurrent dump/verify stages")
+    parser.add_argument("--max-llm", type=int, default=BATCH_MAX_LLM_CALLS, help="concurrent LLM calls")
+    parser.add_argument("--out", default=BATCH_OUTPUT_DIR, help="directory for job workspaces and summary.json")
+    args = parser.parse_args()
+
+    jobs = load_manifest(args.manifest)
+    print(f"🗂️ {len(jobs)} jobs from {args.manifest}")
+    run_batch(jobs, args.out, args.jobs, args.max_browsers, args.max_llm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Offline dump + heal throughput benchmark.
+
+Serves the bundled index.html mockup and generated pages of growing size from a
+local HTTP server. Every generated page comes with a Selenium script whose
+locators were broken on purpose (seeded): some breaks are trivial renames the
+heuristic healer handles, one needs the "LLM". The LLM is a local stub server
+speaking the chat completions API: it returns the canned ground-truth fix after a
+configurable delay, so no network is used but the real LLM client path runs.
+
+Measured per page: dump_ui time and elements/sec, raw vs prompt tokens, heal
+end-to-end latency (including verification), heal status and verification.
+Results are written as JSON for regression tracking.
+
+Usage:
+    python benchmarks/bench_heal.py [--sizes 1000 5000 10000 50000] [--seed 7]
+                                    [--llm-latency 0.0] [--out results.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from common import BASE_DIR, serve_directory, serve_stub_llm, server_url, environment
+
+SCRIPT_TEMPLATE = '''from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+driver = webdriver.Chrome()
+driver.get("{url}")
+
+try:
+    wait = WebDriverWait(driver, 5)
+
+{fix_email}    email = wait.until(EC.presence_of_element_located((By.ID, "{email_id}")))
+    email.send_keys("bench@example.com")
+
+{fix_password}    password = wait.until(EC.presence_of_element_located((By.ID, "{password_id}")))
+    password.send_keys("secret")
+
+{fix_submit}    submit = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[text()='{submit_text}']")))
+    submit.click()
+    print("BENCH OK")
+
+finally:
+    driver.quit()
+'''
+
+
+def generate_page(nodes: int, rng: random.Random):
+    """
+    HTML page with roughly `nodes` elements: a login form plus filler sections that
+    mix plain markup with links, inputs and buttons. Returns (html, truth) where truth
+    holds the real locator values of the login form.
+    """
+    truth = {
+        "email_id": "login-email",
+        "password_id": f"pw-{rng.randrange(10**6):06d}",
+        "submit_text": "Sign in",
+    }
+    parts = [
+        "<!doctype html><html><head><meta charset='utf-8'><title>bench</title></head><body>",
+        "<form onsubmit='return false'>",
+        f"<label for='{truth['email_id']}'>Email</label><input type='email' id='{truth['email_id']}' name='email'>",
+        f"<label for='{truth['password_id']}'>Password</label>"
+        f"<input type='password' id='{truth['password_id']}' name='password'>",
+        f"<button type='button' class='btn primary'>{truth['submit_text']}</button>",
+        "</form>",
+    ]
+    count = 8
+    section = 0
+    while count < nodes:
+        section += 1
+        parts.append(f"<section class='card c{section % 7}'><h3>Section {section}</h3>")
+        for j in range(rng.randint(3, 8)):
+            kind = rng.random()
+            if kind < 0.15:
+                parts.append(f"<a href='/item/{section}/{j}?ref=bench' class='link'>Item {section}.{j}</a>")
+            elif kind < 0.25:
+                parts.append(f"<input type='text' id='field-{section}-{j}' placeholder='Field {section}.{j}'>")
+            elif kind < 0.3:
+                parts.append(f"<button class='btn' type='button'>Action {section}.{j}</button>")
+            else:
+                parts.append(f"<div class='row'><span>Row {section}.{j}</span><p>Lorem ipsum {j}</p></div>")
+                count += 2
+            count += 1
+        parts.append("</section>")
+        count += 2
+    parts.append("</body></html>")
+    return "".join(parts), truth
+
+
+def seeded_scripts(url: str, truth):
+    """(broken script, canned LLM fix). The email/submit breaks are trivial, the password id is not."""
+    broken = SCRIPT_TEMPLATE.format(
+        url=url, email_id="loginEmail", password_id="login-password", submit_text="Sign In",
+        fix_email="", fix_password="", fix_submit="",
+    )
+    fixed = SCRIPT_TEMPLATE.format(
+        url=url, email_id=truth["email_id"], password_id=truth["password_id"], submit_text=truth["submit_text"],
+        fix_email=f"    # FIX: ID 'loginEmail' → '{truth['email_id']}' from UI JSON\n",
+        fix_password=f"    # FIX: ID 'login-password' → '{truth['password_id']}' from UI JSON\n",
+        fix_submit=f"    # FIX: button text 'Sign In' → '{truth['submit_text']}' from UI JSON\n",
+    )
+    return broken, fixed
+
+
+def seeded_mockup_scripts(url: str):
+    """The bundled mockup with its login email id and Sign Up tab text broken."""
+    original = (BASE_DIR / "selenium_action_script.py").read_text(encoding="utf-8")
+    start_url = "https://novaivo.github.io/mockup-website-for-testing-selenium-agent/"
+    fixed = original.replace(start_url, url)
+    broken = fixed.replace('(By.ID, "loginEmail"))\n    )\n    login_email',
+                           '(By.ID, "login_email"))\n    )\n    login_email')
+    broken = broken.replace("[text()='Sign Up']", "[text()='Signup']")
+    return broken, fixed
+
+
+class CannedFix:
+    """
+    Responder for the stub LLM server: always answers with the current page's ground-truth fix,
+    in the format the prompt asks for (the whole script, or one fix entry per listed locator).
+    """
+
+    def __init__(self):
+        self.broken_code, self.fixed_code = "", ""
+
+    def __call__(self, messages):
+        prompt = str(messages[-1]["content"])
+        if "Locators that match no element:" not in prompt:
+            return f"```python\n{self.fixed_code}\n```"
+        from agent.locators import extract_locators
+        # The scripts differ only in locator values, so the n-th locator of one is the n-th of the other
+        pairs = list(zip(extract_locators(self.broken_code), extract_locators(self.fixed_code)))
+        listed = prompt.split("Locators that match no element:", 1)[1].split("Instructions:", 1)[0]
+        entries = []
+        for old, new in pairs:
+            if old["value"] != new["value"] and f"By.{old['by']} {old['value']!r}" in listed:
+                entries.append(json.dumps({"line": old["line"], "by": old["by"], "old": old["value"],
+                                           "new": new["value"], "why": "ground truth"}))
+        return "\n".join(dict.fromkeys(entries))
+
+
+def bench_page(main, llm_server, name, url, broken, fixed, workdir: Path):
+    from agent.prompt_encoder import estimate_tokens
+
+    ui_path = workdir / f"{name}.json"
+    script_path = workdir / f"{name}.py"
+    script_path.write_text(broken, encoding="utf-8")
+    llm_server.responder.broken_code, llm_server.responder.fixed_code = broken, fixed
+    first_request = len(llm_server.requests)
+
+    start = time.perf_counter()
+    ui_data = main.dump_ui(url, path=ui_path, incremental=False, script_path=script_path)
+    dump_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = main.run_llm_agent(url, ui_path, script_path)
+    heal_seconds = time.perf_counter() - start
+    prompts = [r["messages"][-1]["content"] for r in llm_server.requests[first_request:]]
+
+    return {
+        "page": name,
+        "elements": len(ui_data),
+        "dump_seconds": round(dump_seconds, 4),
+        "elements_per_second": round(len(ui_data) / dump_seconds, 1) if dump_seconds else None,
+        "raw_json_tokens": estimate_tokens(json.dumps(list(ui_data))),
+        "prompt_tokens": estimate_tokens(prompts[-1]) if prompts else 0,
+        "llm_calls": len(prompts),
+        "heal_seconds": round(heal_seconds, 4),
+        "verify_seconds": result.get("verify_seconds"),
+        "status": result["status"],
+        "verified": result["verified"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000, 50000])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated seconds per LLM call")
+    parser.add_argument("--out", default=None, help="result JSON path (default benchmarks/results/heal-<time>.json)")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_heal_"))
+    shutil.copyfile(BASE_DIR / "index.html", workdir / "index.html")
+    server = serve_directory(workdir)
+
+    # Keep the fix cache, traces and verification markers of the benchmark out of the repo
+    out = Path(args.out or BASE_DIR / "benchmarks" / "results" / f"heal-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    out = out.resolve()
+    os.chdir(workdir)
+
+    # The real LLM client (pooling, rate limits, retries) talking to a local stub server
+    import main as heal_main
+    from agent.llm_client import LLMClient, set_client
+    llm_server = serve_stub_llm(CannedFix(), latency=args.llm_latency)
+    set_client(LLMClient(base_url=server_url(llm_server, "v1"), api_key="stub"))
+
+    rng = random.Random(args.seed)
+    pages = []
+    mock_url = server_url(server, "index.html")
+    pages.append(("mockup", mock_url, *seeded_mockup_scripts(mock_url)))
+    for size in args.sizes:
+        html, truth = generate_page(size, rng)
+        (workdir / f"page_{size}.html").write_text(html, encoding="utf-8")
+        url = server_url(server, f"page_{size}.html")
+        pages.append((f"page_{size}", url, *seeded_scripts(url, truth)))
+
+    results = []
+    try:
+        for name, url, broken, fixed in pages:
+            print(f"\n=== {name} ===")
+            record = bench_page(heal_main, llm_server, name, url, broken, fixed, workdir)
+            results.append(record)
+    finally:
+        server.shutdown()
+        llm_server.shutdown()
+
+    print(f"\n{'page':<14}{'elements':>9}{'dump s':>9}{'el/s':>10}{'raw tok':>9}{'prompt tok':>11}"
+          f"{'heal s':>9}{'status':>11}{'ok':>5}")
+    for r in results:
+        print(f"{r['page']:<14}{r['elements']:>9}{r['dump_seconds']:>9}{r['elements_per_second'] or 0:>10}"
+              f"{r['raw_json_tokens']:>9}{r['prompt_tokens']:>11}{r['heal_seconds']:>9}{r['status']:>11}"
+              f"{'✅' if r['verified'] else '❌':>5}")
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "benchmark": "heal",
+        "seed": args.seed,
+        "llm_latency": args.llm_latency,
+        "environment": environment(),
+        "results": results,
+    }, indent=2), encoding="utf-8")
+    print(f"\n📊 Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Element similarity index vs linear scan.
+
+Builds synthetic dumps of growing size, breaks locators of random elements
+(renamed ids/names, edited texts) and compares ElementIndex queries with the
+linear rank_elements() scan: build time, per-query latency (p50/p95) and how
+often both agree on the best element's score.
+
+Usage:
+    python benchmarks/bench_index.py [--sizes 1000 10000 50000] [--queries 200] [--scan-queries 10]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+from common import environment
+from agent.element_index import ElementIndex
+from agent.locators import rank_elements
+
+WORDS = ["login", "email", "password", "submit", "search", "cart", "profile", "menu",
+         "item", "price", "signup", "name", "phone", "city", "country", "save"]
+
+
+def synthetic_dump(n: int, rng: random.Random):
+    elements = []
+    for i in range(n):
+        a, b = rng.choice(WORDS), rng.choice(WORDS)
+        tag = rng.choice(["input", "button", "a", "label", "img"])
+        elements.append({
+            "tag": tag,
+            "text": f"{b.title()} {a} {i}" if tag in ("button", "a", "label") else "",
+            "attributes": {"id": f"{a}-{b}-{i}", "name": f"{a}_{b}_{i}", "class": f"c{i % 17} {a}"},
+            "visible": True, "enabled": True,
+            "location": {"x": rng.randint(0, 1200), "y": i * 4},
+            "size": {"width": rng.randint(40, 300), "height": 24},
+        })
+    return elements
+
+
+def broken_locator(element, rng: random.Random):
+    """A locator for element as it might have looked before a small rename."""
+    attrs = element["attributes"]
+    kind = rng.choice(["id", "name", "text"] if element["text"] else ["id", "name"])
+    if kind == "id":
+        return "ID", attrs["id"].replace("-", "_", 1)
+    if kind == "name":
+        return "NAME", attrs["name"].replace("_", "", 1)
+    return "XPATH", f"//{element['tag']}[text()='{element['text'].lower()}']"
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def bench_size(n, queries, scan_queries, rng):
+    ui_data = synthetic_dump(n, rng)
+    start = time.perf_counter()
+    index = ElementIndex(ui_data)
+    build = time.perf_counter() - start
+
+    targets = [rng.randrange(n) for _ in range(queries)]
+    locators = [broken_locator(ui_data[i], rng) for i in targets]
+    candidate_ms, rank_ms, found = [], [], 0
+    for i, (by, value) in zip(targets, locators):
+        t = time.perf_counter()
+        top = index.candidates(by, value, 5)
+        candidate_ms.append((time.perf_counter() - t) * 1000)
+        t = time.perf_counter()
+        index.rank(by, value, 5)
+        rank_ms.append((time.perf_counter() - t) * 1000)
+        found += i in top
+
+    scan_ms, agree = [], 0
+    for by, value in locators[:scan_queries]:
+        t = time.perf_counter()
+        scanned = rank_elements(ui_data, by, value, 1)
+        scan_ms.append((time.perf_counter() - t) * 1000)
+        ranked = index.rank(by, value, 1)
+        agree += bool(scanned and ranked and abs(scanned[0][1] - ranked[0][1]) < 1e-9)
+
+    return {
+        "elements": n,
+        "build_seconds": round(build, 3),
+        "candidates_ms_p50": round(statistics.median(candidate_ms), 3),
+        "candidates_ms_p95": round(percentile(candidate_ms, 0.95), 3),
+        "rank_ms_p50": round(statistics.median(rank_ms), 3),
+        "rank_ms_p95": round(percentile(rank_ms, 0.95), 3),
+        "scan_ms_p50": round(statistics.median(scan_ms), 1) if scan_ms else None,
+        "target_in_top5": round(found / queries, 3),
+        "best_score_agreement": round(agree / len(scan_ms), 3) if scan_ms else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=10, help="queries also run through the linear scan")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default=None, help="also write the results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = [bench_size(n, args.queries, args.scan_queries, rng) for n in args.sizes]
+
+    print(f"{'elements':>9}{'build s':>9}{'cand p50':>10}{'cand p95':>10}{'rank p50':>10}{'scan p50':>10}"
+          f"{'top5 hit':>10}{'agree':>7}")
+    for r in results:
+        print(f"{r['elements']:>9}{r['build_seconds']:>9}{r['candidates_ms_p50']:>10}{r['candidates_ms_p95']:>10}"
+              f"{r['rank_ms_p50']:>10}{r['scan_ms_p50'] or '-':>10}{r['target_in_top5']:>10}"
+              f"{r['best_score_agreement'] or '-':>7}")
+    print("(latencies in ms)")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps({"benchmark": "element_index", "seed": args.seed,
+                                              "environment": environment(), "results": results}, indent=2),
+                                  encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
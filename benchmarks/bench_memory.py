@@ -0,0 +1,108 @@
+"""
+Peak memory of dump_ui on very large pages: streamed batches vs one list.
+
+Generates pages with N interactive elements, serves them locally and dumps each
+one in a fresh Python process (so peaks do not carry over), once with
+UI_DUMP_STREAMING and once with the list path. Reports the process's peak RSS
+and its growth over the RSS right before the dump (the browser runs in its own
+process and is not counted).
+
+Usage:
+    python benchmarks/bench_memory.py [--sizes 10000 50000 100000] [--out results.json]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import BASE_DIR, environment, serve_directory, server_url
+
+ROW = ('<div class="row"><label for="f{i}">Field {i}</label>'
+       '<input id="f{i}" name="field_{i}" class="form-control" placeholder="Value {i}">'
+       '<button id="b{i}" class="btn btn-primary">Save {i}</button><a href="#r{i}">Row {i}</a></div>\n')
+ELEMENTS_PER_ROW = 4
+
+
+def write_page(directory: Path, elements: int) -> str:
+    name = f"page_{elements}.html"
+    with open(directory / name, "w", encoding="utf-8") as f:
+        f.write("<!doctype html><html><body><form>\n")
+        for i in range(elements // ELEMENTS_PER_ROW):
+            f.write(ROW.format(i=i))
+        f.write("</form></body></html>\n")
+    return name
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def child(url: str, streaming: bool, workdir: str):
+    """Run one dump in this process and print its measurements as JSON."""
+    import main
+    main.UI_DUMP_STREAMING = streaming
+    # Warm the driver first so the browser start-up is not part of the measurement
+    with main.get_pool().lease() as driver:
+        driver.get("about:blank")
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    ui_data = main.dump_ui(url, path=Path(workdir) / "ui_dump.json", incremental=False)
+    seconds = time.perf_counter() - start
+    peak = peak_rss_mb()
+    print(json.dumps({"elements": len(ui_data), "seconds": round(seconds, 2), "rss_before_mb": before,
+                      "peak_rss_mb": peak, "growth_mb": round(peak - before, 1)}))
+
+
+def measure(url: str, streaming: bool):
+    with tempfile.TemporaryDirectory() as workdir:
+        out = subprocess.run([sys.executable, __file__, "--child", url, "--streaming", str(int(streaming)),
+                              "--workdir", workdir], capture_output=True, text=True, cwd=BASE_DIR)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "child failed")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--out", default=None, help="also write the results as JSON")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--streaming", type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, bool(args.streaming), args.workdir)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as pages:
+        server = serve_directory(pages)
+        try:
+            for size in args.sizes:
+                url = server_url(server, write_page(Path(pages), size))
+                for streaming in (False, True):
+                    r = dict(measure(url, streaming), size=size, mode="stream" if streaming else "list")
+                    results.append(r)
+        finally:
+            server.shutdown()
+
+    print(f"{'size':>8}{'mode':>8}{'elements':>10}{'seconds':>9}{'peak MB':>9}{'growth MB':>11}")
+    for r in results:
+        print(f"{r['size']:>8}{r['mode']:>8}{r['elements']:>10}{r['seconds']:>9}{r['peak_rss_mb']:>9}"
+              f"{r['growth_mb']:>11}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps({"benchmark": "dump_memory", "environment": environment(),
+                                              "results": results}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
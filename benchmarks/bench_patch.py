@@ -0,0 +1,101 @@
+"""
+Patch answers vs whole-script answers.
+
+Generates Selenium scripts of growing length with a fixed number of broken
+locators and lets a stub LLM stream the fix in both formats at a constant
+generation rate (chunk size / delay ≈ tokens per second): the whole fixed
+script, or one fix entry per broken locator. Reports generation time, output
+size and whether both answers produce the same script.
+
+Usage:
+    python benchmarks/bench_patch.py [--lines 50 200 800] [--broken 3] [--chars-per-second 400]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from common import environment, serve_stub_llm, server_url
+import main as heal_main
+from agent.fix_patch import apply_patch
+from agent.llm_client import LLMClient
+
+HEADER = "from selenium import webdriver\nfrom selenium.webdriver.common.by import By\n\n" \
+         "driver = webdriver.Chrome()\ndriver.get(\"http://localhost/form\")\n"
+
+
+def synthetic_script(lines: int, broken: int):
+    """(script, fix entries) with one locator per step; the first `broken` steps use stale ids."""
+    steps, entries = [], []
+    for i in range(lines):
+        stale = i < broken
+        value = f"field_{i}" if stale else f"field-{i}"
+        steps.append(f"driver.find_element(By.ID, \"{value}\").send_keys(\"value {i}\")")
+        if stale:
+            entries.append({"line": HEADER.count("\n") + i + 1, "by": "ID", "old": value,
+                            "new": f"field-{i}", "why": "id renamed"})
+    return HEADER + "\n".join(steps) + "\n", entries
+
+
+class Responder:
+    """Answers in whichever format the prompt asks for, with the ground-truth fix."""
+
+    def __init__(self):
+        self.patch_text, self.script_text = "", ""
+
+    def __call__(self, messages):
+        prompt = str(messages[-1]["content"])
+        return self.patch_text if prompt.startswith("patch") else self.script_text
+
+
+def bench_length(client, server, responder, lines, broken):
+    script, entries = synthetic_script(lines, broken)
+    fixed, _ = apply_patch(script, entries)
+    responder.patch_text = "\n".join(json.dumps(e) for e in entries)
+    responder.script_text = f"```python\n{fixed}```"
+
+    result = {"lines": lines, "broken": broken}
+    for fix_format in ("script", "patch"):
+        start = time.perf_counter()
+        raw, aborted = heal_main.stream_answer(client, [("human", f"{fix_format} fix")], fix_format)
+        code, problem = heal_main.code_from_answer(raw.strip(), fix_format, script)
+        result[f"{fix_format}_seconds"] = round(time.perf_counter() - start, 3)
+        result[f"{fix_format}_chars"] = len(raw)
+        result[f"{fix_format}_ok"] = not aborted and not problem and code.strip() == fixed.strip()
+    result["speedup"] = round(result["script_seconds"] / max(result["patch_seconds"], 1e-6), 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[50, 200, 800])
+    parser.add_argument("--broken", type=int, default=3)
+    parser.add_argument("--chars-per-second", type=float, default=400.0,
+                        help="stub generation rate (~100 tokens/s at 4 characters per token)")
+    parser.add_argument("--out", default=None, help="also write the results as JSON")
+    args = parser.parse_args()
+
+    chunk_size = 8
+    responder = Responder()
+    server = serve_stub_llm(responder, chunk_size=chunk_size, chunk_delay=chunk_size / args.chars_per_second)
+    client = LLMClient(base_url=server_url(server, "v1"), api_key="stub", requests_per_minute=10_000)
+    try:
+        results = [bench_length(client, server, responder, n, args.broken) for n in args.lines]
+    finally:
+        client.close()
+        server.shutdown()
+
+    print(f"{'lines':>6}{'script s':>10}{'patch s':>9}{'script ch':>11}{'patch ch':>10}{'speedup':>9}{'same':>6}")
+    for r in results:
+        print(f"{r['lines']:>6}{r['script_seconds']:>10}{r['patch_seconds']:>9}{r['script_chars']:>11}"
+              f"{r['patch_chars']:>10}{r['speedup']:>8}x{str(r['script_ok'] and r['patch_ok']):>6}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps({"benchmark": "patch_format", "chars_per_second": args.chars_per_second,
+                                              "environment": environment(), "results": results}, indent=2),
+                                  encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
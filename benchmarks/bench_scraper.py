@@ -0,0 +1,59 @@
+"""
+Compare the legacy per-element scraper with the single-round-trip snapshot engine.
+
+Serves the bundled index.html mockup from a local HTTP server, scrapes it with
+both engines and prints timings plus a schema/count comparison.
+
+Usage:
+    python benchmarks/bench_scraper.py [--runs 5] [--mode query|all]
+"""
+
+import argparse
+import statistics
+import time
+
+from common import BASE_DIR, serve_directory, server_url, headless_driver
+from ui_scraper import scrape_ui
+
+
+def time_engine(driver, engine, mode, runs):
+    timings = []
+    ui_data = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        ui_data = scrape_ui(driver, engine, mode)
+        timings.append(time.perf_counter() - start)
+    return timings, ui_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mode", choices=("query", "all"), default="query")
+    args = parser.parse_args()
+
+    server = serve_directory(BASE_DIR)
+    url = server_url(server, "index.html")
+    driver = headless_driver()
+
+    try:
+        driver.get(url)
+        results = {}
+        for engine in ("legacy", "snapshot"):
+            timings, ui_data = time_engine(driver, engine, args.mode, args.runs)
+            results[engine] = ui_data
+            print(f"{engine:>8}: {len(ui_data):4d} elements  "
+                  f"median {statistics.median(timings) * 1000:8.1f} ms  "
+                  f"min {min(timings) * 1000:8.1f} ms")
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    legacy, snapshot = results["legacy"], results["snapshot"]
+    same_keys = all(set(a) == set(b) for a, b in zip(legacy, snapshot))
+    same_ids = [e["attributes"].get("id") for e in legacy] == [e["attributes"].get("id") for e in snapshot]
+    print(f"schema match: {same_keys}  element order match: {same_ids}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Import-time budget check for the CLI and tool entry points.
+
+Each module is imported in a fresh interpreter (best of --runs), and the heavy
+dependencies that got loaded along the way are listed. Exits with status 1 when
+a module is over its budget or eagerly imports a dependency it should load
+lazily, so it can gate CI.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--out results.json]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from common import BASE_DIR, environment
+
+# module: import budget in milliseconds
+BUDGETS_MS = {
+    "agent.tools": 150,
+    "agent.llm_agent": 100,
+    "ui_scraper": 50,
+    "browser_pool": 100,
+    "main": 250,
+    "batch": 300,
+    "tk_ui": 500,
+    "web_app": 600,
+}
+
+# Must not be imported until a browser / LLM / langsmith run actually needs them
+LAZY_DEPENDENCIES = ["selenium", "langchain", "langchain_core", "langchain_openai", "langsmith", "openai"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+try:
+    import {module}
+except ImportError as e:
+    print(json.dumps({{"skipped": str(e)}}))
+    raise SystemExit
+seconds = time.perf_counter() - start
+print(json.dumps({{"ms": seconds * 1000, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, runs: int):
+    best, loaded = None, []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(module=module, lazy=LAZY_DEPENDENCIES)],
+                             cwd=BASE_DIR, capture_output=True, text=True, check=True)
+        data = json.loads(out.stdout.strip().splitlines()[-1])
+        if "skipped" in data:
+            return {"module": module, "skipped": data["skipped"]}
+        best = data["ms"] if best is None else min(best, data["ms"])
+        loaded = data["loaded"]
+    budget = BUDGETS_MS[module]
+    return {
+        "module": module,
+        "import_ms": round(best, 1),
+        "budget_ms": budget,
+        "eager_dependencies": loaded,
+        "ok": best <= budget and not loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--out", default=None, help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = [measure(module, args.runs) for module in BUDGETS_MS]
+
+    print(f"{'module':<18}{'import ms':>11}{'budget':>9}  eager dependencies")
+    for r in results:
+        if "skipped" in r:
+            print(f"{r['module']:<18}{'skipped':>11}{'':>9}  {r['skipped']}")
+            continue
+        mark = "✅" if r["ok"] else "❌"
+        print(f"{r['module']:<18}{r['import_ms']:>11}{r['budget_ms']:>9}  {', '.join(r['eager_dependencies']) or '-'} {mark}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps({"benchmark": "startup", "runs": args.runs,
+                                              "environment": environment(), "results": results}, indent=2),
+                                  encoding="utf-8")
+
+    failed = [r["module"] for r in results if not r.get("ok", True)]
+    if failed:
+        print(f"\n❌ Over budget or eager imports: {', '.join(failed)}")
+        sys.exit(1)
+    print("\n✅ All entry points within their import budget")
+
+
+if __name__ == "__main__":
+    main()
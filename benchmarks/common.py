@@ -0,0 +1,156 @@
+"""Shared helpers for the benchmark scripts: local HTTP servers (pages, stub LLM) and headless Chrome."""
+
+import functools
+import http.server
+import json
+import platform
+import sys
+import threading
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+
+def serve_directory(directory):
+    """Serve directory on an ephemeral localhost port from a daemon thread; returns the server."""
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(directory))
+    handler.log_message = lambda *args: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def server_url(server, path=""):
+    return f"http://127.0.0.1:{server.server_address[1]}/{path}"
+
+
+class StubLLMHandler(http.server.BaseHTTPRequestHandler):
+    """
+    OpenAI-compatible POST .../chat/completions answering with server.responder(messages);
+    "stream": true requests get the answer as SSE chunks of server.chunk_size characters.
+    """
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        server = self.server
+        with server.lock:
+            server.requests.append(body)
+            throttle = server.throttle_first > 0
+            server.throttle_first -= throttle
+        if throttle:
+            self._reply(429, {"error": {"message": "rate limited", "type": "rate_limit"}}, {"Retry-After": "0"})
+            return
+        if server.latency:
+            threading.Event().wait(server.latency)
+        content = server.responder(body["messages"])
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body["messages"]) // 4
+        completion_tokens = len(content) // 4
+        if body.get("stream"):
+            self._stream(body, content, prompt_tokens)
+            return
+        self._reply(200, {
+            "id": f"stub-{len(server.requests)}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, body, content, prompt_tokens):
+        server = self.server
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        base = {"id": f"stub-{len(server.requests)}", "object": "chat.completion.chunk", "created": 0,
+                "model": body.get("model", "stub")}
+        deltas = [{"role": "assistant", "content": ""}]
+        deltas += [{"content": content[i:i + server.chunk_size]} for i in range(0, len(content), server.chunk_size)]
+        sent = 0
+        try:
+            for delta in deltas:
+                self._event(dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}]))
+                sent += len(delta["content"])
+                if server.chunk_delay:
+                    threading.Event().wait(server.chunk_delay)
+            self._event(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+            if (body.get("stream_options") or {}).get("include_usage"):
+                completion_tokens = len(content) // 4
+                self._event(dict(base, choices=[], usage={
+                    "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens}))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client hung up mid-answer: generation would stop here
+            with server.lock:
+                server.aborted += 1
+        finally:
+            with server.lock:
+                server.streamed_chars += sent
+
+    def _event(self, payload):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_stub_llm(responder, latency: float = 0.0, throttle_first: int = 0, chunk_size: int = 16,
+                   chunk_delay: float = 0.0):
+    """
+    Local stand-in for the chat completions API. responder(messages) returns the reply text;
+    the first throttle_first requests get a 429. Requests are recorded in server.requests;
+    streamed answers count their sent characters in server.streamed_chars and client
+    disconnects in server.aborted.
+    Use server_url(server, "v1") as the LLM base URL.
+    """
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubLLMHandler)
+    server.responder = responder
+    server.latency = latency
+    server.throttle_first = throttle_first
+    server.chunk_size = chunk_size
+    server.chunk_delay = chunk_delay
+    server.streamed_chars = 0
+    server.aborted = 0
+    server.requests = []
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def headless_driver():
+    from selenium import webdriver
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    return webdriver.Chrome(options=options)
+
+
+def environment():
+    """Machine/library metadata stored with every result file."""
+    try:
+        import selenium
+        selenium_version = selenium.__version__
+    except ImportError:
+        selenium_version = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "selenium": selenium_version,
+    }
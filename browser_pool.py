@@ -0,0 +1,234 @@
+"""
+Warm pool of headless Chrome drivers.
+
+dump_ui, run_llm_agent and the script runner lease drivers from here instead of
+starting a cold browser each time. Returned drivers are reset (cookies and
+storage of every origin the lease visited, tabs, blank page) and health-checked
+before they are handed out again; a driver whose state cannot be cleared
+browser-wide is recycled instead.
+"""
+
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from config import POOL_SIZE, POOL_IDLE_TIMEOUT, POOL_LEASE_TIMEOUT, POOL_HEADLESS
+from tracing import span
+
+
+def create_driver(headless=POOL_HEADLESS):
+    from selenium import webdriver
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    return webdriver.Chrome(options=options)
+
+
+def _origin(url):
+    parsed = urlparse(url or "")
+    return f"{parsed.scheme}://{parsed.netloc}" if parsed.scheme in ("http", "https") and parsed.netloc else None
+
+
+class LeasedDriver:
+    """
+    Proxy handed to callers; quit() is a no-op so scripts cannot tear down a pooled browser.
+    Remembers the origins it loaded so the pool can clear their storage afterwards.
+    """
+
+    def __init__(self, driver):
+        self._driver = driver
+        self.origins = set()
+
+    def get(self, url):
+        self.origins.add(_origin(url))
+        return self._driver.get(url)
+
+    def quit(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+
+class DriverPool:
+    def __init__(self, size=POOL_SIZE, idle_timeout=POOL_IDLE_TIMEOUT, factory=create_driver):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.factory = factory
+        self._idle = []  # (driver, last_used) pairs, most recently used last
+        self._live = 0
+        self._cond = threading.Condition()
+        self._metrics = {
+            "leases": 0,
+            "reuse_hits": 0,
+            "cold_starts": 0,
+            "evictions": 0,
+            "health_failures": 0,
+            "recycled": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+        }
+
+    @contextmanager
+    def lease(self, timeout=POOL_LEASE_TIMEOUT):
+        with span("browser_start") as s:
+            driver, s["reused"] = self._acquire(timeout)
+        leased = LeasedDriver(driver)
+        try:
+            yield leased
+        finally:
+            self.release(driver, leased.origins)
+
+    def acquire(self, timeout=POOL_LEASE_TIMEOUT):
+        return self._acquire(timeout)[0]
+
+    def _acquire(self, timeout):
+        start = time.monotonic()
+        deadline = start + timeout
+        while True:
+            with self._cond:
+                self._evict_idle()
+                if self._idle:
+                    driver, _ = self._idle.pop()
+                    reused = True
+                elif self._live < self.size:
+                    self._live += 1
+                    driver, reused = None, False
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No browser available after {timeout}s")
+                    self._cond.wait(remaining)
+                    continue
+
+            if reused and not self._is_healthy(driver):
+                self._discard(driver, "health_failures")
+                continue
+            if driver is None:
+                try:
+                    driver = self.factory()
+                except Exception:
+                    with self._cond:
+                        self._live -= 1
+                        self._cond.notify()
+                    raise
+
+            self._record_lease(time.monotonic() - start, reused)
+            return driver, reused
+
+    def release(self, driver, origins=()):
+        try:
+            cleared = self._reset(driver, origins)
+        except Exception:
+            self._discard(driver, "health_failures")
+            return
+        if not cleared:
+            self._discard(driver, "recycled")
+            return
+        with self._cond:
+            self._idle.append((driver, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+        for driver, _ in idle:
+            _quit_quietly(driver)
+
+    def stats(self):
+        with self._cond:
+            m = dict(self._metrics)
+            m["idle"] = len(self._idle)
+            m["live"] = self._live
+        leases = m["leases"] or 1
+        m["reuse_rate"] = round(m["reuse_hits"] / leases, 3)
+        m["wait_avg"] = round(m.pop("wait_total") / leases, 4)
+        m["wait_max"] = round(m["wait_max"], 4)
+        return m
+
+    def _record_lease(self, waited, reused):
+        with self._cond:
+            self._metrics["leases"] += 1
+            self._metrics["reuse_hits" if reused else "cold_starts"] += 1
+            self._metrics["wait_total"] += waited
+            self._metrics["wait_max"] = max(self._metrics["wait_max"], waited)
+
+    def _evict_idle(self):
+        # Caller holds the lock
+        now = time.monotonic()
+        keep = []
+        for driver, last_used in self._idle:
+            if now - last_used > self.idle_timeout:
+                self._live -= 1
+                self._metrics["evictions"] += 1
+                threading.Thread(target=_quit_quietly, args=(driver,), daemon=True).start()
+            else:
+                keep.append((driver, last_used))
+        self._idle = keep
+
+    def _discard(self, driver, reason):
+        _quit_quietly(driver)
+        with self._cond:
+            self._live -= 1
+            self._metrics[reason] += 1
+            self._cond.notify()
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver, origins=()):
+        """
+        Clear the state a lease left behind, browser-wide. Returns False when the driver has no
+        DevTools access (non-Chromium browsers): other origins' cookies and storage would leak.
+        """
+        if not hasattr(driver, "execute_cdp_cmd"):
+            return False
+        # Every origin a tab went through, including redirects the lease never asked for
+        origins = set(origins)
+        for handle in driver.window_handles:
+            driver.switch_to.window(handle)
+            history = driver.execute_cdp_cmd("Page.getNavigationHistory", {})
+            origins.update(_origin(entry["url"]) for entry in history.get("entries", []))
+        # A fresh tab drops the sessionStorage of the old ones
+        old_handles = driver.window_handles
+        driver.switch_to.new_window("tab")
+        fresh = driver.current_window_handle
+        for handle in old_handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(fresh)
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        for origin in origins - {None}:
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        driver.get("about:blank")
+        return True
+
+
+def _quit_quietly(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide driver pool, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.close)
+        return _pool
@@ -12,3 +12,143 @@ GEMINI_MODEL = "gemini-1.5-flash"
 
 UI_DUMP_PATH = "ui_dump.json"
 SELENIUM_SCRIPT_PATH = "selenium_action_script.py"
+
+# "snapshot" serializes the page in one execute_script call, "legacy" walks WebElements one by one
+SCRAPE_ENGINE = "snapshot"
+
+# Elements worth sending to the healer; everything else is dropped from the dump
+IMPORTANT_TAGS = {
+    "button", "input", "a",
+    "select", "textarea",
+    "img", "label"
+}
+
+ATTRIBUTES = {
+    "id", "class", "name",
+    "type", "placeholder",
+    "role", "aria-label",
+    "href", "src"
+}
+
+# Extra CSS selectors for interactive elements that are not in IMPORTANT_TAGS
+EXTRA_SELECTORS = ["[role]", "[onclick]", "[contenteditable]"]
+
+# "query" selects IMPORTANT_TAGS + EXTRA_SELECTORS in the locator itself,
+# "all" fetches every node and filters afterwards
+SCRAPE_MODE = "query"
+
+# Streamed dumps fetch the page in batches of this many nodes and write each batch straight to disk
+SCRAPE_BATCH_SIZE = 2000
+
+# Per-site overrides keyed by hostname (subdomains match too), e.g.
+# "example.com": {"important_tags": {...}, "extra_selectors": [...], "attributes": {...}}
+SITE_PROFILES = {}
+
+# Warm headless Chrome pool shared by dump_ui, run_llm_agent and the script runner
+POOL_SIZE = 2
+POOL_IDLE_TIMEOUT = 300   # seconds an idle driver is kept before it is quit
+POOL_LEASE_TIMEOUT = 120  # seconds to wait for a free driver
+POOL_HEADLESS = True
+
+# "worker" runs the script in a long-lived worker process with its own warm driver,
+# "pooled" runs it in this process on a leased driver,
+# "subprocess" starts a fresh interpreter and browser for every run
+SCRIPT_RUN_MODE = "worker"
+SCRIPT_TIMEOUT = 60  # seconds
+SCRIPT_WORKERS = 2   # worker processes for SCRIPT_RUN_MODE "worker"
+
+# Token budget for the UI table in the LLM prompt (llama-3-8b has an 8k context)
+PROMPT_TOKEN_BUDGET = 5000
+PROMPT_TEXT_LIMIT = 60   # max characters per text/id/placeholder cell
+PROMPT_URL_LIMIT = 40    # max characters kept from href/src paths
+
+# Candidate elements sent to the LLM per script locator (0 sends the whole dump)
+LOCATOR_TOP_K = 5
+
+# Heuristic healer: minimum similarity of the best candidate, and its lead over the runner-up
+HEAL_MIN_CONFIDENCE = 0.75
+HEAL_MIN_MARGIN = 0.1
+
+# On-disk cache of LLM fixes keyed by script + UI fingerprint
+FIX_CACHE_DIR = ".fix_cache"
+FIX_CACHE_MAX_ENTRIES = 256
+FIX_CACHE_MAX_BYTES = 20 * 1024 * 1024
+
+# Heal history (heal_history.py): every heal run with its locator changes, timings and tokens
+HEAL_HISTORY_ENABLED = True
+HEAL_HISTORY_PATH = "heal_history.sqlite3"
+HEAL_HISTORY_SEED = True   # verified replacements from the history pre-seed the heuristic healer
+
+# Batch healing (batch.py)
+BATCH_JOBS = 8             # jobs in flight at once
+BATCH_MAX_BROWSERS = 2     # concurrent dump/verify stages
+BATCH_MAX_LLM_CALLS = 4    # concurrent LLM requests
+BATCH_OUTPUT_DIR = "batch_runs"
+
+# Parallel LLM candidates for the async heal pipeline (1 keeps the sequential retry loop)
+LLM_CANDIDATES = 3
+LLM_CANDIDATE_TEMPERATURES = [0.0, 0.3, 0.6, 0.9]
+
+# Keep the previous dump, send the healer only the structural delta, and skip
+# healing when neither the page structure nor the script changed since the last verified heal
+UI_DUMP_INCREMENTAL = True
+
+# "jsonl" streams the dump to ui_dump.jsonl (+ offset index) for lazy/random access,
+# "json" writes only the indented ui_dump.json
+UI_DUMP_FORMAT = "jsonl"
+UI_DUMP_JSON_EXPORT = True  # also write the human-readable ui_dump.json in "jsonl" mode
+UI_DUMP_STREAMING = True    # "jsonl" dumps are scraped and written batch by batch (bounded memory)
+UI_PREVIEW_LIMIT = 200      # elements shown in the web dump preview
+
+# Probe every locator of a healed script on the live start page before the full replay; only invalid
+# selectors and locators missing before the first interaction skip the replay
+VERIFY_FAIL_FAST = True
+
+# Per-stage timing spans (tracing.py); summarize with `python tracing.py`
+TRACING_ENABLED = True
+TRACE_PATH = "traces.jsonl"
+
+# Web UI (web_app.py): heals run as background jobs on a bounded worker pool
+WEB_HOST = "127.0.0.1"
+WEB_PORT = 5000
+WEB_WORKERS = 2            # jobs running at once
+WEB_MAX_PENDING = 16       # queued + running jobs before submissions are rejected
+WEB_JOB_HISTORY = 100      # finished jobs kept for status/result lookups
+
+# Tk UI (tk_ui.py): worker threads post updates to a queue drained by the Tk main loop
+UI_PAGE_SIZE = 25          # elements rendered per page of the dump view
+UI_QUEUE_POLL_MS = 50      # queue drain interval
+UI_QUEUE_BATCH = 200       # max updates applied per drain
+
+# Shared LLM client (agent/llm_client.py)
+LLM_BASE_URL = os.getenv("LLM_BASE_URL")  # e.g. a local stub server; None keeps the model's default endpoint
+LLM_REQUESTS_PER_MINUTE = 60
+LLM_TOKENS_PER_MINUTE = 200_000
+LLM_MAX_CONNECTIONS = 10   # pooled keep-alive HTTP connections
+LLM_TIMEOUT = 120          # seconds per request
+LLM_MAX_RETRIES = 5        # retries on 429 / 5xx / connection errors
+LLM_BACKOFF_BASE = 1.0     # seconds; full jitter over base * 2^retry
+LLM_BACKOFF_MAX = 30.0
+
+# "patch": the LLM answers with locator replacements (agent/fix_patch.py) applied to the script,
+# "script": it re-emits the whole fixed script
+LLM_FIX_FORMAT = "patch"
+
+# Streamed LLM answers (agent/stream_parser.py): stop generating as soon as the output cannot be valid
+LLM_STREAMING = True
+STREAM_MAX_PROSE_CHARS = 400   # leading prose allowed before the code starts
+STREAM_SYNTAX_CHECK_LINES = 5  # re-parse the code every N completed lines
+
+# Element similarity index (agent/element_index.py) used by the healers on large dumps
+ELEMENT_INDEX_MIN_ELEMENTS = 100  # smaller dumps are scanned directly
+ELEMENT_INDEX_DIM = 64            # hashed trigram buckets per field (id, name, text)
+ELEMENT_INDEX_SHORTLIST = 64      # candidates ordered by vector similarity per query
+ELEMENT_INDEX_RESCORE = 8         # best candidates rescored exactly with score_element()
+
+# Crawl mode for dump_ui (crawler.py): follow the script's clicks and same-origin links
+UI_DUMP_CRAWL = False
+CRAWL_MAX_PAGES = 20       # page budget, script states included
+CRAWL_MAX_DEPTH = 1        # link hops from the start URL
+CRAWL_WORKERS = 2          # pages dumped concurrently (drivers come from the browser pool)
+CRAWL_STEP_TIMEOUT = 5     # seconds to wait for each click target
+CRAWL_SETTLE_SECONDS = 0.3 # pause after a click before the next step / the scrape
@@ -0,0 +1,217 @@
+"""
+Multi-page crawl for dump_ui.
+
+A single driver.get(url) misses everything behind tabs, modals and follow-up
+pages. The crawl visits:
+- the script's own navigation: every prefix of its click() steps is replayed
+  from a fresh load (after the Sign Up tab click, then after the next click, ...),
+  and URLs it opens with driver.get();
+- same-origin links found on plainly loaded pages, breadth first up to a depth.
+
+Pages are visited concurrently on drivers leased from the browser pool, up to a
+page budget. Elements that appear on several pages (headers, navigation) are
+stored once with the list of pages they were seen on, and the page manifest maps
+every page to its element indices in the merged dump.
+
+Usage:
+    python crawler.py URL [--script selenium_action_script.py] [--max-pages 20] [--max-depth 1] [--workers 2]
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urldefrag, urlparse
+from config import (
+    SCRAPE_ENGINE, CRAWL_MAX_PAGES, CRAWL_MAX_DEPTH, CRAWL_WORKERS, CRAWL_STEP_TIMEOUT, CRAWL_SETTLE_SECONDS
+)
+from browser_pool import get_pool
+from ui_scraper import scrape_ui
+from agent.locators import extract_locators
+
+LINKS_JS = "return Array.from(document.querySelectorAll('a[href]'), a => a.href);"
+
+# By.<NAME> → the strategy string selenium expects
+BY_VALUES = {
+    "ID": "id", "NAME": "name", "CLASS_NAME": "class name", "TAG_NAME": "tag name",
+    "LINK_TEXT": "link text", "PARTIAL_LINK_TEXT": "partial link text",
+    "XPATH": "xpath", "CSS_SELECTOR": "css selector",
+}
+
+
+def extract_navigation(code: str):
+    """
+    Navigation steps of a Selenium script in source order:
+    {"action": "get", "url"} for driver.get("...") and {"action": "click", "by", "value", "line"}
+    for clicks on a located element, either directly or through a variable it was assigned to.
+    """
+    nodes = sorted((n for n in ast.walk(ast.parse(code)) if isinstance(n, (ast.Assign, ast.Call))),
+                   key=lambda n: (n.lineno, n.col_offset))
+    located, steps = {}, []
+    for node in nodes:
+        if isinstance(node, ast.Assign):
+            locators = extract_locators(ast.unparse(node.value))
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    if locators:
+                        located[target.id] = locators[-1]
+                    else:
+                        located.pop(target.id, None)
+            continue
+        func = node.func
+        if not isinstance(func, ast.Attribute):
+            continue
+        if func.attr == "get" and node.args and isinstance(node.args[0], ast.Constant) \
+                and isinstance(node.args[0].value, str):
+            steps.append({"action": "get", "url": node.args[0].value})
+        elif func.attr == "click" and not node.args:
+            if isinstance(func.value, ast.Name):
+                locator = located.get(func.value.id)
+            else:
+                found = extract_locators(ast.unparse(func.value))
+                locator = found[-1] if found else None
+            if locator:
+                steps.append({"action": "click", "by": locator["by"], "value": locator["value"],
+                              "line": node.lineno})
+    return steps
+
+
+def script_states(url: str, code: str):
+    """
+    (start url, clicks) for every prefix of the script's clicks, per URL the script opens.
+    The script's first driver.get() is taken to be url itself (the page being dumped).
+    """
+    states = []
+    current, clicks, opened = url, [], False
+    for step in extract_navigation(code):
+        if step["action"] == "get":
+            if opened and step["url"] != current:
+                current, clicks = step["url"], []
+            opened = True
+            continue
+        clicks = clicks + [step]
+        states.append((current, clicks))
+    return states
+
+
+def _same_origin(url: str, origin) -> bool:
+    parsed = urlparse(url)
+    return parsed.scheme in ("http", "https", "file") and (parsed.scheme, parsed.netloc) == origin
+
+
+def _element_identity(element):
+    """Elements with the same tag, text and attributes are the same element wherever they appear."""
+    return json.dumps([element.get("tag"), element.get("text", ""), element.get("attributes", {})],
+                      sort_keys=True, ensure_ascii=False)
+
+
+def visit(url: str, steps, collect_links: bool, engine=SCRAPE_ENGINE):
+    """Load url, replay steps, scrape. Returns the page record (elements included)."""
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    record = {"url": url, "steps": [f"click {s['by']} {s['value']!r}" for s in steps], "failed_steps": []}
+    start = time.perf_counter()
+    with get_pool().lease() as driver:
+        driver.get(url)
+        for step in steps:
+            try:
+                locator = (BY_VALUES[step["by"]], step["value"])
+                WebDriverWait(driver, CRAWL_STEP_TIMEOUT).until(EC.element_to_be_clickable(locator)).click()
+                time.sleep(CRAWL_SETTLE_SECONDS)
+            except Exception as e:
+                # A broken locator is exactly what we are dumping for: keep going with the rest
+                record["failed_steps"].append(f"line {step['line']}: {type(e).__name__}")
+        record["final_url"] = driver.current_url
+        record["title"] = driver.title
+        record["elements"] = scrape_ui(driver, engine)
+        record["links"] = driver.execute_script(LINKS_JS) if collect_links else []
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def crawl(url: str, code: str = "", max_pages: int = CRAWL_MAX_PAGES, max_depth: int = CRAWL_MAX_DEPTH,
+          workers: int = CRAWL_WORKERS, engine=SCRAPE_ENGINE):
+    """
+    Crawl url (plus the navigation in code) and merge the pages into one dump.
+    Returns (elements, pages): deduplicated elements, each with a "pages" list of page ids,
+    and page records {"id", "url", "steps", "depth", "elements": [indices], ...}.
+    """
+    origin = (urlparse(url).scheme, urlparse(url).netloc)
+    frontier = [(url, [], 0)] + [(start, clicks, 0) for start, clicks in script_states(url, code)]
+    queued = {urldefrag(url)[0]}
+    records = []
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while frontier and len(records) < max_pages:
+            batch, frontier = frontier[:max_pages - len(records)], []
+            futures = [(task, executor.submit(visit, task[0], task[1], not task[1] and task[2] < max_depth, engine))
+                       for task in batch]
+            for (page_url, steps, depth), future in futures:
+                try:
+                    record = future.result()
+                except Exception as e:
+                    print(f"⚠️ Crawl: {page_url} failed → {e}")
+                    continue
+                record["depth"] = depth
+                records.append(record)
+                for link in record.pop("links"):
+                    link = urldefrag(link)[0]
+                    if link not in queued and _same_origin(link, origin):
+                        queued.add(link)
+                        frontier.append((link, [], depth + 1))
+
+    return merge_pages(records)
+
+
+def merge_pages(records):
+    """Deduplicate elements across pages; identical page states are kept once as well."""
+    elements, pages = [], []
+    positions, states = {}, {}
+    for record in records:
+        page_elements = record.pop("elements")
+        # Visibility is part of the state: a click that only reveals text-less inputs is a new state
+        state = hashlib.sha256("\n".join(sorted(f"{_element_identity(el)}{bool(el.get('visible'))}"
+                                                  for el in page_elements)).encode()).hexdigest()
+        if state in states:
+            pages[states[state]].setdefault("same_as", []).append({"url": record["url"], "steps": record["steps"]})
+            continue
+        page_id = len(pages)
+        states[state] = page_id
+        indices = []
+        for element in page_elements:
+            identity = _element_identity(element)
+            i = positions.get(identity)
+            if i is None:
+                i = positions[identity] = len(elements)
+                elements.append(dict(element, pages=[page_id]))
+            else:
+                merged = elements[i]
+                if page_id not in merged["pages"]:
+                    merged["pages"].append(page_id)
+                # Hidden on one page (inactive tab), visible on another: keep the visible state
+                if element.get("visible") and not merged.get("visible"):
+                    elements[i] = dict(element, pages=merged["pages"])
+            indices.append(i)
+        pages.append(dict(record, id=page_id, elements=indices))
+    return elements, pages
+
+
+def main():
+    from main import dump_ui
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("url")
+    parser.add_argument("--script", default=None, help="Selenium script whose navigation is replayed")
+    parser.add_argument("--max-pages", type=int, default=CRAWL_MAX_PAGES)
+    parser.add_argument("--max-depth", type=int, default=CRAWL_MAX_DEPTH)
+    parser.add_argument("--workers", type=int, default=CRAWL_WORKERS)
+    args = parser.parse_args()
+
+    dump_ui(args.url, crawl=True, script_path=args.script, max_pages=args.max_pages,
+            max_depth=args.max_depth, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
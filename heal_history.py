@@ -0,0 +1,322 @@
+"""
+SQLite history of heal runs.
+
+Every run_llm_agent / heal_async call is stored with its page fingerprint,
+outcome, per-stage timings (from the tracing spans of the run), token usage and
+the locators it changed (old → new value, found by diffing the script's literal
+locators before and after the heal). Indexed queries answer:
+- which locators break most often (flakiest_locators),
+- how heal latency, tokens and verification rate move over time (latency_trend),
+- which replacement verified for a locator on the same site before (known_fixes), which is
+  handed to the heuristic healer so a locator that broke the same way again is
+  fixed without the LLM.
+
+Report:
+    python heal_history.py [--db heal_history.sqlite3] [--days 30] [--host example.com] [--top 10] [--json]
+"""
+
+import argparse
+import difflib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+from config import HEAL_HISTORY_PATH
+from tracing import percentile
+from agent.locators import extract_locators
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    url TEXT,
+    host TEXT,
+    script TEXT,
+    fingerprint TEXT,
+    status TEXT,
+    reason TEXT,
+    verified INTEGER,
+    attempts INTEGER,
+    seconds REAL,
+    verify_seconds REAL,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    stages TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+CREATE INDEX IF NOT EXISTS runs_host ON runs (host, started);
+
+CREATE TABLE IF NOT EXISTS fixes (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    started REAL NOT NULL,
+    host TEXT,
+    strategy TEXT NOT NULL,
+    old_value TEXT NOT NULL,
+    new_strategy TEXT NOT NULL,
+    new_value TEXT NOT NULL,
+    line INTEGER,
+    source TEXT,
+    verified INTEGER
+);
+CREATE INDEX IF NOT EXISTS fixes_locator ON fixes (strategy, old_value, verified);
+CREATE INDEX IF NOT EXISTS fixes_host ON fixes (host, started);
+"""
+
+
+def host_of(url):
+    return urlparse(url or "").hostname or ""
+
+
+def locator_changes(before: str, after: str):
+    """
+    Locators rewritten between two versions of a script, matched in source order:
+    [{"by", "old", "new_by", "new", "line"}]. Inserted or removed locators are not changes.
+    """
+    try:
+        old, new = extract_locators(before), extract_locators(after)
+    except SyntaxError:
+        return []
+    matcher = difflib.SequenceMatcher(a=[(loc["by"], loc["value"]) for loc in old],
+                                      b=[(loc["by"], loc["value"]) for loc in new], autojunk=False)
+    changes = []
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "replace" and i2 - i1 == j2 - j1:
+            changes += [{"by": a["by"], "old": a["value"], "new_by": b["by"], "new": b["value"], "line": a["line"]}
+                        for a, b in zip(old[i1:i2], new[j1:j2])]
+    return changes
+
+
+def stage_timings(spans):
+    """{span name: total ms} over the spans of one run."""
+    stages = {}
+    for record in spans:
+        stages[record["name"]] = round(stages.get(record["name"], 0.0) + record.get("duration_ms", 0.0), 3)
+    return stages
+
+
+def token_usage(spans):
+    """(input, output) tokens summed over the run's llm_call spans."""
+    calls = [record.get("attrs", {}) for record in spans if record["name"] == "llm_call"]
+    return (sum(attrs.get("input_tokens") or 0 for attrs in calls),
+            sum(attrs.get("output_tokens") or 0 for attrs in calls))
+
+
+class HealHistory:
+    """Thread-safe handle on the history database."""
+
+    def __init__(self, path=HEAL_HISTORY_PATH):
+        self.path = str(path)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        with self.lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA foreign_keys=ON")
+            self.db.executescript(SCHEMA)
+
+    def record_run(self, url, script, result, before: str, after: str, spans=(), started=None, seconds=None):
+        """Store one heal run and the locators it changed; returns the run id."""
+        result = result or {}
+        started = started or time.time()
+        host = host_of(url)
+        fingerprint = next((record["attrs"]["fingerprint"] for record in spans
+                            if record.get("attrs", {}).get("fingerprint")), None)
+        input_tokens, output_tokens = token_usage(spans)
+        verified = int(bool(result.get("verified")))
+        changes = locator_changes(before, after) if after != before else []
+        with self.lock, self.db:
+            run_id = self.db.execute(
+                "INSERT INTO runs (started, url, host, script, fingerprint, status, reason, verified, attempts, "
+                "seconds, verify_seconds, input_tokens, output_tokens, stages) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (started, url, host, str(script) if script else None, fingerprint, result.get("status"),
+                 result.get("reason"), verified, result.get("attempts"), seconds, result.get("verify_seconds"),
+                 input_tokens, output_tokens, json.dumps(stage_timings(spans))),
+            ).lastrowid
+            self.db.executemany(
+                "INSERT INTO fixes (run_id, started, host, strategy, old_value, new_strategy, new_value, line, "
+                "source, verified) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, started, host, c["by"], c["old"], c["new_by"], c["new"], c["line"], result.get("status"),
+                  verified) for c in changes],
+            )
+        return run_id
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return [dict(row) for row in self.db.execute(sql, params)]
+
+    @staticmethod
+    def _scope(days=None, host=None, prefix="", heals_only=False):
+        clauses, params = [], []
+        if heals_only:
+            # A skipped run only checked that nothing changed; it would pull latency and success toward zero cost
+            clauses.append(f"COALESCE({prefix}status, '') != 'skipped'")
+        if days:
+            clauses.append(f"{prefix}started >= ?")
+            params.append(time.time() - days * 86400)
+        if host:
+            clauses.append(f"{prefix}host = ?")
+            params.append(host)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def known_fixes(self, url):
+        """
+        {(by, old value): new value} of verified same-strategy replacements on url's host, for heal_locators().
+        Other sites are left out: the same id there says nothing about this page.
+        """
+        host = host_of(url)
+        if not host:
+            return {}
+        rows = self._query(
+            "SELECT strategy, old_value, new_value, COUNT(*) AS uses, MAX(started) AS last "
+            "FROM fixes WHERE verified = 1 AND strategy = new_strategy AND host = ? "
+            "GROUP BY strategy, old_value, new_value "
+            "ORDER BY uses, last",
+            (host,),
+        )
+        # Ascending order: the best replacement per locator is written last
+        return {(row["strategy"], row["old_value"]): row["new_value"] for row in rows}
+
+    def flakiest_locators(self, days=None, host=None, limit=10):
+        """Locators that broke in the most runs: breaks, distinct replacements, verified share, last break."""
+        where, params = self._scope(days, host)
+        return self._query(
+            "SELECT strategy, old_value, COUNT(DISTINCT run_id) AS breaks, COUNT(DISTINCT new_value) AS replacements, "
+            "ROUND(AVG(verified), 3) AS verified_rate, MAX(started) AS last_break, "
+            "GROUP_CONCAT(DISTINCT host) AS hosts "
+            f"FROM fixes{where} GROUP BY strategy, old_value ORDER BY breaks DESC, last_break DESC LIMIT ?",
+            params + [limit],
+        )
+
+    def locator_history(self, by: str, value: str):
+        """Every recorded replacement of one locator, newest first."""
+        return self._query(
+            "SELECT f.started, f.host, f.new_strategy, f.new_value, f.source, f.verified, r.url "
+            "FROM fixes f JOIN runs r ON r.id = f.run_id WHERE f.strategy = ? AND f.old_value = ? "
+            "ORDER BY f.started DESC",
+            (by, value),
+        )
+
+    def latency_trend(self, days=30, host=None):
+        """Per day: heal runs (skipped ones excluded), verified share, heal seconds p50/p95/max and tokens."""
+        where, params = self._scope(days, host, heals_only=True)
+        rows = self._query(
+            "SELECT DATE(started, 'unixepoch', 'localtime') AS day, seconds, verified, "
+            f"COALESCE(input_tokens, 0) + COALESCE(output_tokens, 0) AS tokens FROM runs{where} "
+            "ORDER BY started",
+            params,
+        )
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row["day"], []).append(row)
+        trend = []
+        for day, runs in by_day.items():
+            seconds = sorted(r["seconds"] for r in runs if r["seconds"] is not None)
+            trend.append({
+                "day": day,
+                "runs": len(runs),
+                "verified_rate": round(sum(r["verified"] for r in runs) / len(runs), 3),
+                "p50_seconds": round(percentile(seconds, 0.5), 3),
+                "p95_seconds": round(percentile(seconds, 0.95), 3),
+                "max_seconds": round(seconds[-1], 3) if seconds else 0.0,
+                "tokens": sum(r["tokens"] for r in runs),
+            })
+        return trend
+
+    def stage_summary(self, days=None, host=None):
+        """{stage: average ms per run that had it} across the selected heal runs (skipped ones excluded)."""
+        where, params = self._scope(days, host, heals_only=True)
+        totals = {}
+        for row in self._query(f"SELECT stages FROM runs{where}", params):
+            for name, ms in json.loads(row["stages"] or "{}").items():
+                count, total = totals.get(name, (0, 0.0))
+                totals[name] = (count + 1, total + ms)
+        return {name: round(total / count, 1) for name, (count, total) in totals.items()}
+
+    def summary(self, days=None, host=None):
+        """{status: {"runs", "verified"}}; "skipped" runs are listed too, the report keeps them apart from heals."""
+        where, params = self._scope(days, host)
+        rows = self._query(f"SELECT status, COUNT(*) AS runs, SUM(verified) AS verified FROM runs{where} "
+                           "GROUP BY status ORDER BY runs DESC", params)
+        return {row["status"] or "unknown": {"runs": row["runs"], "verified": row["verified"] or 0} for row in rows}
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_history():
+    """Process-wide HealHistory, created on first use."""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = HealHistory()
+        return _history
+
+
+def print_report(history: HealHistory, days=30, host=None, top=10):
+    summary = history.summary(days, host)
+    scope = f"last {days} days" if days else "all time"
+    if not summary:
+        print(f"No heal runs recorded in {history.path} ({scope})")
+        return
+    skipped = summary.get("skipped", {}).get("runs", 0)
+    heals = {status: s for status, s in summary.items() if status != "skipped"}
+    total = sum(s["runs"] for s in heals.values())
+    verified = sum(s["verified"] for s in heals.values())
+    print(f"🩺 {total} heal runs ({scope}{', ' + host if host else ''}), {verified} verified"
+          + (f"; {skipped} skipped as unchanged since the last verified heal" if skipped else ""))
+    print("   " + ", ".join(f"{status}: {s['runs']}" for status, s in summary.items()))
+
+    print(f"\nFlakiest locators (top {top}):")
+    print(f"{'breaks':>7}{'fixes':>7}{'verified':>10}  {'last break':<17}locator")
+    for row in history.flakiest_locators(days, host, top):
+        last = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["last_break"]))
+        print(f"{row['breaks']:>7}{row['replacements']:>7}{row['verified_rate']:>10}  {last:<17}"
+              f"By.{row['strategy']} {row['old_value']!r}")
+
+    print("\nHeal latency by day:")
+    print(f"{'day':<12}{'runs':>6}{'verified':>10}{'p50 s':>9}{'p95 s':>9}{'max s':>9}{'tokens':>10}")
+    for row in history.latency_trend(days, host):
+        print(f"{row['day']:<12}{row['runs']:>6}{row['verified_rate']:>10}{row['p50_seconds']:>9}"
+              f"{row['p95_seconds']:>9}{row['max_seconds']:>9}{row['tokens']:>10}")
+
+    stages = history.stage_summary(days, host)
+    if stages:
+        print("\nAverage stage time per run:")
+        for name, ms in sorted(stages.items(), key=lambda item: -item[1]):
+            print(f"{name:<22}{ms:>12} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=HEAL_HISTORY_PATH)
+    parser.add_argument("--days", type=int, default=30, help="0 for all recorded runs")
+    parser.add_argument("--host", default=None, help="only runs against this hostname")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="print the report data as JSON")
+    args = parser.parse_args()
+
+    history = HealHistory(args.db)
+    if args.json:
+        json.dump({
+            "summary": history.summary(args.days, args.host),
+            "flakiest_locators": history.flakiest_locators(args.days, args.host, args.top),
+            "latency_trend": history.latency_trend(args.days, args.host),
+            "stages_ms": history.stage_summary(args.days, args.host),
+        }, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(history, args.days, args.host, args.top)
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Bounded background job queue for the web UI.
+
+Heals take tens of seconds to minutes, so request handlers only submit a job and
+return its id. Jobs run on a fixed pool of worker threads; submissions beyond
+the pending limit are rejected instead of queuing without bound. Each job's
+print() output is captured line by line so clients can poll or stream it.
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import WEB_WORKERS, WEB_MAX_PENDING, WEB_JOB_HISTORY
+from log_capture import capture_thread_output
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit() when WEB_MAX_PENDING jobs are already waiting or running."""
+
+
+class Job:
+    """One submitted task: its state, captured log lines and result."""
+
+    def __init__(self, kind: str, params):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.lines = []
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.changed = threading.Condition()
+        self._partial = ""
+
+    # File-like sink for capture_thread_output()
+    def write(self, text):
+        with self.changed:
+            self._partial += text
+            *complete, self._partial = self._partial.split("\n")
+            if complete:
+                self.lines.extend(complete)
+                self.changed.notify_all()
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def _set(self, **fields):
+        with self.changed:
+            if fields.get("status") in ("done", "error") and self._partial:
+                self.lines.append(self._partial)
+                self._partial = ""
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.changed.notify_all()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "error")
+
+    def wait(self, after_line: int, timeout: float):
+        """Block until there are lines past after_line or the job finished; returns (new lines, done)."""
+        with self.changed:
+            self.changed.wait_for(lambda: len(self.lines) > after_line or self.done, timeout)
+            return self.lines[after_line:], self.done
+
+    def to_dict(self, with_log: bool = False):
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "seconds": round((self.finished or time.time()) - self.started, 3) if self.started else None,
+            "error": self.error,
+        }
+        if with_log:
+            data["log"] = list(self.lines)
+        return data
+
+
+class JobQueue:
+    """Runs submitted callables on WEB_WORKERS threads and keeps the last WEB_JOB_HISTORY jobs."""
+
+    def __init__(self, workers: int = WEB_WORKERS, max_pending: int = WEB_MAX_PENDING,
+                 history: int = WEB_JOB_HISTORY):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self.max_pending = max_pending
+        self.history = history
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def submit(self, kind: str, func, **params) -> Job:
+        """Queue func(**params) and return its Job immediately. Raises QueueFull when saturated."""
+        job = Job(kind, params)
+        with self.lock:
+            pending = sum(1 for j in self.jobs.values() if not j.done)
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} jobs already pending")
+            self.jobs[job.id] = job
+            self._prune()
+        self.executor.submit(self._run, job, func)
+        return job
+
+    def _prune(self):
+        finished = [job_id for job_id, j in self.jobs.items() if j.done]
+        for job_id in finished[:max(0, len(self.jobs) - self.history)]:
+            del self.jobs[job_id]
+
+    def _run(self, job: Job, func):
+        job._set(status="running", started=time.time())
+        with capture_thread_output(job):
+            try:
+                result = func(**job.params)
+                job._set(status="done", result=result, finished=time.time())
+            except Exception as e:
+                traceback.print_exc(file=job)
+                job._set(status="error", error=str(e), finished=time.time())
+
+    def get(self, job_id: str):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def recent(self, limit: int = 20):
+        with self.lock:
+            return list(self.jobs.values())[-limit:][::-1]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,54 @@
+"""
+Per-thread stdout capture.
+
+The pipeline reports progress with print(). When several heals run in threads
+at once, capture_thread_output() routes each thread's prints to its own sink
+(a log file, a job record, ...) while other threads keep writing to the console.
+The sink is held in a context variable, so work the thread hands to
+asyncio.to_thread() or to its own event loop's tasks is captured as well.
+"""
+
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_sink = ContextVar("output_sink", default=None)
+
+
+class ContextRoutedStream:
+    """sys.stdout replacement that forwards writes to the sink of the current context."""
+
+    def __init__(self, default):
+        self.default = default
+
+    def write(self, text):
+        sink = _sink.get()
+        sink = self.default if sink is None else sink
+        sink.write(text)
+        return len(text)
+
+    def flush(self):
+        sink = _sink.get()
+        sink = self.default if sink is None else sink
+        if hasattr(sink, "flush"):
+            sink.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.default, name)
+
+
+_install_lock = threading.Lock()
+
+
+@contextmanager
+def capture_thread_output(sink):
+    """Send print() output of the current thread (and the work it hands off) to sink (anything with write())."""
+    with _install_lock:
+        if not isinstance(sys.stdout, ContextRoutedStream):
+            sys.stdout = ContextRoutedStream(sys.stdout)
+    token = _sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _sink.reset(token)
@@ -1,132 +1,638 @@
 from dotenv import load_dotenv
-from langsmith import traceable
-from agent.llm_agent import get_llm
-from ui_scraper import scrape_all_elements, clean_element, filter_element
-from selenium import webdriver
+from agent.llm_client import get_client, client_stats
+from ui_scraper import get_site_profile, iter_ui, scrape_ui
+from config import (
+    SCRAPE_ENGINE, LOCATOR_TOP_K, LLM_CANDIDATES, LLM_CANDIDATE_TEMPERATURES, UI_DUMP_INCREMENTAL,
+    UI_DUMP_FORMAT, UI_DUMP_JSON_EXPORT, UI_DUMP_STREAMING, VERIFY_FAIL_FAST, UI_DUMP_CRAWL, LLM_STREAMING,
+    LLM_FIX_FORMAT, HEAL_HISTORY_ENABLED, HEAL_HISTORY_SEED
+)
+from browser_pool import get_pool
+from tracing import collect_spans, span, traceable
+from heal_history import get_history
+import asyncio
+import hashlib
 import json
 import time
-from langchain_core.messages import HumanMessage
-from agent.tools import read_ui_json, read_selenium_script, write_selenium_script, run_selenium
+from contextlib import aclosing, closing, contextmanager, nullcontext
+from agent.tools import (
+    UI_JSON_PATH, read_selenium_script, write_selenium_script,
+    run_selenium, run_succeeded
+)
+from agent.prompt_encoder import encode_ui, estimate_tokens
+from agent.locators import extract_locators, select_candidates
+from agent.heuristic_healer import heal_locators, referenced_elements
+from agent.stream_parser import CodeStreamParser, PatchStreamParser, StreamAbort
+from agent.fix_patch import EXAMPLE as PATCH_EXAMPLE, apply_patch, parse_patch
+from agent.fix_cache import FixCache, cache_key, fingerprint_row, ui_fingerprint
+from agent.verifier import check_locators, format_report
+from ui_store import DumpView, DumpWriter, write_dump, export_json, load_elements, jsonl_path, remove_jsonl, write_pages
+from ui_diff import (
+    fingerprint_path, previous_path, rotate_snapshot, clear_fingerprint, write_fingerprint, load_previous,
+    page_unchanged, diff_snapshots, is_empty, mark_verified, heal_is_current
+)
 import ast
 import re
+import sqlite3
 
 load_dotenv()
 
 
-def dump_ui(url: str):
-    """Dump all visible and important UI elements into ui_dump.json"""
-    driver = webdriver.Chrome()
-    driver.get(url)
-
-    elements = scrape_all_elements(driver)
-    ui_data = []
-
-    for el in elements:
+def stream_dump(driver, engine: str, path, incremental: bool):
+    """
+    Scrape the loaded page batch by batch straight into the JSONL dump.
+    Returns (element count, structural fingerprint), both computed on the way.
+    """
+    digest = hashlib.sha256()
+    with DumpWriter(path) as writer:
+        for batch in iter_ui(driver, engine):
+            for element in batch:
+                digest.update(fingerprint_row(element))
+                writer.write(element)
+        # Rotate only now: a failed scrape leaves the current dump and its fingerprint in place
+        if incremental:
+            rotate_snapshot(path)
+        else:
+            clear_fingerprint(path)
+    return len(writer), digest.hexdigest()
+
+
+def dump_ui(url: str, engine: str = SCRAPE_ENGINE, path=None, incremental: bool = UI_DUMP_INCREMENTAL,
+            crawl: bool = UI_DUMP_CRAWL, script_path=None, **crawl_options):
+    """
+    Dump all visible and important UI elements into ui_dump.json (or path).
+    In incremental mode the previous dump is kept as ui_dump.prev.json and the structural delta is reported.
+    crawl=True also dumps the pages behind the script's clicks and same-origin links (see crawler.crawl,
+    which receives crawl_options) into the same dump, with a page manifest next to it.
+    Returns the elements as a read-only sequence (len, iteration, indexing): a list, or with
+    UI_DUMP_STREAMING (and the "jsonl" format) a DumpView reading the batches written straight to disk.
+    """
+    path = path or UI_JSON_PATH
+    pages = None
+    if UI_DUMP_STREAMING and UI_DUMP_FORMAT == "jsonl" and not crawl:
+        with get_pool().lease() as driver:
+            with span("page_load", url=url):
+                driver.get(url)
+            with span("scrape", engine=engine, streamed=True) as s:
+                count, fingerprint = stream_dump(driver, engine, path, incremental)
+                s["elements"] = count
+        with span("serialize", format=UI_DUMP_FORMAT, elements=count):
+            if UI_DUMP_JSON_EXPORT:
+                export_json(path)
+        write_pages(path, None)
+        write_fingerprint(path, fingerprint=fingerprint)
+        print(f"📄 UI Dumped: {count} elements streamed to {jsonl_path(path)}")
+        if incremental:
+            # The element-level delta needs both dumps in memory; the heal computes it when it needs it
+            if page_unchanged(path):
+                print("🟰 Page structure unchanged since the previous dump")
+            elif fingerprint_path(previous_path(path)).exists():
+                print("🔀 Page structure changed since the previous dump")
+        return DumpView(path, count)
+
+    if crawl:
+        from crawler import crawl as crawl_pages
+        code = read_selenium_script(script_path)
+        with span("crawl", url=url) as s:
+            ui_data, pages = crawl_pages(url, "" if code.startswith("ERROR") else code,
+                                         engine=engine, **crawl_options)
+            s.update(pages=len(pages), elements=len(ui_data))
+        print(f"🕸️ Crawled {len(pages)} page(s): {len(ui_data)} unique elements")
+    else:
+        with get_pool().lease() as driver:
+            with span("page_load", url=url):
+                driver.get(url)
+            with span("scrape", engine=engine) as s:
+                ui_data = scrape_ui(driver, engine)
+                s["elements"] = len(ui_data)
+
+    if incremental:
+        rotate_snapshot(path)
+    else:
+        clear_fingerprint(path)
+
+    with span("serialize", format=UI_DUMP_FORMAT, elements=len(ui_data)):
+        if UI_DUMP_FORMAT == "jsonl":
+            write_dump(path, ui_data)
+            if UI_DUMP_JSON_EXPORT:
+                export_json(path)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(ui_data, f, indent=2, ensure_ascii=False)
+            # Readers prefer the JSONL dump, so one left by an earlier "jsonl" run would shadow this one
+            remove_jsonl(path)
+    write_pages(path, pages)
+    # Even without incremental diffs: the verification record of the heal is checked against it
+    write_fingerprint(path, ui_data)
+    saved_to = jsonl_path(path) if UI_DUMP_FORMAT == "jsonl" else path
+    print(f"📄 UI Dumped: {len(ui_data)} elements saved to {saved_to}")
+
+    if incremental:
+        previous = load_previous(path)
+        if page_unchanged(path):
+            print("🟰 Page structure unchanged since the previous dump")
+        elif previous is not None:
+            delta = diff_snapshots(previous, ui_data)
+            print(f"🔀 UI delta: +{len(delta['added'])} added, -{len(delta['removed'])} removed, "
+                  f"~{len(delta['changed'])} changed")
+    return ui_data
+
+
+def precheck_locators(script_path=None):
+    """
+    Probe the script's locators on its live start page in one batched query.
+    Returns an ERROR output when a locator is invalid or missing before the script's first
+    interaction, otherwise None (the full replay decides about the rest).
+    """
+    code = read_selenium_script(script_path)
+    try:
+        with get_pool().lease() as driver, span("locator_check") as s:
+            report = check_locators(code, driver)
+            s.update(unresolved=len(report["unresolved"]), blocking=len(report["blocking"]))
+    except SyntaxError as e:
+        return f"ERROR: Script is invalid → {e}"
+    except Exception as e:
+        print(f"⚠️ Locator pre-check unavailable, running full replay → {e}")
+        return None
+    print(format_report(report))
+    if report["resolved"]:
+        return None
+    return f"ERROR: {len(report['blocking'])} locator(s) do not resolve on the page — skipped full replay"
+
+
+def verify_fix(script_path=None, browser_gate=None, ui_path=None):
+    """Run the script, print its output and return (output, seconds)"""
+    start = time.perf_counter()
+    with browser_gate or nullcontext():
+        output = precheck_locators(script_path) if VERIFY_FAIL_FAST else None
+        if output is None:
+            with span("script_run") as s:
+                output = run_selenium(path=script_path)
+                s["success"] = run_succeeded(output)
+    print(output)
+    if UI_DUMP_INCREMENTAL and run_succeeded(output):
+        mark_verified(ui_path or UI_JSON_PATH, read_selenium_script(script_path))
+    return output, round(time.perf_counter() - start, 3)
+
+
+def apply_fixed_code(fixed_code: str, source: str, script_path=None, browser_gate=None, ui_path=None):
+    """Write validated fixed code, print its # FIX: log and run the script; returns (output, seconds)"""
+    result = write_selenium_script(fixed_code, script_path)
+    print(f"🛠️ {result}")
+
+    # Extract FIX comments to create a progress log
+    fix_comments = re.findall(r"^\s*#\s*FIX:.*", fixed_code, re.MULTILINE)
+    if fix_comments:
+        print(f"\n Fix Log (changes applied by {source}):")
+        for comment in fix_comments:
+            print(f"- {comment.strip()[1:].strip()}")
+    else:
+        print("\n Fix Log: No specific FIX comments found")
+
+    # Run the script safely
+    return verify_fix(script_path, browser_gate, ui_path)
+
+
+def _heal_result(status: str, run=("", 0.0), **extra):
+    output, seconds = run
+    return dict(status=status, verified=run_succeeded(output) if output else False,
+                verify_seconds=seconds, output=output, **extra)
+
+
+def prepare_heal(url: str, ui_path=None, script_path=None, browser_gate=None):
+    """
+    Everything before the LLM call: fix cache, heuristic healer, locator pruning and prompt encoding.
+    Returns {"result": ...} when the script was healed (or needs no healing) without the LLM,
+    otherwise {"prompt", "fix_cache", "cache_id", "format", "script"} for the LLM stage, where
+    format is the answer format the prompt asks for and script the code the prompt shows.
+    """
+
+    try:
+        ui_data = load_elements(ui_path or UI_JSON_PATH)
+    except (OSError, ValueError):
+        print("❌ ui_dump.json is missing or invalid. Dump the UI first.")
+        return {"result": _heal_result("failed", reason="missing or invalid UI dump")}
+    selenium_code = read_selenium_script(script_path)
+
+    # Nothing structural changed since this script last verified against the page
+    if UI_DUMP_INCREMENTAL and heal_is_current(ui_path or UI_JSON_PATH, selenium_code):
+        print("⏭️ Page structure and script unchanged since the last verified heal — skipping")
+        return {"result": dict(_heal_result("skipped", reason="unchanged since last verified heal"), verified=True)}
+
+    # Same script on the same page as an earlier heal: reuse the stored fix
+    fix_cache = FixCache()
+    with span("fix_cache_lookup") as s:
+        s["fingerprint"] = ui_fingerprint(ui_data)
+        cache_id = cache_key(selenium_code, ui_data, s["fingerprint"])
+        cached_code = fix_cache.get(cache_id)
+        s["hit"] = cached_code is not None
+    if cached_code is not None:
         try:
-            cleaned = clean_element(el)
-            if filter_element(cleaned):
-                ui_data.append(cleaned)
-        except Exception:
-            continue
-
-    driver.quit()
-
-    with open("ui_dump.json", "w", encoding="utf-8") as f:
-        json.dump(ui_data, f, indent=2, ensure_ascii=False)
-
-    print(f"📄 UI Dumped: {len(ui_data)} elements saved to ui_dump.json")
+            ast.parse(cached_code)
+        except SyntaxError:
+            fix_cache.discard(cache_id)
+        else:
+            print("⚡ Fix cache hit — reusing the stored fix, no LLM call needed")
+            run = apply_fixed_code(cached_code, "fix cache", script_path, browser_gate, ui_path)
+            return {"result": _heal_result("cached", run)}
+
+    # One similarity index per dump (None for small dumps) serves the healer, the delta and the pruning
+    from agent.element_index import build_index
+    with span("element_index", elements=len(ui_data)) as s:
+        index = build_index(ui_data)
+        s["built"] = index is not None
+
+    # Replacements that verified on earlier heals are tried before similarity ranking
+    known_fixes = None
+    if HEAL_HISTORY_ENABLED and HEAL_HISTORY_SEED:
+        try:
+            known_fixes = get_history().known_fixes(url)
+        except sqlite3.Error as e:
+            print(f"⚠️ Heal history unavailable → {e}")
+
+    # Deterministic pass first: renamed ids, changed classes or text need no LLM round trip
+    try:
+        with span("heuristic_heal") as s:
+            healed = heal_locators(selenium_code, ui_data, known_fixes, index=index, profile=get_site_profile(url))
+            s.update(fixes=len(healed["fixes"]), unresolved=len(healed["unresolved"]),
+                     out_of_dump=len(healed["out_of_dump"]))
+    except SyntaxError as e:
+        print(f"⚠️ Script is not valid Python, skipping heuristic healer → {e}")
+        healed = None
+
+    if healed is not None:
+        if healed["fixes"]:
+            print(f"🩹 Heuristic healer fixed {len(healed['fixes'])} locator(s) without the LLM")
+        if healed["out_of_dump"]:
+            print(f"ℹ️ {len(healed['out_of_dump'])} locator(s) target elements the UI dump does not keep "
+                  f"— left for the live run to check")
+        if healed["checked"] and not healed["unresolved"]:
+            if healed["fixes"]:
+                run = apply_fixed_code(healed["code"], "heuristic healer", script_path, browser_gate, ui_path)
+                return {"result": _heal_result("heuristic", run, fixes=len(healed["fixes"]))}
+            print("✅ All locators resolve against the UI dump — no LLM call needed")
+            return {"result": _heal_result("unchanged", verify_fix(script_path, browser_gate, ui_path))}
+        selenium_code = healed["code"]
+        if healed["unresolved"]:
+            print(f"🤖 {len(healed['unresolved'])} locator(s) left for the LLM")
+
+    with span("prompt_build") as prompt_span:
+        # Incremental mode: the LLM only needs what changed on the page plus what the script points at
+        previous = load_previous(ui_path or UI_JSON_PATH) if UI_DUMP_INCREMENTAL else None
+        if previous is not None and healed is not None:
+            delta = diff_snapshots(previous, ui_data)
+            if not is_empty(delta):
+                focus = {id(el) for el in delta["added"]}
+                focus.update(id(c["after"]) for c in delta["changed"])
+                focus.update(id(el) for el in referenced_elements(selenium_code, ui_data, index))
+                print(f"🔀 Incremental heal: {len(focus)}/{len(ui_data)} elements are new, changed or referenced")
+                ui_data = [el for el in ui_data if id(el) in focus]
+                index = build_index(ui_data)
+
+        # Only send the elements that plausibly match one of the unresolved locators
+        if LOCATOR_TOP_K:
+            locators = healed["unresolved"] if healed is not None else []
+            if locators:
+                candidates = select_candidates(ui_data, locators, LOCATOR_TOP_K, index)
+                print(f"🎯 Locator pruning: kept {len(candidates)}/{len(ui_data)} elements "
+                      f"for {len(locators)} locators")
+                ui_data = [ui_data[i] for i in candidates]
+
+        # Compact, token-budgeted table instead of the raw JSON dump
+        ui_table, prompt_stats = encode_ui(ui_data)
+        print(f"🧮 Prompt UI: {prompt_stats['encoded_tokens']} tokens "
+              f"(saved {prompt_stats['saved_tokens']} vs raw JSON, "
+              f"{prompt_stats['omitted']}/{prompt_stats['elements']} elements omitted for budget)")
+
+        # Patch answers need literal unresolved locators to point at; without any (a script the parser
+        # rejects, dynamic or f-string locators, a delta-only heal) the LLM rewrites the whole script
+        broken = ""
+        # A literal spanning several lines cannot be patched in place either
+        if LLM_FIX_FORMAT == "patch" and healed is not None \
+                and all(loc["line"] == loc["end_line"] for loc in healed["unresolved"]):
+            wanted = {(loc["by"], loc["value"]) for loc in healed["unresolved"]}
+            broken = "\n".join(f"line {loc['line']}: By.{loc['by']} {loc['value']!r}"
+                               for loc in extract_locators(selenium_code) if (loc["by"], loc["value"]) in wanted)
+        fix_format = "patch" if broken else "script"
+        if fix_format == "patch":
+            numbered = "\n".join(f"{i:>4}| {line}" for i, line in enumerate(selenium_code.splitlines(), 1))
+            user_prompt = f"""
+Website URL: {url}
 
-def run_llm_agent(url: str):
-    """Use LLM to fix Selenium script automatically using the dumped UI, with a fix log"""
+UI Elements (one row per element from ui_dump.json):
+{ui_table}
 
-    ui_data = read_ui_json()
-    selenium_code = read_selenium_script()
+Selenium Script (with line numbers):
+{numbered}
 
-    # Escape JSON and code for safe LLM input
-    safe_ui_json = json.dumps(ui_data)
-    safe_selenium_code = repr(selenium_code)  # converts to a Python-safe string literal
+Locators that match no element:
+{broken}
 
-    user_prompt = f"""
+Instructions:
+- Only fix broken locators, using values from the UI elements above
+- Do NOT output the script. Output one JSON object per fixed locator, one per line, nothing else:
+{PATCH_EXAMPLE}
+- "by" keeps the locator's strategy, "old" is its current value, "why" says what changed
+"""
+        else:
+            user_prompt = f"""
 Website URL: {url}
 
-UI JSON:
-{safe_ui_json}
+UI Elements (one row per element from ui_dump.json):
+{ui_table}
 
 Selenium Script:
-{safe_selenium_code}
+```python
+{selenium_code}
+```
 
 Instructions:
 - Only fix broken locators
 - Output valid Python code only
 - Include # FIX: comments for each change
 """
+        prompt_span.update(elements=len(ui_data), ui_tokens=prompt_stats["encoded_tokens"],
+                           saved_tokens=prompt_stats["saved_tokens"], prompt_tokens=estimate_tokens(user_prompt),
+                           fix_format=fix_format)
+
+    return {"prompt": user_prompt, "fix_cache": fix_cache, "cache_id": cache_id, "format": fix_format,
+            "script": selenium_code}
+
+
+def _token_usage(response):
+    usage = getattr(response, "usage_metadata", None) or {}
+    return {"input_tokens": usage.get("input_tokens"), "output_tokens": usage.get("output_tokens")}
+
+
+def extract_code(raw: str) -> str:
+    """Pull the Python code out of an LLM response"""
+    # Extract code from Markdown fenced blocks if present
+    code_match = re.search(r"```(?:python)?\s*(.*?)\s*```", raw, re.S | re.I)
+    if code_match:
+        return code_match.group(1)
+
+    # Fallback: find first line that looks like Python code and take from there
+    lines = raw.splitlines()
+    start_index = 0
+    for i, line in enumerate(lines):
+        if re.match(r'^\s*(import|from|def|class|driver|#)', line):
+            start_index = i
+            break
+    return "\n".join(lines[start_index:]).strip()
+
 
-    llm_instance = get_llm()
+def code_from_answer(raw: str, fix_format: str, script: str):
+    """(fixed script, problem): fix entries applied to the prompt's script, or the code of a script answer"""
+    if fix_format == "patch":
+        try:
+            fixed_code, _ = apply_patch(script, parse_patch(raw))
+        except ValueError as e:
+            return "", f"unusable fix entries: {e}"
+        return fixed_code, None
+    fixed_code = extract_code(raw)
+    return fixed_code, None if fixed_code else "LLM returned no code"
+
+
+def _stream_usage(usage, messages, raw):
+    """Token counts of a streamed answer: reported by the model when it finished, estimated when it was cut off"""
+    usage = usage or {}
+    return {"input_tokens": usage.get("input_tokens") or sum(estimate_tokens(m.content) for m in messages),
+            "output_tokens": usage.get("output_tokens") or estimate_tokens(raw)}
+
+
+def stream_answer(llm_instance, messages, fix_format: str = "script", usage=None, **kwargs):
+    """
+    Stream one LLM answer through the parser for fix_format. Returns (text, abort reason or None);
+    generation stops as soon as the answer is complete or the output cannot be valid.
+    usage, when given, is a dict updated with the token usage the model reports.
+    """
+    parser = PatchStreamParser() if fix_format == "patch" else CodeStreamParser()
+    with closing(llm_instance.stream(messages, **kwargs)) as chunks:
+        for chunk in chunks:
+            if usage is not None and chunk.usage_metadata:
+                usage.update(chunk.usage_metadata)
+            try:
+                if parser.feed(chunk.content):
+                    break
+            except StreamAbort as e:
+                llm_instance.mark_aborted()
+                return parser.text, str(e)
+    return parser.text, None
+
+
+async def astream_answer(llm_instance, messages, fix_format: str = "script", usage=None, **kwargs):
+    """Async stream_answer()"""
+    parser = PatchStreamParser() if fix_format == "patch" else CodeStreamParser()
+    async with aclosing(llm_instance.astream(messages, **kwargs)) as chunks:
+        async for chunk in chunks:
+            if usage is not None and chunk.usage_metadata:
+                usage.update(chunk.usage_metadata)
+            try:
+                if parser.feed(chunk.content):
+                    break
+            except StreamAbort as e:
+                llm_instance.mark_aborted()
+                return parser.text, str(e)
+    return parser.text, None
+
+
+@contextmanager
+def heal_recording(url: str, script_path=None):
+    """
+    Collect the spans of one heal and store the run in the heal history on exit.
+    The caller puts the heal result in the yielded dict under "result".
+    """
+    outcome = {}
+    if not HEAL_HISTORY_ENABLED:
+        yield outcome
+        return
+    before = read_selenium_script(script_path)
+    started, start = time.time(), time.perf_counter()
+    try:
+        with collect_spans() as spans:
+            yield outcome
+    finally:
+        result = outcome.get("result") or {"status": "error", "reason": "heal raised an exception"}
+        try:
+            get_history().record_run(url, script_path, result, before, read_selenium_script(script_path), spans,
+                                     started, round(time.perf_counter() - start, 3))
+        except sqlite3.Error as e:
+            print(f"⚠️ Heal history not updated → {e}")
+
+
+def run_llm_agent(url: str, ui_path=None, script_path=None, llm_gate=None, browser_gate=None):
+    """
+    Use LLM to fix Selenium script automatically using the dumped UI, with a fix log.
+    ui_path/script_path default to the shared ui_dump.json and selenium_action_script.py.
+    llm_gate / browser_gate are optional context managers (e.g. semaphores) held around
+    each LLM call and around the verification run.
+    Returns a dict describing how the script was healed and the verification output;
+    the run is recorded in the heal history.
+    """
+    with heal_recording(url, script_path) as outcome:
+        outcome["result"] = _run_llm_agent(url, ui_path, script_path, llm_gate, browser_gate)
+    return outcome["result"]
+
+
+def _run_llm_agent(url: str, ui_path=None, script_path=None, llm_gate=None, browser_gate=None):
+    prepared = prepare_heal(url, ui_path, script_path, browser_gate)
+    if "result" in prepared:
+        return prepared["result"]
+    user_prompt = prepared["prompt"]
+
+    llm_instance = get_client()
     if llm_instance is None:
         print("❌ LLM not initialized. Exiting...")
-        return
-
-    # Rest of your code for retries, syntax validation, writing script, etc.
+        return _heal_result("failed", reason="LLM not initialized")
+    from langchain_core.messages import HumanMessage
 
+    messages = [HumanMessage(content=user_prompt)]
 
     max_attempts = 3
     for attempt in range(1, max_attempts + 1):
         print(f"\n🔄 LLM Attempt {attempt}...")
-        response = llm_instance.invoke([HumanMessage(content=user_prompt)])
-        raw = response.content.strip()
-
-        # Extract code from Markdown fenced blocks if present
-        code_match = re.search(r"```(?:python)?\s*(.*?)\s*```", raw, re.S | re.I)
-        if code_match:
-            candidate = code_match.group(1)
-        else:
-            # Fallback: find first line that looks like Python code and take from there
-            lines = raw.splitlines()
-            start_index = 0
-            for i, line in enumerate(lines):
-                if re.match(r'^\s*(import|from|def|class|driver|#)', line):
-                    start_index = i
-                    break
-            candidate = "\n".join(lines[start_index:]).strip()
+        with llm_gate or nullcontext(), span("llm_call", attempt=attempt, streaming=LLM_STREAMING) as s:
+            if LLM_STREAMING:
+                usage = {}
+                raw, aborted = stream_answer(llm_instance, messages, prepared["format"], usage)
+                s.update(_stream_usage(usage, messages, raw), output_chars=len(raw), aborted=aborted)
+            else:
+                response = llm_instance.invoke(messages)
+                s.update(_token_usage(response))
+                raw, aborted = response.content, None
+        raw = raw.strip()
+
+        if aborted:
+            print(f"✂️ Stopped the LLM early → {aborted}")
+            if attempt == max_attempts:
+                print("❌ Maximum retries reached. Exiting...")
+                print("Last LLM response:\n", raw)
+                return _heal_result("failed", reason=f"LLM output aborted: {aborted}", attempts=attempt)
+            continue
 
-        fixed_code = candidate
+        with span("code_extraction", attempt=attempt, fix_format=prepared["format"]):
+            fixed_code, problem = code_from_answer(raw, prepared["format"], prepared["script"])
 
         if not fixed_code:
-            print("⚠️ LLM returned no code.")
+            print(f"⚠️ {problem}.")
             if attempt == max_attempts:
                 print("❌ Maximum retries reached. Exiting...")
                 print("Last LLM response:\n", raw)
-                return
+                return _heal_result("failed", reason=problem, attempts=attempt)
             continue
 
         # Validate Python syntax
         try:
-            ast.parse(fixed_code)
+            with span("ast_validation", attempt=attempt):
+                ast.parse(fixed_code)
         except SyntaxError as e:
             print(f"⚠️ LLM returned invalid Python → {e}")
             if attempt == max_attempts:
                 print(" Maximum retries reached. Exiting...")
                 print("Last LLM response:\n", raw)
-                return
+                return _heal_result("failed", reason=f"invalid Python: {e}", attempts=attempt)
             continue  # retry
 
-        # Write valid Python using safe tool
-        result = write_selenium_script(fixed_code)
-        print(f"🛠️ {result}")
-
-        # Extract FIX comments to create a progress log
-        fix_comments = re.findall(r"^\s*#\s*FIX:.*", fixed_code, re.MULTILINE)
-        if fix_comments:
-            print("\n Fix Log (changes applied by AI):")
-            for comment in fix_comments:
-                print(f"- {comment[2:].strip()}")
-        else:
-            print("\n Fix Log: No specific FIX comments found")
-
-        # Run the script safely
-        output = run_selenium()
-        print(output)
-        break  # success
+        run = apply_fixed_code(fixed_code, "AI", script_path, browser_gate, ui_path)
+        if run_succeeded(run[0]):
+            prepared["fix_cache"].put(prepared["cache_id"], fixed_code)
+        return _heal_result("llm", run, attempts=attempt)  # success
+
+
+async def _request_candidate(llm_instance, user_prompt: str, index: int, llm_gate=None, fix_format="script"):
+    """One LLM candidate; candidates after the first use a higher temperature so they differ"""
+    from langchain_core.messages import HumanMessage
+    temperature = LLM_CANDIDATE_TEMPERATURES[min(index, len(LLM_CANDIDATE_TEMPERATURES) - 1)]
+    messages = [HumanMessage(content=user_prompt)]
+    async with llm_gate or nullcontext():
+        with span("llm_call", candidate=index, temperature=temperature, streaming=LLM_STREAMING) as s:
+            if LLM_STREAMING:
+                usage = {}
+                raw, aborted = await astream_answer(llm_instance, messages, fix_format, usage,
+                                                    temperature=temperature)
+                s.update(_stream_usage(usage, messages, raw), output_chars=len(raw), aborted=aborted)
+                if aborted:
+                    raise StreamAbort(f"candidate {index}: {aborted}")
+            else:
+                response = await llm_instance.ainvoke(messages, temperature=temperature)
+                s.update(_token_usage(response))
+                raw = response.content
+    return index, raw.strip()
+
+
+async def heal_async(url: str, ui_path=None, script_path=None, candidates: int = LLM_CANDIDATES,
+                     llm_gate=None, browser_gate=None):
+    """
+    Async LLM stage: request several candidate fixes at once, validate each as it arrives
+    and verify valid ones in arrival order. The first candidate that verifies wins and the
+    requests still in flight are cancelled. llm_gate is an optional asyncio.Semaphore.
+    The run is recorded in the heal history.
+    """
+    with heal_recording(url, script_path) as outcome:
+        outcome["result"] = await _heal_async(url, ui_path, script_path, candidates, llm_gate, browser_gate)
+    return outcome["result"]
+
+
+async def _heal_async(url: str, ui_path=None, script_path=None, candidates: int = LLM_CANDIDATES,
+                      llm_gate=None, browser_gate=None):
+    prepared = await asyncio.to_thread(prepare_heal, url, ui_path, script_path, browser_gate)
+    if "result" in prepared:
+        return prepared["result"]
+
+    llm_instance = get_client()
+    if llm_instance is None:
+        print("❌ LLM not initialized. Exiting...")
+        return _heal_result("failed", reason="LLM not initialized")
+
+    print(f"\n🔄 Requesting {candidates} LLM candidates in parallel...")
+    tasks = [asyncio.create_task(_request_candidate(llm_instance, prepared["prompt"], i, llm_gate,
+                                                    prepared["format"]))
+             for i in range(candidates)]
+    last_run, valid = None, 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                index, raw = await next_done
+            except StreamAbort as e:
+                print(f"✂️ Stopped LLM {e}")
+                continue
+            except Exception as e:
+                print(f"⚠️ LLM candidate failed → {e}")
+                continue
+
+            with span("code_extraction", candidate=index, fix_format=prepared["format"]):
+                fixed_code, problem = code_from_answer(raw, prepared["format"], prepared["script"])
+            if not fixed_code:
+                print(f"⚠️ Candidate {index}: {problem}.")
+                continue
+            try:
+                with span("ast_validation", candidate=index):
+                    ast.parse(fixed_code)
+            except SyntaxError as e:
+                print(f"⚠️ Candidate {index} is invalid Python → {e}")
+                continue
+
+            valid += 1
+            print(f"\n🧪 Verifying candidate {index}...")
+            last_run = await asyncio.to_thread(
+                apply_fixed_code, fixed_code, f"AI candidate {index}", script_path, browser_gate, ui_path
+            )
+            if run_succeeded(last_run[0]):
+                prepared["fix_cache"].put(prepared["cache_id"], fixed_code)
+                return _heal_result("llm", last_run, candidate=index, candidates=candidates)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if last_run is not None:
+        return _heal_result("llm", last_run, candidates=candidates, valid_candidates=valid)
+    print("❌ No valid candidate returned. Exiting...")
+    return _heal_result("failed", reason="no valid LLM candidate", candidates=candidates)
+
+
+def run_llm_agent_async(url: str, ui_path=None, script_path=None, candidates: int = LLM_CANDIDATES):
+    """Synchronous entry point for heal_async"""
+    return asyncio.run(heal_async(url, ui_path, script_path, candidates))
 
 
 @traceable(name="selenium_self_healing_main")
@@ -139,15 +645,25 @@ def main():
         print("❌ URL is required")
         return
 
-    print("\n🔍 Step 1: Dumping UI elements...")
-    dump_ui(url)
-    print("✅ UI dumped successfully")
-
-    print("\n🛠️ Step 2: Running Selenium agent...")
-    start = time.time()
-    run_llm_agent(url)
-    duration = round(time.time() - start, 2)
+    with span("heal_run", url=url):
+        print("\n🔍 Step 1: Dumping UI elements...")
+        with span("dump_ui"):
+            dump_ui(url)
+        print("✅ UI dumped successfully")
+
+        print("\n🛠️ Step 2: Running Selenium agent...")
+        start = time.time()
+        with span("heal") as s:
+            if LLM_CANDIDATES > 1:
+                result = run_llm_agent_async(url)
+            else:
+                result = run_llm_agent(url)
+            s.update(status=result["status"], verified=result["verified"])
+        duration = round(time.time() - start, 2)
     print(f"\n⏱️ Total execution time: {duration} seconds")
+    print(f"🚗 Browser pool: {get_pool().stats()}")
+    if client_stats():
+        print(f"🧠 LLM client: {client_stats()}")
 
 
 if __name__ == "__main__":
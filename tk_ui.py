@@ -5,19 +5,112 @@ Features:
 - Enter URL and Dump UI
 - Run LLM agent
 - Run Selenium script
-- View ui_dump.json and selenium_action_script.py
+- View ui_dump.json (paged and searchable) and selenium_action_script.py
 - Colorful, responsive layout with modern look
+
+Tk widgets may only be touched from the main thread: worker threads post their
+updates to a queue that the main loop drains with after() in batches.
 """
 
+import json
+import queue
 import threading
 import time
 import customtkinter as ctk
 from main import dump_ui, run_llm_agent
-from agent.tools import run_selenium, read_ui_json, read_selenium_script
+from agent.tools import UI_JSON_PATH, run_selenium, read_selenium_script
+from ui_store import DumpReader, has_jsonl, load_elements
+from log_capture import capture_thread_output
+from config import UI_PAGE_SIZE, UI_QUEUE_POLL_MS, UI_QUEUE_BATCH
 
 ctk.set_appearance_mode("Light")  # "Dark" for dark mode
 ctk.set_default_color_theme("blue")  # Options: "blue", "green", "dark-blue"
 
+def element_summary(element) -> str:
+    """One searchable line per element: tag#id.class [name] "text"."""
+    attrs = element.get("attributes", {})
+    line = element.get("tag", "?")
+    if attrs.get("id"):
+        line += f"#{attrs['id']}"
+    if attrs.get("class"):
+        line += "." + ".".join(attrs["class"].split())
+    for key in ("name", "type", "placeholder", "aria-label", "role", "href"):
+        if attrs.get(key):
+            line += f" [{key}={attrs[key]}]"
+    if element.get("text"):
+        line += f' "{element["text"][:80]}"'
+    return line
+
+
+class DumpPager:
+    """
+    Paged access to the UI dump. Pages are read on demand from the JSONL dump (or the
+    JSON file for old dumps); the search index holds one summary line per element.
+    """
+
+    def __init__(self, ui_path, page_size: int = UI_PAGE_SIZE):
+        self.page_size = page_size
+        if has_jsonl(ui_path):
+            self.source = DumpReader(ui_path)
+        else:
+            self.source = load_elements(ui_path)
+        self.summaries = None
+        self.matches = range(len(self.source))
+        self.query = ""
+        self.page = 0
+
+    def build_index(self):
+        """Scan the dump once for the search index (slow for big dumps: call from a worker thread)."""
+        if isinstance(self.source, DumpReader):
+            # Separate reader: the main thread keeps using self.source for pages meanwhile
+            with DumpReader(self.source.path) as reader:
+                return [element_summary(e).lower() for e in reader]
+        return [element_summary(e).lower() for e in self.source]
+
+    def search(self, query: str):
+        self.query = query.strip().lower()
+        if not self.query or self.summaries is None:
+            self.matches = range(len(self.source))
+        else:
+            self.matches = [i for i, line in enumerate(self.summaries) if self.query in line]
+        self.page = 0
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-len(self.matches) // self.page_size))
+
+    def turn(self, delta: int):
+        self.page = min(max(self.page + delta, 0), self.pages - 1)
+
+    def visible(self):
+        """(dump index, element) pairs of the current page."""
+        start = self.page * self.page_size
+        return [(i, self.source[i]) for i in self.matches[start:start + self.page_size]]
+
+    def close(self):
+        if isinstance(self.source, DumpReader):
+            self.source.close()
+
+
+class LogWriter:
+    """File-like sink for capture_thread_output(): forwards complete print() lines to ModernApp.log()."""
+
+    def __init__(self, app):
+        self.app = app
+        self.partial = ""
+
+    def write(self, text):
+        self.partial += text
+        *lines, self.partial = self.partial.split("\n")
+        for line in lines:
+            if line.strip():
+                self.app.log(line)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
 class ModernApp(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -57,10 +150,24 @@ class ModernApp(ctk.CTk):
         self.ui_frame = ctk.CTkFrame(self.bottom_frame)
         self.ui_frame.pack(side="left", fill="both", expand=True, padx=(0,7))
         ctk.CTkLabel(self.ui_frame, text="UI Dump (ui_dump.json)", font=("Roboto", 12, "bold")).pack(anchor="w", padx=5, pady=5)
+        self.search_var = ctk.StringVar()
+        self.search_entry = ctk.CTkEntry(self.ui_frame, textvariable=self.search_var,
+                                         placeholder_text="Search tag, id, class, text…")
+        self.search_entry.pack(fill="x", padx=5, pady=(0,5))
+        self.search_entry.bind("<Return>", lambda e: self.search_dump())
         self.ui_area = ctk.CTkTextbox(self.ui_frame, wrap="word", font=("Consolas", 10))
         self.ui_area.pack(fill="both", expand=True, padx=5, pady=(0,5))
-        self.ui_refresh_btn = ctk.CTkButton(self.ui_frame, text="Refresh UI Dump", width=120, command=self.show_ui_dump)
-        self.ui_refresh_btn.pack(pady=5)
+        self.pager_frame = ctk.CTkFrame(self.ui_frame, fg_color="transparent")
+        self.pager_frame.pack(fill="x", pady=5)
+        self.prev_btn = ctk.CTkButton(self.pager_frame, text="◀", width=30, command=lambda: self.turn_page(-1))
+        self.prev_btn.pack(side="left", padx=5)
+        self.page_label = ctk.CTkLabel(self.pager_frame, text="")
+        self.page_label.pack(side="left", padx=5)
+        self.next_btn = ctk.CTkButton(self.pager_frame, text="▶", width=30, command=lambda: self.turn_page(1))
+        self.next_btn.pack(side="left", padx=5)
+        self.ui_refresh_btn = ctk.CTkButton(self.pager_frame, text="Refresh UI Dump", width=120, command=self.show_ui_dump)
+        self.ui_refresh_btn.pack(side="right", padx=5)
+        self.pager = None
 
         # Selenium script
         self.script_frame = ctk.CTkFrame(self.bottom_frame)
@@ -71,14 +178,49 @@ class ModernApp(ctk.CTk):
         self.script_refresh_btn = ctk.CTkButton(self.script_frame, text="Refresh Script", width=120, command=self.show_script)
         self.script_refresh_btn.pack(pady=5)
 
+        # Updates from worker threads, applied on the main thread by drain_updates()
+        self.updates = queue.Queue()
+        self.after(UI_QUEUE_POLL_MS, self.drain_updates)
+
         # Initial load
         self.show_ui_dump()
         self.show_script()
 
+    # Thread-safe updates
+    def post(self, func, *args):
+        """Run func(*args) on the Tk main thread; safe to call from any thread."""
+        self.updates.put((func, args))
+
+    def log(self, text):
+        """Thread-safe append_log()."""
+        self.updates.put((None, (f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {text}\n",)))
+
+    def drain_updates(self):
+        # Apply at most UI_QUEUE_BATCH updates per tick; consecutive log lines become one insert
+        lines = []
+        try:
+            for _ in range(UI_QUEUE_BATCH):
+                func, args = self.updates.get_nowait()
+                if func is None:
+                    lines.append(args[0])
+                    continue
+                if lines:
+                    self._insert_log("".join(lines))
+                    lines = []
+                func(*args)
+        except queue.Empty:
+            pass
+        if lines:
+            self._insert_log("".join(lines))
+        self.after(UI_QUEUE_POLL_MS, self.drain_updates)
+
     # Logging
     def append_log(self, text):
+        self._insert_log(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {text}\n")
+
+    def _insert_log(self, text):
         self.log_area.configure(state="normal")
-        self.log_area.insert("end", f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {text}\n")
+        self.log_area.insert("end", text)
         self.log_area.see("end")
         self.log_area.configure(state="disabled")
 
@@ -98,16 +240,17 @@ class ModernApp(ctk.CTk):
         threading.Thread(target=self._dump_task, args=(url,), daemon=True).start()
 
     def _dump_task(self, url):
-        self.append_log(f"Starting UI dump for {url}")
-        self.set_buttons_state("disabled")
+        self.log(f"Starting UI dump for {url}")
+        self.post(self.set_buttons_state, "disabled")
         try:
-            dump_ui(url)
-            self.append_log("✅ UI dump completed")
-            self.show_ui_dump()
+            with capture_thread_output(LogWriter(self)):
+                dump_ui(url)
+            self.log("✅ UI dump completed")
+            self.post(self.show_ui_dump)
         except Exception as e:
-            self.append_log(f"❌ Error during UI dump: {e}")
+            self.log(f"❌ Error during UI dump: {e}")
         finally:
-            self.set_buttons_state("normal")
+            self.post(self.set_buttons_state, "normal")
 
     def start_agent(self):
         url = self.url_var.get().strip()
@@ -117,42 +260,91 @@ class ModernApp(ctk.CTk):
         threading.Thread(target=self._agent_task, args=(url,), daemon=True).start()
 
     def _agent_task(self, url):
-        self.append_log(f"Running LLM agent for {url}")
-        self.set_buttons_state("disabled")
+        self.log(f"Running LLM agent for {url}")
+        self.post(self.set_buttons_state, "disabled")
         try:
-            dump_ui(url)
-            self.append_log("UI dumped — invoking agent")
-            run_llm_agent(url)
-            self.append_log("✅ LLM agent finished")
-            self.show_script()
+            # Pipeline progress (print) goes to the log pane instead of the console
+            with capture_thread_output(LogWriter(self)):
+                dump_ui(url)
+                self.log("UI dumped — invoking agent")
+                run_llm_agent(url)
+            self.log("✅ LLM agent finished")
+            self.post(self.show_script)
         except Exception as e:
-            self.append_log(f"❌ Error during agent run: {e}")
+            self.log(f"❌ Error during agent run: {e}")
         finally:
-            self.set_buttons_state("normal")
+            self.post(self.set_buttons_state, "normal")
 
     def start_run_script(self):
         threading.Thread(target=self._run_script_task, daemon=True).start()
 
     def _run_script_task(self):
-        self.append_log("Running Selenium script...")
-        self.set_buttons_state("disabled")
+        self.log("Running Selenium script...")
+        self.post(self.set_buttons_state, "disabled")
         try:
             output = run_selenium()
-            self.append_log("✅ Selenium run completed — output below:")
-            self.append_log(output)
+            self.log("✅ Selenium run completed — output below:")
+            self.log(output)
         except Exception as e:
-            self.append_log(f"❌ Error running script: {e}")
+            self.log(f"❌ Error running script: {e}")
         finally:
-            self.set_buttons_state("normal")
+            self.post(self.set_buttons_state, "normal")
 
     # Show UI dump
     def show_ui_dump(self):
+        if self.pager:
+            self.pager.close()
+            self.pager = None
+        try:
+            self.pager = DumpPager(UI_JSON_PATH)
+        except Exception as e:
+            self._set_ui_text(f"❌ Error reading ui_dump.json: {e}")
+            self.page_label.configure(text="")
+            return
+        self.render_page()
+        pager = self.pager
+        threading.Thread(target=self._index_task, args=(pager,), daemon=True).start()
+
+    def _index_task(self, pager):
         try:
-            data = read_ui_json()
+            summaries = pager.build_index()
         except Exception as e:
-            data = f"❌ Error reading ui_dump.json: {e}"
+            self.log(f"❌ Error indexing ui_dump.json: {e}")
+            return
+        self.post(self._index_ready, pager, summaries)
+
+    def _index_ready(self, pager, summaries):
+        if pager is not self.pager:
+            return  # a newer dump was loaded meanwhile
+        pager.summaries = summaries
+        if self.search_var.get().strip():
+            self.search_dump()
+
+    def search_dump(self):
+        if not self.pager:
+            return
+        if self.pager.summaries is None and self.search_var.get().strip():
+            self.page_label.configure(text="Indexing dump…")
+            return
+        self.pager.search(self.search_var.get())
+        self.render_page()
+
+    def turn_page(self, delta):
+        if self.pager:
+            self.pager.turn(delta)
+            self.render_page()
+
+    def render_page(self):
+        # Only the current page is read from disk and inserted into the textbox
+        pager = self.pager
+        rows = [f"#{i}\n{json.dumps(element, indent=2, ensure_ascii=False)}" for i, element in pager.visible()]
+        self._set_ui_text("\n\n".join(rows) if rows else "No matching elements.")
+        matched = f"{len(pager.matches)} of {len(pager.source)}" if pager.query else f"{len(pager.source)}"
+        self.page_label.configure(text=f"Page {pager.page + 1}/{pager.pages} — {matched} elements")
+
+    def _set_ui_text(self, text):
         self.ui_area.delete("1.0", "end")
-        self.ui_area.insert("end", data)
+        self.ui_area.insert("end", text)
 
     # Show Selenium script
     def show_script(self):
@@ -0,0 +1,190 @@
+"""
+Per-stage timing spans for the heal pipeline.
+
+    with span("scrape", elements=0) as s:
+        ui_data = scrape_ui(driver)
+        s["elements"] = len(ui_data)
+
+Every finished span is appended as one JSON line to TRACE_PATH with its trace
+id, parent span, duration and attributes. When langsmith tracing is configured
+(LANGSMITH_TRACING / LANGCHAIN_TRACING_V2 and an API key) the spans are also
+forwarded as nested langsmith runs. collect_spans() additionally hands the spans
+finished inside a block to the caller (heal_history stores them per heal run).
+
+Summarize p50/p95 per stage across runs:
+    python tracing.py [traces.jsonl]
+"""
+
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from config import TRACING_ENABLED, TRACE_PATH
+
+_current = contextvars.ContextVar("current_span", default=None)
+_collector = contextvars.ContextVar("span_collector", default=None)
+_write_lock = threading.Lock()
+
+
+def langsmith_enabled() -> bool:
+    flag = os.getenv("LANGSMITH_TRACING") or os.getenv("LANGCHAIN_TRACING_V2") or ""
+    key = os.getenv("LANGSMITH_API_KEY") or os.getenv("LANGCHAIN_API_KEY")
+    return flag.lower() == "true" and bool(key)
+
+
+@contextmanager
+def _langsmith_run(name, attrs):
+    if not langsmith_enabled():
+        yield None
+        return
+    try:
+        from langsmith import trace
+        manager = trace(name=name, run_type="chain", inputs=dict(attrs))
+        run = manager.__enter__()
+    except Exception:
+        yield None
+        return
+    try:
+        yield run
+    except BaseException:
+        manager.__exit__(*sys.exc_info())
+        raise
+    else:
+        manager.__exit__(None, None, None)
+
+
+@contextmanager
+def collect_spans():
+    """Yield a list that receives every span record finished inside the block, even with tracing disabled."""
+    spans = []
+    token = _collector.set(spans)
+    try:
+        yield spans
+    finally:
+        _collector.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a pipeline stage; yields a dict of attributes the caller may add to."""
+    collected = _collector.get()
+    if not TRACING_ENABLED and collected is None:
+        yield attrs
+        return
+
+    parent = _current.get()
+    record = {
+        "trace_id": parent["trace_id"] if parent else uuid.uuid4().hex,
+        "span_id": uuid.uuid4().hex[:16],
+        "parent_id": parent["span_id"] if parent else None,
+        "name": name,
+        "start": time.time(),
+    }
+    token = _current.set(record)
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        with _langsmith_run(name, attrs) if TRACING_ENABLED else nullcontext() as run:
+            try:
+                yield attrs
+            finally:
+                if run is not None:
+                    run.add_outputs({k: v for k, v in attrs.items() if _is_simple(v)})
+    except BaseException as e:
+        status = f"error: {type(e).__name__}"
+        raise
+    finally:
+        _current.reset(token)
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        record["status"] = status
+        record["attrs"] = {k: v for k, v in attrs.items() if _is_simple(v)}
+        if collected is not None:
+            collected.append(record)
+        if TRACING_ENABLED:
+            _export(record)
+
+
+def traceable(name: str):
+    """langsmith.traceable, applied on the first call so importing the decorated module does not load langsmith."""
+    def decorator(func):
+        traced = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal traced
+            if traced is None:
+                from langsmith import traceable as langsmith_traceable
+                traced = langsmith_traceable(name=name)(func)
+            return traced(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _is_simple(value):
+    return isinstance(value, (str, int, float, bool)) or value is None
+
+
+def _export(record):
+    line = json.dumps(record, ensure_ascii=False)
+    with _write_lock:
+        with open(TRACE_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def load_spans(path=TRACE_PATH):
+    spans = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return spans
+
+
+def percentile(sorted_values, q):
+    """Linearly interpolated q-quantile (0..1) of an ascending list; 0.0 when empty."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(spans):
+    """{stage: {"count", "p50_ms", "p95_ms", "total_ms"}} across all recorded runs."""
+    by_name = {}
+    for s in spans:
+        by_name.setdefault(s["name"], []).append(s["duration_ms"])
+    summary = {}
+    for name, durations in by_name.items():
+        durations.sort()
+        summary[name] = {
+            "count": len(durations),
+            "p50_ms": round(percentile(durations, 0.5), 1),
+            "p95_ms": round(percentile(durations, 0.95), 1),
+            "total_ms": round(sum(durations), 1),
+        }
+    return summary
+
+
+def print_summary(path=TRACE_PATH):
+    summary = summarize(load_spans(path))
+    if not summary:
+        print(f"No spans recorded in {path}")
+        return
+    print(f"{'stage':<22}{'count':>7}{'p50 ms':>12}{'p95 ms':>12}{'total ms':>14}")
+    for name, s in sorted(summary.items(), key=lambda item: -item[1]["total_ms"]):
+        print(f"{name:<22}{s['count']:>7}{s['p50_ms']:>12}{s['p95_ms']:>12}{s['total_ms']:>14}")
+
+
+if __name__ == "__main__":
+    print_summary(sys.argv[1] if len(sys.argv) > 1 else TRACE_PATH)
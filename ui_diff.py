@@ -0,0 +1,167 @@
+"""
+Structural diffing between consecutive UI dumps.
+
+Each element gets a stable key built from its identifying attributes (or, for
+anonymous elements, its tag, text and position among same-signature siblings),
+so two snapshots can be compared without geometry noise. dump_ui keeps the
+previous snapshot next to ui_dump.json; the healer can then look only at what
+changed, and an unchanged page can skip healing entirely.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from agent.fix_cache import ui_fingerprint, normalize_script
+from ui_store import jsonl_path, index_path, load_elements
+
+# Attributes whose change means the element itself changed (geometry and visibility are ignored)
+COMPARED_ATTRIBUTES = ("id", "name", "type", "class", "role", "aria-label", "placeholder", "href", "src")
+
+
+def element_key(element, occurrence: int = 0) -> str:
+    attrs = element.get("attributes", {})
+    tag = element.get("tag", "")
+    if attrs.get("id"):
+        base = f"{tag}#{attrs['id']}"
+    elif attrs.get("name"):
+        base = f"{tag}[name={attrs['name']}]"
+    else:
+        label = element.get("text") or attrs.get("aria-label") or attrs.get("placeholder") or attrs.get("type", "")
+        base = f"{tag}:{label[:40]}"
+    return f"{base}@{occurrence}"
+
+
+def keyed(ui_data):
+    """{stable key: element}; duplicates of the same base key are told apart by occurrence order."""
+    seen = {}
+    out = {}
+    for el in ui_data:
+        base = element_key(el)
+        occurrence = seen.get(base, 0)
+        seen[base] = occurrence + 1
+        out[element_key(el, occurrence)] = el
+    return out
+
+
+def _signature(element):
+    attrs = element.get("attributes", {})
+    return [element.get("tag"), element.get("text", "")] + [attrs.get(name, "") for name in COMPARED_ATTRIBUTES]
+
+
+def diff_snapshots(previous, current):
+    """
+    Compare two dumps. Returns {"added", "removed", "changed"}: lists of elements,
+    with "changed" holding {"key", "before", "after"} records.
+    """
+    old, new = keyed(previous), keyed(current)
+    return {
+        "added": [new[k] for k in new if k not in old],
+        "removed": [old[k] for k in old if k not in new],
+        "changed": [{"key": k, "before": old[k], "after": new[k]}
+                    for k in new if k in old and _signature(old[k]) != _signature(new[k])],
+    }
+
+
+def is_empty(delta) -> bool:
+    return not (delta["added"] or delta["removed"] or delta["changed"])
+
+
+def previous_path(ui_path) -> Path:
+    ui_path = Path(ui_path)
+    return ui_path.with_name(ui_path.stem + ".prev" + ui_path.suffix)
+
+
+def fingerprint_path(ui_path) -> Path:
+    ui_path = Path(ui_path)
+    return ui_path.with_name(ui_path.stem + ".fingerprint")
+
+
+def verified_path(ui_path) -> Path:
+    ui_path = Path(ui_path)
+    return ui_path.with_name(ui_path.stem + ".verified")
+
+
+def rotate_snapshot(ui_path):
+    """
+    Keep the current dump (with its fingerprint and verification record) as the previous snapshot
+    before it is overwritten. Until write_fingerprint() runs for the new dump, it has neither.
+    """
+    ui_path = Path(ui_path)
+    previous = previous_path(ui_path)
+    for current, old in ((ui_path, previous),
+                         (jsonl_path(ui_path), jsonl_path(previous)),
+                         (index_path(ui_path), index_path(previous)),
+                         (fingerprint_path(ui_path), fingerprint_path(previous)),
+                         (verified_path(ui_path), verified_path(previous))):
+        if current.exists():
+            current.replace(old)
+        else:
+            # A file the current dump does not have must not survive from an older previous one
+            old.unlink(missing_ok=True)
+
+
+def clear_fingerprint(ui_path):
+    """Forget the fingerprint of a dump that is about to be overwritten without rotation."""
+    fingerprint_path(ui_path).unlink(missing_ok=True)
+
+
+def write_fingerprint(ui_path, ui_data=None, fingerprint=None):
+    """
+    Store the dump's structural fingerprint; pass fingerprint when it was computed while streaming.
+    A heal verified on the previous snapshot carries over when the structure is the same.
+    """
+    fingerprint = fingerprint or ui_fingerprint(ui_data)
+    fingerprint_path(ui_path).write_text(fingerprint, encoding="utf-8")
+    try:
+        record = json.loads(verified_path(previous_path(ui_path)).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return
+    if record.get("fingerprint") == fingerprint and not verified_path(ui_path).exists():
+        verified_path(ui_path).write_text(json.dumps(record), encoding="utf-8")
+
+
+def page_unchanged(ui_path) -> bool:
+    """
+    Fast check: True when the current and previous dumps have the same structural fingerprint.
+    Only compares two short hash files written by dump_ui, so it never parses the dumps.
+    """
+    current = fingerprint_path(ui_path)
+    previous = fingerprint_path(previous_path(ui_path))
+    try:
+        return current.read_text(encoding="utf-8") == previous.read_text(encoding="utf-8")
+    except OSError:
+        return False
+
+
+def _script_hash(code: str) -> str:
+    return hashlib.sha256(normalize_script(code).encode("utf-8")).hexdigest()
+
+
+def mark_verified(ui_path, code: str):
+    """Record that code verified against the page currently fingerprinted for ui_path."""
+    try:
+        fingerprint = fingerprint_path(ui_path).read_text(encoding="utf-8")
+    except OSError:
+        return
+    record = {"script": _script_hash(code), "fingerprint": fingerprint}
+    verified_path(ui_path).write_text(json.dumps(record), encoding="utf-8")
+
+
+def heal_is_current(ui_path, code: str) -> bool:
+    """
+    True when code already verified against a page with the current structure,
+    i.e. nothing structural changed since the last successful heal of this script.
+    """
+    try:
+        record = json.loads(verified_path(ui_path).read_text(encoding="utf-8"))
+        fingerprint = fingerprint_path(ui_path).read_text(encoding="utf-8")
+    except (OSError, ValueError):
+        return False
+    return record.get("fingerprint") == fingerprint and record.get("script") == _script_hash(code)
+
+
+def load_previous(ui_path):
+    try:
+        return load_elements(previous_path(ui_path))
+    except (OSError, ValueError):
+        return None
@@ -1,27 +1,126 @@
-from selenium.webdriver.common.by import By
+from urllib.parse import urlparse
+from config import (
+    SCRAPE_ENGINE, SCRAPE_MODE, IMPORTANT_TAGS, ATTRIBUTES,
+    EXTRA_SELECTORS, SITE_PROFILES, SCRAPE_BATCH_SIZE
+)
 
-IMPORTANT_TAGS = {
-    "button", "input", "a",
-    "select", "textarea",
-    "img", "label"
+# Serializes every matching element in the page in a single round trip.
+# Produces the same schema as clean_element() so both engines are interchangeable.
+# With a batch size (arguments[4]) only nodes [start, start + count) are serialized; the node
+# list is kept on window between batches and {elements, next, total} is returned instead.
+SNAPSHOT_JS = """
+const selector = arguments[0];
+const tags = new Set(arguments[1]);
+const attrs = arguments[2];
+const start = arguments[3] || 0;
+const count = arguments[4] || 0;
+const urlProps = new Set(["href", "src"]);
+
+function isVisible(el) {
+    if (!el.isConnected) return false;
+    if (el.tagName === "INPUT" && (el.type || "").toLowerCase() === "hidden") return false;
+    const style = window.getComputedStyle(el);
+    if (style.display === "none" || style.visibility === "hidden" || style.visibility === "collapse") return false;
+    if (parseFloat(style.opacity) === 0) return false;
+    for (let p = el.parentElement; p; p = p.parentElement) {
+        if (window.getComputedStyle(p).display === "none") return false;
+    }
+    const rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
 }
 
-ATTRIBUTES = {
-    "id", "class", "name",
-    "type", "placeholder",
-    "role", "aria-label",
-    "href", "src"
+let nodes = start > 0 ? window.__uiSnapshotNodes : null;
+if (!nodes) {
+    nodes = Array.from(selector ? document.querySelectorAll(selector) : document.getElementsByTagName("*"));
+    if (count) window.__uiSnapshotNodes = nodes;
 }
+const end = count ? Math.min(nodes.length, start + count) : nodes.length;
+const out = [];
+for (let i = start; i < end; i++) {
+    const el = nodes[i];
+    const tag = el.tagName.toLowerCase();
+    if (!selector && tags.size && !tags.has(tag)) continue;
+
+    const attributes = {};
+    for (const name of attrs) {
+        let value = el.getAttribute(name);
+        if (value && urlProps.has(name) && typeof el[name] === "string") value = el[name];
+        if (value) attributes[name] = value;
+    }
+
+    const visible = isVisible(el);
+    const rect = el.getBoundingClientRect();
+    out.push({
+        tag: tag,
+        text: visible ? (el.innerText || "").trim() : "",
+        attributes: attributes,
+        visible: visible,
+        enabled: !el.disabled,
+        location: {x: Math.round(rect.left + window.scrollX), y: Math.round(rect.top + window.scrollY)},
+        size: {height: Math.round(rect.height), width: Math.round(rect.width)}
+    });
+}
+if (!count) return out;
+if (end >= nodes.length) delete window.__uiSnapshotNodes;
+return {elements: out, next: end, total: nodes.length};
+"""
+
+# WebElement handles for nodes [start, start + count) of the selector (every node without one)
+ELEMENT_SLICE_JS = """
+const selector = arguments[0], start = arguments[1], count = arguments[2];
+if (start === 0 || !window.__uiSliceNodes) {
+    window.__uiSliceNodes = Array.from(selector ? document.querySelectorAll(selector) : document.getElementsByTagName("*"));
+}
+const nodes = window.__uiSliceNodes;
+const total = nodes.length;
+const elements = nodes.slice(start, start + count);
+if (start + count >= total) delete window.__uiSliceNodes;
+return {elements: elements, total: total};
+"""
+
+
+def get_site_profile(url=None):
+    """Return the scrape settings for url: config defaults overridden by a matching SITE_PROFILES entry."""
+    profile = {
+        "important_tags": IMPORTANT_TAGS,
+        "extra_selectors": EXTRA_SELECTORS,
+        "attributes": ATTRIBUTES,
+    }
+    host = (urlparse(url).hostname or "") if url else ""
+    for pattern, overrides in SITE_PROFILES.items():
+        if host == pattern or host.endswith("." + pattern):
+            profile.update(overrides)
+    return profile
+
+
+def build_selector(tags=IMPORTANT_TAGS, extra_selectors=EXTRA_SELECTORS):
+    """CSS selector matching the important tags plus any extra selectors."""
+    return ", ".join(sorted(tags) + list(extra_selectors))
 
 
 def scrape_all_elements(driver):
+    from selenium.webdriver.common.by import By
     return driver.find_elements(By.XPATH, "//*")
 
 
-def clean_element(element):
+def scrape_important_elements(driver, selector=None):
+    """Only return elements matched by the important-element selector."""
+    from selenium.webdriver.common.by import By
+    return driver.find_elements(By.CSS_SELECTOR, selector or build_selector())
+
+
+def snapshot_elements(driver, tags=IMPORTANT_TAGS, attributes=ATTRIBUTES, selector=None):
+    """
+    Return cleaned and filtered elements for the current page with one execute_script call.
+    With a selector the browser only visits matching nodes, otherwise every node is filtered by tag.
+    """
+    return driver.execute_script(SNAPSHOT_JS, selector, sorted(tags), sorted(attributes)) or []
+
+
+def clean_element(element, attributes_to_read=ATTRIBUTES):
     attributes = {}
 
-    for attr in ATTRIBUTES:
+    for attr in attributes_to_read:
         value = element.get_attribute(attr)
         if value:
             attributes[attr] = value
@@ -37,5 +136,65 @@ def clean_element(element):
     }
 
 
-def filter_element(cleaned_element):
-    return cleaned_element["tag"] in IMPORTANT_TAGS
+def filter_element(cleaned_element, tags=IMPORTANT_TAGS):
+    return cleaned_element["tag"] in tags
+
+
+def scrape_ui(driver, engine=SCRAPE_ENGINE, mode=SCRAPE_MODE, profile=None):
+    """
+    Collect the important UI elements of the page currently loaded in driver.
+    In "query" mode the selection happens in the locator, so non-interactive nodes are never serialized.
+    """
+    profile = profile or get_site_profile(driver.current_url)
+    tags, attributes = profile["important_tags"], profile["attributes"]
+    selector = build_selector(tags, profile["extra_selectors"]) if mode == "query" else None
+
+    if engine == "snapshot":
+        return snapshot_elements(driver, tags, attributes, selector)
+
+    if selector:
+        elements = scrape_important_elements(driver, selector)
+    else:
+        elements = scrape_all_elements(driver)
+
+    ui_data = []
+    for el in elements:
+        try:
+            cleaned = clean_element(el, attributes)
+            if selector or filter_element(cleaned, tags):
+                ui_data.append(cleaned)
+        except Exception:
+            continue
+    return ui_data
+
+
+def iter_ui(driver, engine=SCRAPE_ENGINE, mode=SCRAPE_MODE, profile=None, batch_size=SCRAPE_BATCH_SIZE):
+    """
+    scrape_ui() in fixed-size batches: yields lists of element dicts, fetching at most batch_size
+    page nodes per round trip, so neither the browser reply nor the element handles for the whole
+    page are ever held at once.
+    """
+    profile = profile or get_site_profile(driver.current_url)
+    tags, attributes = profile["important_tags"], profile["attributes"]
+    selector = build_selector(tags, profile["extra_selectors"]) if mode == "query" else None
+    start, total = 0, None
+
+    while total is None or start < total:
+        if engine == "snapshot":
+            reply = driver.execute_script(SNAPSHOT_JS, selector, sorted(tags), sorted(attributes), start, batch_size)
+            total = reply["total"]
+            batch = reply["elements"]
+        else:
+            reply = driver.execute_script(ELEMENT_SLICE_JS, selector, start, batch_size)
+            total = reply["total"]
+            batch = []
+            for el in reply["elements"]:
+                try:
+                    cleaned = clean_element(el, attributes)
+                    if selector or filter_element(cleaned, tags):
+                        batch.append(cleaned)
+                except Exception:
+                    continue
+        start += batch_size
+        if batch:
+            yield batch
@@ -0,0 +1,208 @@
+"""
+Streaming storage for UI dumps.
+
+Dumps are written as JSON Lines (one compact element per line) next to a
+binary offset index, so readers can iterate lazily or jump straight to element
+i without loading the file:
+
+    ui_dump.jsonl       {"tag": "input", ...}\n{"tag": "button", ...}\n...
+    ui_dump.jsonl.idx   little-endian uint64 byte offset of every line
+
+The indented ui_dump.json is still produced for humans (export_json) but is not
+needed by any reader. Crawled dumps add ui_dump.pages.json, mapping every page to
+the indices of its elements.
+"""
+
+import json
+import sys
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+
+
+def jsonl_path(ui_path) -> Path:
+    """ui_dump.json → ui_dump.jsonl"""
+    return Path(ui_path).with_suffix(".jsonl")
+
+
+def index_path(ui_path) -> Path:
+    return Path(str(jsonl_path(ui_path)) + ".idx")
+
+
+def pages_path(ui_path) -> Path:
+    """ui_dump.json → ui_dump.pages.json (page manifest of a crawled dump)"""
+    return Path(ui_path).with_suffix(".pages.json")
+
+
+class DumpWriter:
+    """Append elements one at a time; the index is written on close()."""
+
+    def __init__(self, ui_path):
+        self.path = jsonl_path(ui_path)
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self._file = open(self._tmp, "wb")
+        self._offsets = array("Q")
+
+    def write(self, element):
+        self._offsets.append(self._file.tell())
+        self._file.write(json.dumps(element, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        self._file.write(b"\n")
+
+    def write_many(self, elements):
+        for element in elements:
+            self.write(element)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        offsets = self._offsets
+        if sys.byteorder != "little":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+        idx_tmp = index_path(self.path).with_name(index_path(self.path).name + ".tmp")
+        idx_tmp.write_bytes(offsets.tobytes())
+        # Data first, then index, so a reader never sees an index pointing past the data
+        self._tmp.replace(self.path)
+        idx_tmp.replace(index_path(self.path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            self._tmp.unlink(missing_ok=True)
+
+
+class DumpReader:
+    """Lazy, random-access view of a JSONL dump: len(), iteration, reader[i] and reader[a:b]."""
+
+    def __init__(self, ui_path):
+        self.path = jsonl_path(ui_path)
+        self._file = open(self.path, "rb")
+        self._offsets = array("Q")
+        idx = index_path(self.path)
+        if idx.exists():
+            self._offsets.frombytes(idx.read_bytes())
+            if sys.byteorder != "little":
+                self._offsets.byteswap()
+        else:
+            self._rebuild_index()
+
+    def _rebuild_index(self):
+        offset = 0
+        for line in self._file:
+            self._offsets.append(offset)
+            offset += len(line)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __iter__(self):
+        self._file.seek(0)
+        for _ in range(len(self._offsets)):
+            yield json.loads(self._file.readline())
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        self._file.seek(self._offsets[i])
+        return json.loads(self._file.readline())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DumpView(Sequence):
+    """Read-only sequence over a written dump: len() is known, elements are read on demand."""
+
+    def __init__(self, ui_path, count: int):
+        self.ui_path = ui_path
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter_elements(self.ui_path)
+
+    def __getitem__(self, i):
+        with DumpReader(self.ui_path) as reader:
+            return reader[i]
+
+
+def write_dump(ui_path, elements) -> int:
+    """Stream elements to the JSONL dump and its index; returns the element count."""
+    with DumpWriter(ui_path) as writer:
+        writer.write_many(elements)
+        return len(writer)
+
+
+def export_json(ui_path):
+    """Write the indented, human-readable ui_dump.json from the JSONL dump, one element at a time."""
+    ui_path = Path(ui_path)
+    tmp = ui_path.with_name(ui_path.name + ".tmp")
+    with DumpReader(ui_path) as reader, open(tmp, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i, element in enumerate(reader):
+            f.write(",\n  " if i else "\n  ")
+            f.write(json.dumps(element, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+        f.write("\n]" if len(reader) else "]")
+    tmp.replace(ui_path)
+
+
+def has_jsonl(ui_path) -> bool:
+    return jsonl_path(ui_path).exists()
+
+
+def remove_jsonl(ui_path):
+    """Drop the JSONL dump and its index, so a JSON-only dump written after them is not shadowed."""
+    jsonl_path(ui_path).unlink(missing_ok=True)
+    index_path(ui_path).unlink(missing_ok=True)
+
+
+def iter_elements(ui_path):
+    """Iterate elements lazily, from the JSONL dump when present, otherwise from the JSON file."""
+    if has_jsonl(ui_path):
+        with DumpReader(ui_path) as reader:
+            yield from reader
+    else:
+        yield from json.loads(Path(ui_path).read_text(encoding="utf-8"))
+
+
+def load_elements(ui_path):
+    """All elements as a list (JSONL preferred). Raises OSError/ValueError when no valid dump exists."""
+    return list(iter_elements(ui_path))
+
+
+def write_pages(ui_path, pages):
+    """Store the page manifest of a crawled dump; pages=None removes a stale one."""
+    path = pages_path(ui_path)
+    if pages is None:
+        path.unlink(missing_ok=True)
+        return
+    path.write_text(json.dumps(pages, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def load_pages(ui_path):
+    """Page records of a crawled dump ({"id", "url", "steps", "elements": [indices], ...}) or None."""
+    path = pages_path(ui_path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
@@ -0,0 +1,271 @@
+"""
+Flask web UI for the Selenium self-healing agent.
+
+Dump, heal and script runs are submitted to a bounded background job queue, so
+a request never blocks for a whole heal: POST endpoints return a job id at once.
+
+Endpoints:
+    GET  /                     page with the forms, recent jobs and artifact previews
+    POST /dump                 {"url"}  → job id
+    POST /run-agent            {"url"}  → job id (dump + heal + verify)
+    POST /run-script                    → job id
+    GET  /jobs                 recent jobs
+    GET  /jobs/<id>            status (add ?log=1 for the captured output)
+    GET  /jobs/<id>/result     result, 202 while the job is still running
+    GET  /jobs/<id>/events     progress as server-sent events
+    GET  /ui-dump, /script     cached artifacts (conditional GET)
+
+Usage:
+    python web_app.py [--host 127.0.0.1] [--port 5000]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from flask import Flask, Response, flash, jsonify, redirect, render_template, request, send_file, url_for
+from config import LLM_CANDIDATES, UI_PREVIEW_LIMIT, WEB_HOST, WEB_PORT
+from job_queue import JobQueue, QueueFull
+from main import dump_ui, run_llm_agent, run_llm_agent_async
+from tracing import span
+from ui_store import DumpReader, has_jsonl, jsonl_path
+from agent.tools import UI_JSON_PATH, SELENIUM_SCRIPT_PATH, run_selenium, run_succeeded
+
+app = Flask(__name__)
+app.secret_key = os.environ.get("FLASK_SECRET_KEY") or os.urandom(16)
+
+jobs = JobQueue()
+
+# The web UI works on the shared ui_dump.json / selenium_action_script.py, so jobs
+# writing the same artifact are serialized; different artifacts proceed in parallel.
+ui_lock = threading.Lock()
+script_lock = threading.Lock()
+
+
+# Jobs
+def dump_job(url: str):
+    with ui_lock, span("web_job", kind="dump", url=url):
+        ui_data = dump_ui(url)
+    return {"elements": len(ui_data)}
+
+
+def agent_job(url: str):
+    with ui_lock, script_lock, span("web_job", kind="run-agent", url=url):
+        print("🔍 Dumping UI elements...")
+        dump_ui(url)
+        print("🛠️ Running Selenium agent...")
+        result = run_llm_agent_async(url) if LLM_CANDIDATES > 1 else run_llm_agent(url)
+    return result
+
+
+def script_job():
+    with script_lock, span("web_job", kind="run-script"):
+        print("▶️ Running Selenium script...")
+        output = run_selenium()
+    print(output)
+    return {"verified": run_succeeded(output), "output": output}
+
+
+JOBS = {"dump": dump_job, "run-agent": agent_job, "run-script": script_job}
+
+
+def wants_json() -> bool:
+    return request.is_json or request.accept_mimetypes.best == "application/json"
+
+
+def submit(kind: str, **params):
+    """Queue a job; JSON clients get 202 + job links, form posts are redirected back to the page."""
+    try:
+        job = jobs.submit(kind, JOBS[kind], **params)
+    except QueueFull as e:
+        if wants_json():
+            return jsonify(error=f"Queue full: {e}"), 503
+        flash(f"Queue full, try again later ({e})", "error")
+        return redirect(url_for("index"))
+
+    if wants_json():
+        return jsonify(job_id=job.id, status=job.status,
+                       status_url=url_for("job_status", job_id=job.id),
+                       result_url=url_for("job_result", job_id=job.id),
+                       events_url=url_for("job_events", job_id=job.id)), 202
+    flash(f"Job {job.id} queued: {kind}", "info")
+    return redirect(url_for("index", job=job.id))
+
+
+def form_url():
+    data = request.get_json(silent=True) or request.form
+    # The agent form carries a hidden url field next to the visible one; take the first non-empty value
+    values = data.getlist("url") if hasattr(data, "getlist") else [data.get("url", "")]
+    return next((v.strip() for v in values if v and v.strip()), "")
+
+
+@app.post("/dump")
+def dump():
+    url = form_url()
+    if not url:
+        return _bad_request("URL is required")
+    return submit("dump", url=url)
+
+
+@app.post("/run-agent")
+def run_agent():
+    url = form_url()
+    if not url:
+        return _bad_request("URL is required")
+    return submit("run-agent", url=url)
+
+
+@app.post("/run-script")
+def run_script():
+    return submit("run-script")
+
+
+def _bad_request(message):
+    if wants_json():
+        return jsonify(error=message), 400
+    flash(message, "error")
+    return redirect(url_for("index"))
+
+
+@app.get("/jobs")
+def job_list():
+    return jsonify([job.to_dict() for job in jobs.recent()])
+
+
+def _job_or_404(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return None, (jsonify(error=f"Unknown job {job_id}"), 404)
+    return job, None
+
+
+@app.get("/jobs/<job_id>")
+def job_status(job_id):
+    job, error = _job_or_404(job_id)
+    if error:
+        return error
+    return jsonify(job.to_dict(with_log=request.args.get("log") == "1"))
+
+
+@app.get("/jobs/<job_id>/result")
+def job_result(job_id):
+    job, error = _job_or_404(job_id)
+    if error:
+        return error
+    if not job.done:
+        return jsonify(job.to_dict()), 202
+    return jsonify(dict(job.to_dict(), result=job.result))
+
+
+@app.get("/jobs/<job_id>/events")
+def job_events(job_id):
+    """Stream the job's output lines as SSE "log" events, then one "done" event with its status."""
+    job, error = _job_or_404(job_id)
+    if error:
+        return error
+    try:
+        start = int(request.headers.get("Last-Event-ID", -1)) + 1
+    except ValueError:
+        start = 0
+
+    def stream():
+        sent = start
+        while True:
+            lines, done = job.wait(sent, timeout=15)
+            for line in lines:
+                yield f"id: {sent}\nevent: log\ndata: {json.dumps(line)}\n\n"
+                sent += 1
+            if done and not lines:
+                yield f"event: done\ndata: {json.dumps(job.to_dict())}\n\n"
+                return
+            if not lines:
+                yield ": keep-alive\n\n"
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# Artifact views
+_preview_cache = {}
+
+
+def cached_preview(path, render):
+    """Render an artifact once per modification; page loads reuse the text until the file changes."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return f"{os.path.basename(path)} not found."
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _preview_cache.get(path)
+    if cached is None or cached[0] != key:
+        try:
+            cached = (key, render())
+        except Exception as e:
+            return f"❌ Error reading {os.path.basename(path)}: {e}"
+        _preview_cache[path] = cached
+    return cached[1]
+
+
+def ui_preview():
+    if has_jsonl(UI_JSON_PATH):
+        def render():
+            with DumpReader(UI_JSON_PATH) as reader:
+                total = len(reader)
+                shown = reader[:UI_PREVIEW_LIMIT]
+            text = json.dumps(shown, indent=2, ensure_ascii=False)
+            if total > len(shown):
+                text += f"\n\n… {total - len(shown)} more elements in {jsonl_path(UI_JSON_PATH).name}"
+            return text
+        return cached_preview(str(jsonl_path(UI_JSON_PATH)), render)
+    return cached_preview(str(UI_JSON_PATH), lambda: UI_JSON_PATH.read_text(encoding="utf-8"))
+
+
+def script_preview():
+    return cached_preview(str(SELENIUM_SCRIPT_PATH), lambda: SELENIUM_SCRIPT_PATH.read_text(encoding="utf-8"))
+
+
+def task_log():
+    tasks = []
+    for job in jobs.recent():
+        summary = job.status
+        if job.done and isinstance(job.result, dict) and "status" in job.result:
+            summary += f" ({job.result['status']}, verified={job.result.get('verified')})"
+        elif job.error:
+            summary += f" ({job.error})"
+        tasks.append({"id": job.id, "time": time.strftime("%H:%M:%S", time.localtime(job.created)),
+                      "task": f"{job.kind} {job.params.get('url', '')}".strip(), "result": summary})
+    return tasks
+
+
+@app.get("/")
+def index():
+    return render_template("index.html", tasks=task_log(), ui_json=ui_preview(), script=script_preview(),
+                           active_job=request.args.get("job"))
+
+
+@app.get("/ui-dump")
+def ui_dump_view():
+    if not UI_JSON_PATH.exists():
+        return jsonify(error=f"{UI_JSON_PATH.name} not found"), 404
+    return send_file(UI_JSON_PATH, mimetype="application/json", conditional=True, max_age=0)
+
+
+@app.get("/script")
+def script_view():
+    if not SELENIUM_SCRIPT_PATH.exists():
+        return jsonify(error=f"{SELENIUM_SCRIPT_PATH.name} not found"), 404
+    return send_file(SELENIUM_SCRIPT_PATH, mimetype="text/x-python", conditional=True, max_age=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=WEB_HOST)
+    parser.add_argument("--port", type=int, default=WEB_PORT)
+    args = parser.parse_args()
+    # threaded=True keeps status polls and SSE streams responsive while jobs hold the worker threads
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()